@@ -0,0 +1,119 @@
+'''Compare the legacy ignore matching of the build context with the compiled matcher.
+
+Generates a workspace with source files, python caches, a git directory and datasets,
+then walks it with a typical ignore list:
+
+    $ python benchmarks/dockerignore.py --files 200000
+'''
+import os
+import sys
+import time
+import fnmatch
+import argparse
+import tempfile
+
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from mlad.cli.libs.dockerignore import IgnoreMatcher  # noqa: E402
+
+IGNORES = [
+    '**/.*',
+    '**/__pycache__',
+    '**/*.pyc',
+    'data',
+    '!data/sample',
+    'outputs',
+    '*.log',
+    'node_modules',
+]
+
+LAYOUT = [
+    # (share, directory template, file template)
+    (0.40, 'src/pkg{a}/mod{b}', 'file{c}.py'),
+    (0.15, 'src/pkg{a}/mod{b}/__pycache__', 'file{c}.cpython-37.pyc'),
+    (0.15, '.git/objects/{a:02x}', '{b:04x}{c:034x}'),
+    (0.15, 'data/set{a}/part{b}', 'sample{c}.bin'),
+    (0.05, 'data/sample', 'sample{a}_{b}_{c}.bin'),
+    (0.05, 'outputs/run{a}', 'ckpt{b}_{c}.pt'),
+    (0.05, 'node_modules/lib{a}/dist', 'index{b}_{c}.js'),
+]
+
+
+def generate(root: str, n: int):
+    for share, dir_template, file_template in LAYOUT:
+        count = int(n * share)
+        for i in range(count):
+            a, b, c = i // 1000, i // 50 % 20, i % 50
+            dirpath = os.path.join(root, dir_template.format(a=a, b=b, c=c))
+            os.makedirs(dirpath, exist_ok=True)
+            open(os.path.join(dirpath, file_template.format(a=a, b=b, c=c)), 'w').close()
+
+
+def legacy_arcfiles(workspace, ignores):
+    # The matching of mlad.cli.image before the compiled matcher.
+    def match_ignores(filepath, ignores):
+        result = False
+        normpath = os.path.normpath(filepath)
+
+        def matcher(path, pattern):
+            patterns = [pattern] + ([os.path.normpath(f"{pattern.replace('**/','/')}")]
+                                    if '**/' in pattern else [])
+            result = map(lambda _: fnmatch.fnmatch(normpath, _) or fnmatch.fnmatch(
+                normpath, os.path.normpath(f"{_}/*")), patterns)
+            return sum(result) > 0
+        for ignore in ignores:
+            if ignore.startswith('#'):
+                pass
+            elif ignore.startswith('!'):
+                result &= not matcher(normpath, ignore[1:])
+            else:
+                result |= matcher(normpath, ignore)
+        return result
+
+    ignores = [os.path.join(os.path.abspath(workspace), _)for _ in ignores]
+    for root, dirs, files in os.walk(workspace):
+        for name in files:
+            filepath = os.path.join(root, name)
+            if not match_ignores(filepath, ignores):
+                yield filepath, os.path.relpath(os.path.abspath(filepath),
+                                                os.path.abspath(workspace))
+        prune_dirs = []
+        for name in dirs:
+            dirpath = os.path.join(root, name)
+            if match_ignores(dirpath, ignores):
+                prune_dirs.append(name)
+        for _ in prune_dirs:
+            dirs.remove(_)
+
+
+def measure(name, func):
+    started = time.perf_counter()
+    count = sum(1 for _ in func())
+    elapsed = time.perf_counter() - started
+    print(f'{name:10} {elapsed:8.3f} s  {count:8d} files in the context')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--files', type=int, default=200000)
+    parser.add_argument('--workspace', default=None,
+                        help='Existing workspace to walk instead of a generated one.')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        workspace = args.workspace
+        if workspace is None:
+            workspace = tmpdir
+            started = time.perf_counter()
+            generate(workspace, args.files)
+            print(f'Generated {args.files} files in {time.perf_counter() - started:.1f} s')
+        # Warm up the page cache of the directory entries.
+        sum(1 for _ in os.walk(workspace))
+        measure('Legacy', lambda: legacy_arcfiles(workspace, IGNORES))
+        measure('Compiled', lambda: IgnoreMatcher(IGNORES).walk(workspace))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+'''Measure the import time of the CLI entry point with `python -X importtime`.
+
+Fails when the import takes longer than the budget or pulls in a heavy dependency
+that should only be imported by the command using it:
+
+    $ python benchmarks/importtime.py --budget 150
+'''
+import os
+import sys
+import argparse
+import subprocess
+
+from pathlib import Path
+from typing import List, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+
+HEAVY_MODULES = ['docker', 'kubernetes', 'requests', 'cerberus', 'jwt', 'aiohttp']
+
+
+def importtime(module: str) -> List[Tuple[int, int, str]]:
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join([str(ROOT), env.get('PYTHONPATH', '')])
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                          env=env, stderr=subprocess.PIPE, stdout=subprocess.DEVNULL,
+                          universal_newlines=True, check=True)
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        rows.append((int(self_us), int(cumulative_us), name.rstrip()))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--module', default='mlad.cli.__main__')
+    parser.add_argument('--budget', type=float, default=150, help='Budget in milliseconds.')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    best = None
+    for _ in range(args.repeat):
+        rows = importtime(args.module)
+        total = next(cumulative_us for _, cumulative_us, name in rows if name.strip() == args.module)
+        if best is None or total < best[0]:
+            best = (total, rows)
+    total, rows = best
+
+    print(f'Import of {args.module}: {total / 1000:.1f} ms (budget {args.budget:.1f} ms)')
+    print(f'{"self [ms]":>10} {"cumulative [ms]":>16}  module')
+    for self_us, cumulative_us, name in sorted(rows, reverse=True)[:args.top]:
+        print(f'{self_us / 1000:10.1f} {cumulative_us / 1000:16.1f}  {name.strip()}')
+
+    imported = set(name.strip() for _, _, name in rows)
+    heavy = [_ for _ in HEAVY_MODULES if _ in imported]
+    failed = False
+    if heavy:
+        print(f'FAIL: heavy modules imported at startup: {", ".join(heavy)}')
+        failed = True
+    if total / 1000 > args.budget:
+        print(f'FAIL: import time is over the budget by {total / 1000 - args.budget:.1f} ms')
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+'''Measure the client side decoding cost of streamed JSON frames.
+
+Feeds a synthetic log stream through the API client decoder in fixed size chunks:
+
+    $ python benchmarks/json_stream.py --size 100 --chunk 1024
+    $ python benchmarks/json_stream.py --size 10 --legacy
+'''
+import sys
+import json
+import time
+import argparse
+
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from mlad.api.base import JSONStreamDecoder  # noqa: E402
+
+
+def _parse_partial_json(value: str):
+    # The decoder used before JSONStreamDecoder, kept for comparison.
+    i = 0
+    li = 0
+    objs = []
+    while i < len(value) - 1:
+        i += 1
+        if value[i] == '}' and (i == len(value) - 1 or value[i + 1] == '{'):
+            try:
+                objs.append(json.loads(value[li: i + 1]))
+                li = i + 1
+            except json.JSONDecodeError:
+                continue
+    return objs, value[li:]
+
+
+def build_stream(size: int, newline: bool) -> bytes:
+    frames = []
+    total = 0
+    index = 0
+    while total < size:
+        frame = json.dumps({
+            'name': 'app-1', 'name_width': 5,
+            'timestamp': '2021-10-19T10:00:00.000000000Z',
+            'stream': f'step {index} loss 0.{index % 9973:04d} accuracy 0.{index % 997:03d}\n'
+        }) + ('\n' if newline else '')
+        frames.append(frame)
+        total += len(frame)
+        index += 1
+    return ''.join(frames).encode()
+
+
+def decode(data: bytes, chunk: int) -> int:
+    decoder = JSONStreamDecoder()
+    count = 0
+    for i in range(0, len(data), chunk):
+        count += len(decoder.feed(data[i: i + chunk]))
+    return count + len(decoder.close())
+
+
+def decode_legacy(data: bytes, chunk: int) -> int:
+    count = 0
+    res = ''
+    for i in range(0, len(data), chunk):
+        res += data[i: i + chunk].decode('utf-8', 'replace')
+        objs, res = _parse_partial_json(res)
+        count += len(objs)
+    return count
+
+
+def measure(name: str, func, data: bytes, chunk: int):
+    started = time.perf_counter()
+    count = func(data, chunk)
+    elapsed = time.perf_counter() - started
+    print(f'{name:28} {count:10d} frames {elapsed:8.2f} s '
+          f'{len(data) / elapsed / 1024 / 1024:8.2f} MiB/s')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--size', type=int, default=100, help='Stream size in MiB')
+    parser.add_argument('--chunk', type=int, default=1024)
+    parser.add_argument('--legacy', action='store_true', help='Also run the previous decoder')
+    args = parser.parse_args()
+
+    size = args.size * 1024 * 1024
+    ndjson = build_stream(size, newline=True)
+    concatenated = build_stream(size, newline=False)
+    measure('JSONStreamDecoder (NDJSON)', decode, ndjson, args.chunk)
+    measure('JSONStreamDecoder (concat)', decode, concatenated, args.chunk)
+    if args.legacy:
+        measure('_parse_partial_json', decode_legacy, concatenated, args.chunk)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+'''Compare per-request overhead of the version check middleware.
+
+Drives the ASGI apps in-process so that only the middleware stack is measured:
+
+    $ python benchmarks/middleware.py --requests 5000 --chunks 2000
+'''
+import sys
+import time
+import asyncio
+import argparse
+
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from fastapi import FastAPI, Request  # noqa: E402
+from fastapi.responses import JSONResponse, StreamingResponse  # noqa: E402
+
+from mlad import __version__  # noqa: E402
+from mlad.service.exceptions import VersionCompatabilityError  # noqa: E402
+from mlad.service.libs.middleware import VersionCheckMiddleware  # noqa: E402
+
+
+def build_app(pure_asgi: bool, chunks: int) -> FastAPI:
+    app = FastAPI()
+
+    @app.get('/api/v1/check/version')
+    def check_version():
+        return {'version': __version__}
+
+    @app.get('/api/v1/project/{project_key}/logs')
+    def logs(project_key: str):
+        def generate():
+            for i in range(chunks):
+                yield '{"name": "app-1", "stream": "log line %d\\n"}' % i
+        return StreamingResponse(generate())
+
+    if pure_asgi:
+        app.add_middleware(VersionCheckMiddleware)
+    else:
+        @app.middleware('http')
+        async def check_version_middleware(request: Request, call_next):
+            client_ver = request.headers.get('version', '0.3.1')
+            client_major, client_minor = client_ver.split('.', 2)[:2]
+            server_major, server_minor = __version__.split('.', 2)[:2]
+            if client_major != server_major or client_minor != server_minor:
+                return JSONResponse(
+                    status_code=400,
+                    content={'detail': str(VersionCompatabilityError(client_ver, __version__))}
+                )
+            return await call_next(request)
+    return app
+
+
+async def request(app, path: str) -> int:
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+        'method': 'GET', 'scheme': 'http', 'path': path, 'raw_path': path.encode(),
+        'root_path': '', 'query_string': b'', 'server': ('bench', 80), 'client': ('bench', 1),
+        'headers': [(b'host', b'bench'), (b'version', __version__.encode())],
+    }
+    received = 0
+    requested = False
+    completed = asyncio.Event()
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        # Streaming responses listen for a disconnect until the body is done.
+        await completed.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        nonlocal received
+        if message['type'] == 'http.response.body':
+            received += len(message.get('body', b''))
+            if not message.get('more_body', False):
+                completed.set()
+
+    await app(scope, receive, send)
+    return received
+
+
+async def measure(app, path: str, n: int):
+    await request(app, path)
+    started = time.perf_counter()
+    total = 0
+    for _ in range(n):
+        total += await request(app, path)
+    elapsed = time.perf_counter() - started
+    return n / elapsed, total / elapsed / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--streams', type=int, default=200)
+    parser.add_argument('--chunks', type=int, default=2000)
+    args = parser.parse_args()
+
+    loop = asyncio.new_event_loop()
+    for name, pure_asgi in [('BaseHTTPMiddleware', False), ('Pure ASGI', True)]:
+        app = build_app(pure_asgi, args.chunks)
+        version_rps, _ = loop.run_until_complete(
+            measure(app, '/api/v1/check/version', args.requests))
+        logs_rps, logs_mbps = loop.run_until_complete(
+            measure(app, '/api/v1/project/key/logs', args.streams))
+        print(f'{name:20} /check/version {version_rps:10.1f} req/s   '
+              f'/logs {logs_rps:8.1f} streams/s {logs_mbps:8.2f} MiB/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -5,6 +5,7 @@ from .project import Project
 from .app import App
 from .check import Check
 from .quota import Quota
+from .operation import Operation
 
 from mlad.cli import config as config_core
 from mlad.cli.exceptions import ConfigNotFoundError
@@ -85,3 +86,8 @@ class API:
     @lru_cache(maxsize=None)
     def quota(cls) -> Quota:
         return Quota(cls.address, cls.session)
+
+    @classproperty
+    @lru_cache(maxsize=None)
+    def operation(cls) -> Operation:
+        return Operation(cls.address, cls.session)
@@ -0,0 +1,43 @@
+'''Asyncio counterpart of mlad.api for issuing independent calls concurrently.
+
+    async with AsyncAPI() as api:
+        projects, apps = await asyncio.gather(api.project.get(), api.app.get())
+'''
+from typing import Optional
+
+from .base import create_http_session
+from .node import Node
+from .project import Project
+from .app import App
+from .check import Check
+from .quota import Quota
+from .operation import Operation
+
+
+class AsyncAPI:
+
+    def __init__(self, address: Optional[str] = None, session: Optional[str] = None):
+        from mlad.api import API
+        self.address = address if address is not None else API.address
+        self.session = session if session is not None else API.session
+        self.http = None
+
+    async def __aenter__(self) -> 'AsyncAPI':
+        # One pooled HTTP session is shared by every API of this instance.
+        self.http = create_http_session()
+        args = (self.http, self.address, self.session)
+        self.node = Node(*args)
+        self.project = Project(*args)
+        self.app = App(*args)
+        self.check = Check(*args)
+        self.quota = Quota(*args)
+        self.operation = Operation(*args)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        if self.http is not None:
+            await self.http.close()
+            self.http = None
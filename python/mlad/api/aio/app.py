@@ -0,0 +1,37 @@
+from typing import Optional
+
+from .base import AsyncAPIBase
+from .operation import Operation
+
+
+class App(AsyncAPIBase):
+    def __init__(self, http, address: Optional[str], session: Optional[str]):
+        super().__init__(http, address, session, 'project')
+        self._operation = Operation(http, address, session)
+
+    async def get(self, project_key=None, labels=None):
+        if project_key is not None:
+            path = f'/{project_key}/app'
+        else:
+            path = '/app'
+        return await self._get(path, params={'labels': labels})
+
+    async def create(self, project_key, apps):
+        return await self._post(f'/{project_key}/app', body={'apps': apps})
+
+    async def inspect(self, project_key, app_id):
+        return await self._get(f'/{project_key}/app/{app_id}')
+
+    async def get_tasks(self, project_key, app_id):
+        return await self._get(f'/{project_key}/app/{app_id}/tasks')
+
+    async def scale(self, project_key, app_id, scale_spec):
+        return await self._put(f'/{project_key}/app/{app_id}/scale',
+                               body={'scale_spec': scale_spec})
+
+    # remove multiple apps using json body
+    async def remove(self, project_key, apps):
+        path = f'/{project_key}/app'
+        operation = await self._delete(path, body={'apps': apps}, timeout=60)
+        async for obj in self._operation.follow(operation['id']):
+            yield obj
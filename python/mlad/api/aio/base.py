@@ -0,0 +1,90 @@
+import os
+
+from typing import Optional, Dict, AsyncIterator
+
+import aiohttp
+
+from mlad import __version__
+from mlad.api.base import JSONStreamDecoder
+from mlad.api.exceptions import error_from_response, ConnectionRefusedError
+
+
+POOL_LIMIT = 16
+KEEPALIVE_TIMEOUT = 30
+
+
+def create_http_session() -> aiohttp.ClientSession:
+    connector = aiohttp.TCPConnector(limit=POOL_LIMIT, keepalive_timeout=KEEPALIVE_TIMEOUT)
+    return aiohttp.ClientSession(connector=connector)
+
+
+def _drop_none(params: Optional[Dict]) -> Optional[Dict]:
+    # requests skips None values and encodes lists as repeated keys, aiohttp needs help.
+    if params is None:
+        return None
+    items = []
+    for key, value in params.items():
+        if value is None:
+            continue
+        values = value if isinstance(value, (list, tuple)) else [value]
+        for value in values:
+            items.append((key, str(value).lower() if isinstance(value, bool) else str(value)))
+    return items
+
+
+class AsyncAPIBase:
+
+    def __init__(self, http: aiohttp.ClientSession, address: Optional[str],
+                 session: Optional[str], prefix: str):
+        if address is None:
+            self.baseurl = f'{os.environ.get("MLAD_ADDRESS", "localhost:8440")}/api/v1/{prefix}'
+        else:
+            self.baseurl = f'{address}/api/v1/{prefix}'
+        if session is None:
+            self.headers = {'session': os.environ.get('MLAD_SESSION', ''), 'version': __version__}
+        else:
+            self.headers = {'session': session, 'version': __version__}
+        self.http = http
+
+    async def _request(self, method: str, path: str, params: Optional[Dict] = None,
+                       body: Optional[Dict] = None, timeout: int = 30):
+        url = f'{self.baseurl}{path}'
+        try:
+            resp = await self.http.request(
+                method, url, headers=self.headers, params=_drop_none(params), json=body,
+                timeout=aiohttp.ClientTimeout(total=timeout))
+        except aiohttp.ClientConnectionError:
+            raise ConnectionRefusedError(url)
+        if resp.status >= 400:
+            text = await resp.text()
+            resp.release()
+            error_from_response(resp.status, text, resp)
+        return resp
+
+    async def _get(self, path: str, params: Optional[Dict] = None, timeout: int = 30):
+        async with await self._request('GET', path, params=params, timeout=timeout) as resp:
+            return await resp.json()
+
+    async def _post(self, path: str, params: Optional[Dict] = None, body: Optional[Dict] = None,
+                    timeout: int = 30):
+        async with await self._request('POST', path, params, body, timeout) as resp:
+            return await resp.json()
+
+    async def _delete(self, path: str, params: Optional[Dict] = None, body: Optional[Dict] = None,
+                      timeout: int = 30):
+        async with await self._request('DELETE', path, params, body, timeout) as resp:
+            return await resp.json()
+
+    async def _put(self, path: str, params: Optional[Dict] = None, body: Optional[Dict] = None,
+                   timeout: int = 30):
+        async with await self._request('PUT', path, params, body, timeout) as resp:
+            return await resp.json()
+
+    async def _stream(self, path: str, params: Optional[Dict] = None) -> AsyncIterator[Dict]:
+        async with await self._request('GET', path, params=params, timeout=int(1e4)) as resp:
+            decoder = JSONStreamDecoder()
+            async for chunk in resp.content.iter_any():
+                for obj in decoder.feed(chunk):
+                    yield obj
+            for obj in decoder.close():
+                yield obj
@@ -0,0 +1,24 @@
+from typing import Optional
+from mlad.api.exceptions import VersionCheckError
+
+from .base import AsyncAPIBase
+
+
+class Check(AsyncAPIBase):
+    def __init__(self, http, address: Optional[str], session: Optional[str]):
+        super().__init__(http, address, session, 'check')
+
+    async def check_version(self):
+        try:
+            return await self._get('/version')
+        except Exception:
+            raise VersionCheckError
+
+    async def check_metrics_server(self):
+        return await self._get('/metrics-server')
+
+    async def check_nvidia_device_plugin(self):
+        return await self._get('/nvidia-device-plugin')
+
+    async def check_ingress_controller(self):
+        return await self._get('/ingress-controller')
@@ -0,0 +1,21 @@
+from typing import Optional
+
+from .base import AsyncAPIBase
+
+
+class Node(AsyncAPIBase):
+    def __init__(self, http, address: Optional[str], session: Optional[str]):
+        super().__init__(http, address, session, 'node')
+
+    async def list(self):
+        return await self._get('/list')
+
+    async def resource(self, names, no_trunc):
+        params = {'names': names, 'no_trunc': no_trunc}
+        return await self._get('/resource', params=params)
+
+    async def placement(self, apps):
+        return await self._post('/placement', body={'apps': apps})
+
+    async def resource_by_session(self):
+        return await self._get('/resource/session')
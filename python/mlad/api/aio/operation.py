@@ -0,0 +1,30 @@
+import sys
+
+from typing import Optional
+
+import aiohttp
+
+from .base import AsyncAPIBase
+
+
+class Operation(AsyncAPIBase):
+    def __init__(self, http, address: Optional[str], session: Optional[str]):
+        super().__init__(http, address, session, 'operation')
+
+    async def get(self, project_key=None):
+        return await self._get('', params={'project_key': project_key})
+
+    async def inspect(self, operation_id, since=None):
+        return await self._get(f'/{operation_id}', params={'since': since})
+
+    async def follow(self, operation_id):
+        received = 0
+        while True:
+            try:
+                params = {'follow': True, 'since': received}
+                async for obj in self._stream(f'/{operation_id}', params=params):
+                    received += 1
+                    yield obj
+                break
+            except aiohttp.ClientPayloadError as e:
+                print(f"[Retry] {e}", file=sys.stderr)
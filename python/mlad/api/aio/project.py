@@ -0,0 +1,72 @@
+import sys
+
+from typing import Optional
+
+import aiohttp
+
+from .base import AsyncAPIBase
+from .operation import Operation
+
+
+class Project(AsyncAPIBase):
+    def __init__(self, http, address: Optional[str], session: Optional[str]):
+        super().__init__(http, address, session, 'project')
+        self._operation = Operation(http, address, session)
+
+    async def get(self, extra_labels=[]):
+        params = {'extra_labels': ','.join(extra_labels)}
+        return await self._get('', params=params)
+
+    async def create(self, base_labels, project_yaml, credential=None):
+        body = {
+            'base_labels': base_labels,
+            'project_yaml': project_yaml,
+            'credential': credential,
+        }
+        operation = await self._post('', body=body)
+        async for obj in self._operation.follow(operation['id']):
+            yield obj
+
+    async def inspect(self, project_key):
+        return await self._get(f'/{project_key}')
+
+    async def delete(self, project_key):
+        operation = await self._delete(f'/{project_key}')
+        async for obj in self._operation.follow(operation['id']):
+            yield obj
+
+    async def log(self, project_key, tail='all',
+                  follow=False, timestamps=False, filters=None):
+        params = {'tail': tail, 'follow': follow, 'timestamps': timestamps,
+                  'filters': filters}
+        while True:
+            try:
+                async for obj in self._stream(f'/{project_key}/logs', params=params):
+                    yield obj
+                break
+            except aiohttp.ClientPayloadError as e:
+                print(f"[Retry] {e}", file=sys.stderr)
+
+    async def resource(self, project_key, group_by='project', no_trunc=True):
+        params = {'group_by': group_by, 'no_trunc': no_trunc}
+        return await self._get(f'/{project_key}/resource', params=params)
+
+    async def startup(self, project_key):
+        return await self._get(f'/{project_key}/startup')
+
+    async def prepull(self, project_key, images, constraints=None, timeout=600):
+        body = {
+            'images': images,
+            'constraints': constraints,
+            'timeout': timeout
+        }
+        operation = await self._post(f'/{project_key}/prepull', body=body)
+        async for obj in self._operation.follow(operation['id']):
+            yield obj
+
+    async def update(self, project_key, update_yaml, update_specs):
+        body = {
+            'update_yaml': update_yaml,
+            'update_specs': update_specs
+        }
+        return await self._post(f'/{project_key}', body=body, timeout=60)
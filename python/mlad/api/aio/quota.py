@@ -0,0 +1,23 @@
+from typing import Optional
+
+from .base import AsyncAPIBase
+
+
+class Quota(AsyncAPIBase):
+    def __init__(self, http, address: Optional[str], session: Optional[str]):
+        super().__init__(http, address, session, 'quota')
+
+    async def set_default(self, cpu: float, gpu: int, mem: str):
+        return await self._post('/set_default', body={
+            'cpu': cpu,
+            'gpu': gpu,
+            'mem': mem
+        })
+
+    async def set_quota(self, session_key: str, cpu: float, gpu: int, mem: str):
+        return await self._post('/set', body={
+            'cpu': cpu,
+            'gpu': gpu,
+            'mem': mem,
+            'session': session_key
+        })
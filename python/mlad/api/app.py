@@ -1,12 +1,13 @@
-import json
 from typing import Optional
 
 from .base import APIBase
+from .operation import Operation
 
 
 class App(APIBase):
     def __init__(self, address: Optional[str], session: Optional[str]):
         super().__init__(address, session, 'project')
+        self._operation = Operation(address, session)
 
     def get(self, project_key=None, labels=None):
         if project_key is not None:
@@ -24,6 +25,11 @@ class App(APIBase):
     def get_tasks(self, project_key, app_id):
         return self._get(f'/{project_key}/app/{app_id}/tasks')
 
+    def wait(self, project_key, app_id, condition='Running', timeout=60):
+        params = {'condition': condition, 'timeout': timeout}
+        return self._get(f'/{project_key}/app/{app_id}/wait', params=params,
+                         timeout=timeout + 30)['satisfied']
+
     def scale(self, project_key, app_id, scale_spec):
         return self._put(f'/{project_key}/app/{app_id}/scale',
                          body={'scale_spec': scale_spec})
@@ -31,9 +37,5 @@ class App(APIBase):
     # remove multiple apps using json body
     def remove(self, project_key, apps):
         path = f'/{project_key}/app'
-        resp = self._delete(path, body={'apps': apps},
-                            stream=True, raw=True, timeout=60)
-        for _ in resp.iter_content(1024):
-            res = _.decode()
-            dict_res = json.loads(res)
-            yield dict_res
+        operation = self._delete(path, body={'apps': apps}, timeout=60)
+        yield from self._operation.follow(operation['id'])
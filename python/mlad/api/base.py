@@ -1,15 +1,143 @@
 import os
+import json
+import codecs
 
-from typing import Optional, Dict
+from functools import lru_cache
+from typing import Optional, Dict, Iterator, List, Union
 
 import requests
+from requests.adapters import HTTPAdapter
 from requests.exceptions import ConnectionError
+from urllib3.util.retry import Retry
 
 from .exceptions import raise_error, ConnectionRefusedError
 
 from mlad import __version__
 
 
+class JSONStreamDecoder:
+    '''Incrementally decodes a stream of JSON objects.
+
+    The API server writes one object per line, so complete lines are decoded as soon as
+    a newline arrives and partial lines are kept as a list of pieces. Streams of
+    concatenated objects without newlines are decoded with raw_decode from the last
+    consumed offset.
+    '''
+
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        self._text_decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        self._pieces: List[str] = []
+        self._buffer = ''
+        self._lines = False
+
+    def _decode_all(self, text: str) -> List[Dict]:
+        objs = []
+        index = 0
+        end = len(text)
+        while True:
+            while index < end and text[index].isspace():
+                index += 1
+            if index == end:
+                return objs
+            obj, index = self._decoder.raw_decode(text, index)
+            objs.append(obj)
+
+    def _feed_lines(self, text: str) -> List[Dict]:
+        objs = []
+        start = 0
+        while True:
+            newline = text.find('\n', start)
+            if newline < 0:
+                break
+            self._pieces.append(text[start:newline])
+            line = ''.join(self._pieces)
+            self._pieces = []
+            objs.extend(self._decode_all(line))
+            start = newline + 1
+        if start < len(text):
+            self._pieces.append(text[start:])
+        return objs
+
+    def _feed_concatenated(self, text: str) -> List[Dict]:
+        self._buffer += text
+        # A complete object always ends with a closing brace.
+        if not self._buffer.rstrip().endswith('}'):
+            return []
+        objs = []
+        index = 0
+        end = len(self._buffer)
+        while True:
+            while index < end and self._buffer[index].isspace():
+                index += 1
+            if index == end:
+                break
+            try:
+                obj, index = self._decoder.raw_decode(self._buffer, index)
+            except json.JSONDecodeError:
+                break
+            objs.append(obj)
+        self._buffer = self._buffer[index:]
+        return objs
+
+    def feed(self, data: Union[bytes, str]) -> List[Dict]:
+        text = self._text_decoder.decode(data) if isinstance(data, bytes) else data
+        if not self._lines and '\n' in text:
+            self._lines = True
+            text, self._buffer = self._buffer + text, ''
+        if self._lines:
+            return self._feed_lines(text)
+        return self._feed_concatenated(text)
+
+    def close(self) -> List[Dict]:
+        rest = self._text_decoder.decode(b'', final=True)
+        if self._lines:
+            text = ''.join(self._pieces) + rest
+            self._pieces = []
+        else:
+            text, self._buffer = self._buffer + rest, ''
+        return self._decode_all(text)
+
+
+def iter_json_stream(resp: requests.Response, chunk_size: int = 65536) -> Iterator[Dict]:
+    decoder = JSONStreamDecoder()
+    for chunk in resp.iter_content(chunk_size):
+        yield from decoder.feed(chunk)
+    yield from decoder.close()
+
+
+POOL_CONNECTIONS = 4
+POOL_MAXSIZE = 16
+RETRY_TOTAL = 3
+RETRY_BACKOFF_FACTOR = 0.3
+RETRY_STATUS_FORCELIST = (502, 503, 504)
+# DELETE submits a new operation per call, so it is only retried on connection errors
+# which urllib3 retries for every method as the request was not sent.
+IDEMPOTENT_METHODS = frozenset(['HEAD', 'GET', 'PUT', 'OPTIONS'])
+
+
+@lru_cache(maxsize=None)
+def get_http_session() -> requests.Session:
+    # Shared by every API client so that connections to the API server are reused.
+    retry_kwargs = {
+        'total': RETRY_TOTAL,
+        'backoff_factor': RETRY_BACKOFF_FACTOR,
+        'status_forcelist': RETRY_STATUS_FORCELIST,
+        'raise_on_status': False,
+    }
+    try:
+        retry = Retry(allowed_methods=IDEMPOTENT_METHODS, **retry_kwargs)
+    except TypeError:
+        # urllib3 < 1.26
+        retry = Retry(method_whitelist=IDEMPOTENT_METHODS, **retry_kwargs)
+    adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE,
+                          max_retries=retry)
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
 class APIBase:
 
     def __init__(self, address: Optional[str], session: Optional[str], prefix: str):
@@ -22,6 +150,7 @@ class APIBase:
         else:
             self.headers = {'session': session, 'version': __version__}
         self.raise_error = raise_error
+        self.http = get_http_session()
 
     def _get(self, path: str, params: Optional[Dict] = None,
              raw: bool = False, stream: bool = False, timeout: int = 30):
@@ -29,8 +158,8 @@ class APIBase:
         if stream:
             timeout = 1e4
         try:
-            res = requests.get(url=url, headers=self.headers, params=params,
-                               timeout=timeout, stream=stream)
+            res = self.http.get(url=url, headers=self.headers, params=params,
+                                timeout=timeout, stream=stream)
         except ConnectionError:
             raise ConnectionRefusedError(url)
         self.raise_error(res)
@@ -42,8 +171,8 @@ class APIBase:
         if stream:
             timeout = 1e4
         try:
-            res = requests.post(url=url, headers=self.headers, params=params, json=body,
-                                timeout=timeout, stream=stream)
+            res = self.http.post(url=url, headers=self.headers, params=params, json=body,
+                                 timeout=timeout, stream=stream)
         except ConnectionError:
             raise ConnectionRefusedError(url)
         self.raise_error(res)
@@ -55,8 +184,8 @@ class APIBase:
         if stream:
             timeout = 1e4
         try:
-            res = requests.delete(url=url, headers=self.headers, params=params, json=body,
-                                  timeout=timeout, stream=stream)
+            res = self.http.delete(url=url, headers=self.headers, params=params, json=body,
+                                   timeout=timeout, stream=stream)
         except ConnectionError:
             raise ConnectionRefusedError(url)
         self.raise_error(res)
@@ -68,8 +197,8 @@ class APIBase:
         if stream:
             timeout = 1e4
         try:
-            res = requests.put(url=url, headers=self.headers, params=params, json=body,
-                               timeout=timeout, stream=stream)
+            res = self.http.put(url=url, headers=self.headers, params=params, json=body,
+                                timeout=timeout, stream=stream)
         except ConnectionError:
             raise ConnectionRefusedError(url)
         self.raise_error(res)
@@ -16,7 +16,8 @@ class APIError(MLADException):
     @property
     def status_code(self):
         if self.response:
-            return self.response.status_code
+            # aiohttp responses of the asyncio client name it status.
+            return getattr(self.response, 'status_code', getattr(self.response, 'status', None))
 
     @property
     def reason(self):
@@ -61,14 +62,18 @@ class InvalidSession(APIError):
 
 
 def error_from_http_errors(e):
+    error_from_response(e.response.status_code, e.response.text, e.response)
+
+
+def error_from_response(status_code, text, response):
     # msg from mlad api server http error
     try:
-        detail = e.response.json()['detail']
+        detail = json.loads(text)['detail']
         msg = detail['msg'] if 'msg' in detail else detail
         reason = detail['reason'] if 'reason' in detail else ''
     except json.JSONDecodeError:
-        raise APIError(e.response.text, e.response)
-    if e.response.status_code == 404:
+        raise APIError(text, response)
+    if status_code == 404:
         if reason == 'ProjectNotFound':
             cls = ProjectNotFound
         elif reason == 'AppNotFound':
@@ -76,16 +81,16 @@ def error_from_http_errors(e):
         else:
             cls = NotFound
             msg = 'Check the server address and paths.'
-    elif e.response.status_code == 401:
+    elif status_code == 401:
         cls = InvalidSession
-    elif e.response.status_code == 400:
+    elif status_code == 400:
         if reason == 'AppNotRunning':
             cls = InvalidLogRequest
         else:
             cls = APIError
     else:
         cls = APIError
-    raise cls(msg, e.response)
+    raise cls(msg, response)
 
 
 def raise_error(response):
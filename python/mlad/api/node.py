@@ -14,5 +14,8 @@ class Node(APIBase):
         params = {'names': names, 'no_trunc': no_trunc}
         return self._get('/resource', params=params)
 
+    def placement(self, apps):
+        return self._post('/placement', body={'apps': apps})
+
     def resource_by_session(self):
         return self._get('/resource/session')
@@ -0,0 +1,30 @@
+import sys
+import requests
+
+from typing import Optional
+
+from .base import APIBase, iter_json_stream
+
+
+class Operation(APIBase):
+    def __init__(self, address: Optional[str], session: Optional[str]):
+        super().__init__(address, session, 'operation')
+
+    def get(self, project_key=None):
+        return self._get('', params={'project_key': project_key})
+
+    def inspect(self, operation_id, since=None):
+        return self._get(f'/{operation_id}', params={'since': since})
+
+    def follow(self, operation_id):
+        received = 0
+        while True:
+            try:
+                params = {'follow': True, 'since': received}
+                resp = self._get(f'/{operation_id}', params=params, raw=True, stream=True)
+                for obj in iter_json_stream(resp):
+                    received += 1
+                    yield obj
+                break
+            except requests.exceptions.ChunkedEncodingError as e:
+                print(f"[Retry] {e}", file=sys.stderr)
@@ -1,30 +1,16 @@
 import sys
-import json
 import requests
 
 from typing import Optional
 
-from .base import APIBase
-
-
-def _parse_partial_json(value: str):
-    i = 0
-    li = 0
-    objs = []
-    while i < len(value) - 1:
-        i += 1
-        if value[i] == '}' and (i == len(value) - 1 or value[i + 1] == '{'):
-            try:
-                objs.append(json.loads(value[li: i + 1]))
-                li = i + 1
-            except json.JSONDecodeError:
-                continue
-    return objs, value[li:]
+from .base import APIBase, iter_json_stream
+from .operation import Operation
 
 
 class Project(APIBase):
     def __init__(self, address: Optional[str], session: Optional[str]):
         super().__init__(address, session, 'project')
+        self._operation = Operation(address, session)
 
     def get(self, extra_labels=[]):
         params = {'extra_labels': ','.join(extra_labels)}
@@ -36,27 +22,15 @@ class Project(APIBase):
             'project_yaml': project_yaml,
             'credential': credential,
         }
-        resp = self._post('', body=body, raw=True, stream=True)
-        res = ''
-        for _ in resp.iter_content(1024):
-            res += _.decode()
-            try:
-                dict_res = json.loads(res)
-            except json.decoder.JSONDecodeError:
-                continue
-            else:
-                res = ''
-            yield dict_res
+        operation = self._post('', body=body)
+        yield from self._operation.follow(operation['id'])
 
     def inspect(self, project_key):
         return self._get(f'/{project_key}')
 
     def delete(self, project_key):
-        resp = self._delete(f'/{project_key}', stream=True, raw=True)
-        for _ in resp.iter_content(1024):
-            res = _.decode()
-            dict_res = json.loads(res)
-            yield dict_res
+        operation = self._delete(f'/{project_key}')
+        yield from self._operation.follow(operation['id'])
 
     def log(self, project_key, tail='all',
             follow=False, timestamps=False, filters=None):
@@ -65,12 +39,7 @@ class Project(APIBase):
         while True:
             try:
                 resp = self._get(f'/{project_key}/logs', params=params, raw=True, stream=True)
-                res = ''
-                for _ in resp.iter_content(1024):
-                    res += _.decode('utf-8', 'replace')
-                    objs, res = _parse_partial_json(res)
-                    for obj in objs:
-                        yield obj
+                yield from iter_json_stream(resp)
                 break
             except requests.exceptions.ChunkedEncodingError as e:
                 print(f"[Retry] {e}", file=sys.stderr)
@@ -79,6 +48,18 @@ class Project(APIBase):
         params = {'group_by': group_by, 'no_trunc': no_trunc}
         return self._get(f'/{project_key}/resource', params=params)
 
+    def startup(self, project_key):
+        return self._get(f'/{project_key}/startup')
+
+    def prepull(self, project_key, images, constraints=None, timeout=600):
+        body = {
+            'images': images,
+            'constraints': constraints,
+            'timeout': timeout
+        }
+        operation = self._post(f'/{project_key}/prepull', body=body)
+        yield from self._operation.follow(operation['id'])
+
     def update(self, project_key, update_yaml, update_specs):
         body = {
             'update_yaml': update_yaml,
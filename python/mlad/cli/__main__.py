@@ -1,23 +1,24 @@
 import click
 import copy
+import importlib
 
 from mlad import __version__
-from mlad.cli import config_cli as config
-from mlad.cli import install_cli as install
-from mlad.cli import image_cli as image
-from mlad.cli import project_cli as project
-from mlad.cli import node_cli as node
-from mlad.cli import board_cli as board
-from mlad.cli import quota_cli as quota
 from mlad.cli.exceptions import ConfigNotFoundError
 from mlad.cli.config import get as check_config
 from mlad.cli.config import is_admin
 
 
 class EntryGroup(click.Group):
+    '''Entry group which imports the module of a command only when the command is used.
+
+    Commands are registered as 'module:attribute' paths, so that `mlad config` does not pay
+    for importing docker, kubernetes and the API clients.
+    '''
+
     def __init__(self, name=None, commands=None, **attrs):
         click.Group.__init__(self, name, commands, **attrs)
         self._commands = {}
+        self._lazy_commands = {}
         self._ordered = []
         self._dummy_command = click.Command('')
 
@@ -25,13 +26,23 @@ class EntryGroup(click.Group):
         return self._ordered
 
     def get_command(self, ctx, name):
+        if name in self._lazy_commands:
+            path, hidden = self._lazy_commands.pop(name)
+            module_name, attr = path.split(':')
+            self._register(getattr(importlib.import_module(module_name), attr), name, hidden)
         return self._commands.get(name)
 
-    def add_command(self, cmd, name, hidden=False):
+    def _register(self, cmd, name, hidden):
         self._commands[name] = copy.copy(cmd)
         if hidden:
             self._commands[name].hidden = True
         self._commands[name].name = name
+
+    def add_command(self, cmd, name, hidden=False):
+        if isinstance(cmd, str):
+            self._lazy_commands[name] = (cmd, hidden)
+        else:
+            self._register(cmd, name, hidden)
         self._ordered.append(name)
 
     def add_dummy_command(self, comment=''):
@@ -46,37 +57,37 @@ def main():
     pass
 
 
-main.add_command(config.cli, 'config')
-main.add_command(install.version, 'version')
+main.add_command('mlad.cli.config_cli:cli', 'config')
+main.add_command('mlad.cli.install_cli:version', 'version')
 
 try:
     check_config()
 except ConfigNotFoundError:
     pass
 else:
-    main.add_command(image.cli, 'image')
-    main.add_command(project.cli, 'project')
-    main.add_command(board.cli, 'board')
-    main.add_command(node.admin_cli if is_admin() else node.cli, 'node')
+    main.add_command('mlad.cli.image_cli:cli', 'image')
+    main.add_command('mlad.cli.project_cli:cli', 'project')
+    main.add_command('mlad.cli.board_cli:cli', 'board')
+    main.add_command('mlad.cli.node_cli:admin_cli' if is_admin() else 'mlad.cli.node_cli:cli', 'node')
     if is_admin():
-        main.add_command(install.check, 'install-check')
-    main.add_command(quota.cli, 'quota')
+        main.add_command('mlad.cli.install_cli:check', 'install-check')
+    main.add_command('mlad.cli.quota_cli:cli', 'quota')
 
     main.add_dummy_command()
     main.add_dummy_command('\b\bPrefer:')
 
-    main.add_command(image.ls, 'images')
-    main.add_command(image.build, 'build')
-    main.add_command(project.up, 'up')
-    main.add_command(project.down, 'down')
-    main.add_command(project.run, 'run')
-    main.add_command(project.update, 'update')
-    main.add_command(project.ingress, 'ingress')
-    main.add_command(project.logs, 'logs')
-    main.add_command(project.ls, 'ls')
-    main.add_command(project.ps, 'ps')
-    main.add_command(project.edit, 'edit')
-    main.add_command(project.scale, 'scale')
+    main.add_command('mlad.cli.image_cli:ls', 'images')
+    main.add_command('mlad.cli.image_cli:build', 'build')
+    main.add_command('mlad.cli.project_cli:up', 'up')
+    main.add_command('mlad.cli.project_cli:down', 'down')
+    main.add_command('mlad.cli.project_cli:run', 'run')
+    main.add_command('mlad.cli.project_cli:update', 'update')
+    main.add_command('mlad.cli.project_cli:ingress', 'ingress')
+    main.add_command('mlad.cli.project_cli:logs', 'logs')
+    main.add_command('mlad.cli.project_cli:ls', 'ls')
+    main.add_command('mlad.cli.project_cli:ps', 'ps')
+    main.add_command('mlad.cli.project_cli:edit', 'edit')
+    main.add_command('mlad.cli.project_cli:scale', 'scale')
 
 
 if __name__ == '__main__':
@@ -1,9 +1,12 @@
-from mlad.core.docker import controller as ctlr
-from mlad.cli import board, config
-from mlad.api import API
+from mlad.cli.libs import lazy_import
+
+ctlr = lazy_import('mlad.core.docker.controller')
+board = lazy_import('mlad.cli.board')
+config = lazy_import('mlad.cli.config')
 
 
 def list_project_keys(ctx, args, incomplete):
+    from mlad.api import API
     project_specs = API.project.get()
     keys = [spec['key'] for spec in project_specs]
     return [key for key in keys if key.startswith(incomplete)]
@@ -18,7 +21,7 @@ def list_component_names(ctx, args, incomplete):
 
 def list_config_names(ctx, args, incomplete):
     spec = config._load()
-    names = [conf.name for conf in spec.configs]
+    names = [conf['name'] for conf in spec['configs']]
     return [name for name in names if name.startswith(incomplete)]
 
 
@@ -29,5 +32,6 @@ def list_image_ids(ctx, args, incomplete):
 
 
 def list_node_names(ctx, args, incomplete):
+    from mlad.api import API
     nodes = API.node.list()
     return [node['hostname'] for node in nodes if node['hostname'].startswith(incomplete)]
@@ -1,11 +1,13 @@
 import click
 
 from mlad import __version__
-from mlad.cli import board
+from mlad.cli.libs import lazy_import
 from mlad.cli.autocompletion import list_component_names
 
 from . import echo_exception
 
+board = lazy_import('mlad.cli.board')
+
 
 @click.command()
 @click.option('--image-repository', '-i', required=False,
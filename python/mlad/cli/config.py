@@ -3,19 +3,15 @@ import os
 import socket
 import uuid
 import re
-import requests
-
-import jwt
+import copy
+import tempfile
 import yaml
 
-from functools import lru_cache
 from typing import Optional, Dict, Callable, List, Tuple, Any
 from pathlib import Path
 from urllib.parse import urlparse
 from getpass import getuser
 from mlad import __version__
-from mlad.core.docker import controller as dockerctlr
-from mlad.core.exceptions import DockerNotFoundError
 from mlad.cli.libs import utils
 from mlad.cli.exceptions import (
     ConfigNotFoundError, CannotDeleteConfigError, InvalidPropertyError,
@@ -34,20 +30,47 @@ boilerplate = {
     'configs': []
 }
 
-if not os.path.isfile(CFG_PATH):
-    Path(MLAD_HOME_PATH).mkdir(exist_ok=True, parents=True)
-    with open(CFG_PATH, 'w') as cfg_file:
-        yaml.dump(boilerplate, cfg_file)
+# libyaml is much faster to parse with, but is not always built in.
+_Loader = getattr(yaml, 'CFullLoader', yaml.FullLoader)
+_Dumper = getattr(yaml, 'CDumper', yaml.Dumper)
+
+# The last parsed config, valid while the path, mtime and size of the file are the same.
+_cache = {'key': None, 'spec': None}
+
+
+def _stat_key(stat: os.stat_result) -> Tuple:
+    return (CFG_PATH, stat.st_mtime_ns, stat.st_size)
 
 
 def _load():
-    with open(CFG_PATH, 'r') as cfg_file:
-        return yaml.load(cfg_file, Loader=yaml.FullLoader)
+    try:
+        key = _stat_key(os.stat(CFG_PATH))
+    except FileNotFoundError:
+        return copy.deepcopy(boilerplate)
+    if _cache['key'] != key:
+        with open(CFG_PATH, 'r') as cfg_file:
+            key = _stat_key(os.fstat(cfg_file.fileno()))
+            _cache['spec'] = yaml.load(cfg_file, Loader=_Loader)
+            _cache['key'] = key
+    return copy.deepcopy(_cache['spec'])
 
 
 def _save(spec: Dict):
-    with open(CFG_PATH, 'w') as cfg_file:
-        yaml.dump(spec, cfg_file, sort_keys=False)
+    # Write to a temporary file and rename it, so that readers never see a partial file.
+    dirpath = os.path.dirname(CFG_PATH) or '.'
+    Path(dirpath).mkdir(exist_ok=True, parents=True)
+    fd, temp_path = tempfile.mkstemp(prefix='.config.', suffix='.yml', dir=dirpath)
+    try:
+        with os.fdopen(fd, 'w') as cfg_file:
+            yaml.dump(spec, cfg_file, Dumper=_Dumper, sort_keys=False)
+            cfg_file.flush()
+            os.fsync(cfg_file.fileno())
+        os.replace(temp_path, CFG_PATH)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+    finally:
+        _cache['key'] = None
 
 
 def _find_config(name: str, spec: Optional[Dict] = None, index: bool = False) -> Optional[Dict]:
@@ -62,6 +85,10 @@ def _find_config(name: str, spec: Optional[Dict] = None, index: bool = False) ->
 
 
 def add(name: str, address: Optional[str]) -> Dict:
+    import requests
+    from mlad.core.docker import controller as dockerctlr
+    from mlad.core.exceptions import DockerNotFoundError
+
     spec = _load()
     duplicated_index = _find_config(name, spec=spec, index=True)
     if duplicated_index is not None:
@@ -223,7 +250,6 @@ def delete(name: str) -> None:
     _save(spec)
 
 
-@lru_cache(maxsize=None)
 def get(name: Optional[str] = None, key: Optional[str] = None) -> Dict:
     if name is None:
         name = current()
@@ -356,6 +382,7 @@ def _create_session_key():
     user = getuser()
     hostname = socket.gethostname()
     payload = {"user": user, "hostname": hostname, "uuid": str(uuid.uuid4())}
+    import jwt
     encode = jwt.encode(payload, "mlad", algorithm="HS256")
     return encode
 
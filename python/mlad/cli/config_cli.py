@@ -3,10 +3,12 @@ from typing import Optional
 import click
 import yaml
 
-from mlad.cli import config
+from mlad.cli.libs import lazy_import
 from mlad.cli.autocompletion import list_config_names
 from . import echo_exception
 
+config = lazy_import('mlad.cli.config')
+
 
 @click.command()
 @click.argument('NAME', required=True)
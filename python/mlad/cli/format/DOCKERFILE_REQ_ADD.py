@@ -1,5 +1,5 @@
 import sys
 
-FORMAT = '''ADD {SRC}'''
+FORMAT = '''ADD {SRC} {SRC}'''
 
 sys.modules[__name__] = FORMAT
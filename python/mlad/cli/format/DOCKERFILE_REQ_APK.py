@@ -2,6 +2,6 @@ import sys
 
 # PACKMAN FILENAME
 FORMAT = '''COPY {SRC} .depends/apk.list
-RUN cat apk.list | xargs apk add'''
+RUN {MOUNT}xargs apk add < .depends/apk.list'''
 
 sys.modules[__name__] = FORMAT
@@ -2,6 +2,6 @@ import sys
 
 # PACKMAN FILENAME
 FORMAT = '''COPY {SRC} .depends/apt.list
-RUN xargs -a .depends/apt.list -I % sh -c "apt install -y %"'''
+RUN {MOUNT}apt-get update && xargs -a .depends/apt.list apt-get install -y{POST}'''
 
 sys.modules[__name__] = FORMAT
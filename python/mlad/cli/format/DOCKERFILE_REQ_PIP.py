@@ -2,6 +2,6 @@ import sys
 
 # PACKMAN FILENAME
 FORMAT = '''COPY {SRC} .depends/pip.list
-RUN pip install -r .depends/pip.list'''
+RUN {MOUNT}pip install -r .depends/pip.list'''
 
 sys.modules[__name__] = FORMAT
@@ -2,6 +2,6 @@ import sys
 
 # PACKMAN FILENAME
 FORMAT = '''COPY {SRC} .depends/yum.list
-RUN cat yum.list | xargs yum -y install'''
+RUN {MOUNT}xargs yum -y install < .depends/yum.list'''
 
 sys.modules[__name__] = FORMAT
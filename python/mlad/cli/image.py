@@ -1,21 +1,21 @@
 import sys
 import os
-import io
-import tempfile
-import fnmatch
-import tarfile
 
 from typing import Optional
 
 from mlad.cli import config as config_core
-from mlad.cli.libs import utils
+from mlad.cli.libs import utils, context_cache
+from mlad.cli.libs.context import stream_context
+from mlad.cli.libs.dockerignore import IgnoreMatcher
 from mlad.cli.format import (
     DOCKERFILE, DOCKERFILE_ENV, DOCKERFILE_REQ_PIP, DOCKERFILE_REQ_APT,
     DOCKERFILE_REQ_ADD, DOCKERFILE_REQ_RUN, DOCKERFILE_REQ_APK, DOCKERFILE_REQ_YUM
 )
 
 from mlad.core.docker import controller as ctlr
-from mlad.core.libs.constants import MLAD_PROJECT, MLAD_PROJECT_VERSION, MLAD_PROJECT_IMAGE
+from mlad.core.libs.constants import (
+    MLAD_PROJECT, MLAD_PROJECT_VERSION, MLAD_PROJECT_IMAGE, MLAD_PROJECT_CONTEXT_DIGEST
+)
 
 
 PREP_KEY_TO_TEMPLATE = {
@@ -27,6 +27,22 @@ PREP_KEY_TO_TEMPLATE = {
     'yum': DOCKERFILE_REQ_YUM
 }
 
+# Package caches kept across builds with BuildKit.
+PREP_KEY_TO_CACHE_MOUNT = {
+    'apt': ('--mount=type=cache,target=/var/cache/apt,sharing=locked '
+            '--mount=type=cache,target=/var/lib/apt/lists,sharing=locked '),
+    'pip': '--mount=type=cache,target=/root/.cache/pip ',
+    'apk': '--mount=type=cache,target=/etc/apk/cache ',
+    'yum': '--mount=type=cache,target=/var/cache/yum '
+}
+
+# docker-clean of the Debian and Ubuntu images deletes the downloaded packages after each
+# install, so it is set aside while apt installs through the cache mount.
+APT_KEEP_PACKAGES = ('mv /etc/apt/apt.conf.d/docker-clean /tmp/ 2> /dev/null; ',
+                     ' && (mv /tmp/docker-clean /etc/apt/apt.conf.d/ 2> /dev/null || true)')
+
+BUILDKIT_SYNTAX = '# syntax=docker/dockerfile:1'
+
 
 def list(file: Optional[str], all: bool, tail: int):
     if all:
@@ -78,9 +94,10 @@ def build(file: Optional[str], quiet: bool, no_cache: bool, pull: bool, push: bo
     repository = base_labels[MLAD_PROJECT_IMAGE]
 
     workspace = project['workspace']
+    buildkit = _is_buildkit_enabled()
     # For the workspace kind
     if workspace['kind'] == 'Workspace':
-        payload = _obtain_workspace_payload(workspace, project['maintainer'])
+        payload = _obtain_workspace_payload(workspace, project['maintainer'], buildkit)
     # For the dockerfile kind
     else:
         if 'filePath' in workspace:
@@ -95,55 +112,91 @@ def build(file: Optional[str], quiet: bool, no_cache: bool, pull: bool, push: bo
         else:
             payload = workspace['buildscript']
 
-    with tempfile.TemporaryDirectory() as tmpdir:
-        dockerfile_info = tarfile.TarInfo('.dockerfile')
-        dockerfile_info.size = len(payload)
-        with tarfile.open(f'{tmpdir}/context.tar', mode='w') as tar:
-            for name, arcname in _get_arcfiles(project['workdir'], workspace['ignores']):
-                tar.add(name, arcname)
-            tar.addfile(dockerfile_info, io.BytesIO(payload.encode()))
-
-        # Build Image
-        with open(f'{tmpdir}/context.tar', 'rb') as tf:
-            build_output = ctlr.build_image(base_labels, tf, dockerfile_info.name,
-                                            no_cache, pull, stream=True)
-
-            # Print build output
-            for _ in build_output:
-                if 'error' in _:
-                    sys.stderr.write(f"{_['error']}\n")
-                    sys.exit(1)
-                elif 'stream' in _:
-                    if not quiet:
-                        sys.stdout.write(_['stream'])
-
-    image = ctlr.get_image(repository)
-
-    # Prepare the previous images
-    images = ctlr.get_images(project_key=project_key)
-    prev_images = [
-        im
-        for im in images
-        for tag in im.tags if tag.endswith(version)
-    ]
-
-    # Remove the previous images with different ids
-    for prev_image in prev_images:
-        if prev_image != image:
-            prev_image.tag('remove')
-            ctlr.remove_image(['remove'])
-    yield f'Built Image: {repository}'
+    # Skip the build when the context is the same as the one of the built image.
+    files = [_ for _ in _get_arcfiles(project['workdir'], workspace['ignores'])]
+    manifest = context_cache.load_manifest(project_key)
+    digest = context_cache.update_manifest(manifest, files, payload, base_labels)
+    base_labels[MLAD_PROJECT_CONTEXT_DIGEST] = digest
+    image = None if no_cache or pull else _find_built_image(project_key, repository, digest)
+
+    if image is None:
+        # Stream the context to the daemon while archiving the workspace.
+        compress = _is_remote_docker_host(config)
+        context = stream_context(files, ('.dockerfile', payload.encode()), compress=compress)
+        build_output = ctlr.build_image(base_labels, context, '.dockerfile',
+                                        no_cache, pull, stream=True, compress=compress,
+                                        buildkit=buildkit)
+
+        # Print build output
+        steps, cached_steps = 0, 0
+        for _ in build_output:
+            if 'error' in _:
+                sys.stderr.write(f"{_['error']}\n")
+                sys.exit(1)
+            elif 'stream' in _:
+                if _['stream'].startswith('Step '):
+                    steps += 1
+                elif _['stream'].strip() == '---> Using cache':
+                    cached_steps += 1
+                if not quiet:
+                    sys.stdout.write(_['stream'])
+
+        image = ctlr.get_image(repository)
+
+        # Prepare the previous images
+        images = ctlr.get_images(project_key=project_key)
+        prev_images = [
+            im
+            for im in images
+            for tag in im.tags if tag.endswith(version)
+        ]
+
+        # Remove the previous images with different ids
+        for prev_image in prev_images:
+            if prev_image != image:
+                prev_image.tag('remove')
+                ctlr.remove_image(['remove'])
+        manifest.pop('pushed', None)
+        yield f'Built Image: {repository}'
+        if steps > 0:
+            yield f'Layer cache reused for {cached_steps} of {steps} steps.'
+    else:
+        yield f'Image is up to date: {repository}'
+    context_cache.save_manifest(project_key, manifest)
 
     # Push image
     if project['kind'] != 'Component' and push:
-        yield f'Upload the image to the registry [{registry_address}]...'
-        for line in ctlr.push_image(repository):
-            yield line
+        if manifest.get('pushed') == repository:
+            yield f'Image is already uploaded to the registry [{registry_address}].'
+        else:
+            yield f'Upload the image to the registry [{registry_address}]...'
+            for line in ctlr.push_image(repository):
+                yield line
+            manifest['pushed'] = repository
+            context_cache.save_manifest(project_key, manifest)
 
     return image
 
 
-def _obtain_workspace_payload(workspace, maintainer):
+def _find_built_image(project_key: str, repository: str, digest: str):
+    images = ctlr.get_images(project_key=project_key,
+                             extra_labels=[f'{MLAD_PROJECT_CONTEXT_DIGEST}={digest}'])
+    for image in images:
+        if repository in image.tags:
+            return image
+    return None
+
+
+def _is_remote_docker_host(config) -> bool:
+    docker_host = config.get('docker_host') or os.environ.get('DOCKER_HOST') or 'unix://'
+    return not docker_host.startswith('unix://')
+
+
+def _is_buildkit_enabled() -> bool:
+    return os.environ.get('DOCKER_BUILDKIT') == '1'
+
+
+def _obtain_workspace_payload(workspace, maintainer, buildkit: bool = False):
     default = {
         'env': workspace.get('env', {}),
         'preps': workspace.get('preps', []),
@@ -154,24 +207,31 @@ def _obtain_workspace_payload(workspace, maintainer):
 
     envs = [DOCKERFILE_ENV.format(KEY=k, VALUE=v) for k, v in default['env'].items()]
 
-    preps = default['preps']
-    prep_docker_formats = []
-    for prep in preps:
+    # The preps keep the declared order since they may depend on each other and on the envs.
+    preps = []
+    for prep in default['preps']:
         key = tuple(prep.keys())[0]
         template = PREP_KEY_TO_TEMPLATE[key]
-        prep_docker_formats.append(template.format(SRC=prep[key]))
+        mount, post = '', ''
+        if buildkit:
+            mount = PREP_KEY_TO_CACHE_MOUNT.get(key, '')
+            if key == 'apt':
+                mount, post = mount + APT_KEEP_PACKAGES[0], APT_KEEP_PACKAGES[1]
+        preps.append(template.format(SRC=prep[key], MOUNT=mount, POST=post))
 
     commands = [f'"{item}"' for item in default['command'].split()] + \
                [f'"{item}"' for item in default['args'].split()]
 
-    return DOCKERFILE.format(
+    payload = DOCKERFILE.format(
         BASE=workspace['base'],
         MAINTAINER=maintainer,
         ENVS='\n'.join(envs),
-        PREPS='\n'.join(prep_docker_formats),
+        PREPS='\n'.join(preps),
         SCRIPT=default['script'],
         COMMAND=f'CMD [{", ".join(commands)}]' if len(commands) > 0 else ''
     )
+    # Parser directives have to be on the first line.
+    return f'{BUILDKIT_SYNTAX}{payload}' if buildkit else payload
 
 
 def remove(ids, force):
@@ -201,37 +261,4 @@ def prune(all):
 
 
 def _get_arcfiles(workspace='.', ignores=[]):
-    ignores = [os.path.join(os.path.abspath(workspace), _)for _ in ignores]
-    for root, dirs, files in os.walk(workspace):
-        for name in files:
-            filepath = os.path.join(root, name)
-            if not _match_ignores(filepath, ignores):
-                yield filepath, os.path.relpath(os.path.abspath(filepath),
-                                                os.path.abspath(workspace))
-        prune_dirs = []
-        for name in dirs:
-            dirpath = os.path.join(root, name)
-            if _match_ignores(dirpath, ignores):
-                prune_dirs.append(name)
-        for _ in prune_dirs:
-            dirs.remove(_)
-
-
-def _match_ignores(filepath, ignores):
-    result = False
-    normpath = os.path.normpath(filepath)
-
-    def matcher(path, pattern):
-        patterns = [pattern] + ([os.path.normpath(f"{pattern.replace('**/','/')}")]
-                                if '**/' in pattern else [])
-        result = map(lambda _: fnmatch.fnmatch(normpath, _) or fnmatch.fnmatch(
-            normpath, os.path.normpath(f"{_}/*")), patterns)
-        return sum(result) > 0
-    for ignore in ignores:
-        if ignore.startswith('#'):
-            pass
-        elif ignore.startswith('!'):
-            result &= not matcher(normpath, ignore[1:])
-        else:
-            result |= matcher(normpath, ignore)
-    return result
+    return IgnoreMatcher(ignores).walk(workspace)
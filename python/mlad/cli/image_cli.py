@@ -1,10 +1,11 @@
 import click
-from mlad.cli import image
-from mlad.cli.libs import utils
+from mlad.cli.libs import utils, lazy_import
 from mlad.cli.autocompletion import list_image_ids
 
 from . import echo_exception
 
+image = lazy_import('mlad.cli.image')
+
 
 @click.command()
 @click.option('--file', '-f', default=None, type=click.Path(exists=True), help=(
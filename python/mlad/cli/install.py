@@ -1,3 +1,5 @@
+import asyncio
+
 from mlad import __version__
 from mlad.core import exceptions as core_exceptions
 from mlad.api.exceptions import VersionCheckError
@@ -5,6 +7,7 @@ from mlad.cli.libs import utils
 from mlad.cli.exceptions import APIServerNotInstalledError
 from mlad.cli import config as config_core
 from mlad.api import API
+from mlad.api.aio import AsyncAPI
 
 
 def version():
@@ -54,52 +57,47 @@ def check():
 
     yield 'Check installed plugins...'
 
-    # Check ingress controller
-    try:
-        ctlr.get_k8s_deployment('ingress-nginx-controller', 'ingress-nginx', cli)
-    except core_exceptions.NotFound:
-        pass
-    else:
-        checked['Ingress Controller']['status'] = True
+    targets = {
+        'Ingress Controller': (ctlr.get_k8s_deployment, 'ingress-nginx-controller', 'ingress-nginx'),
+        'Metrics Server': (ctlr.get_k8s_deployment, 'metrics-server', 'kube-system'),
+        'NVIDIA Device Plugin': (ctlr.get_k8s_daemonset, 'nvidia-device-plugin', 'kube-system'),
+        'Node Feature Discovery': (ctlr.get_k8s_daemonset, 'nfd', 'node-feature-discovery'),
+        'GPU Feature Discovery': (ctlr.get_k8s_daemonset, 'gpu-feature-discovery',
+                                  'node-feature-discovery'),
+    }
 
-    # Check metrics server
-    try:
-        ctlr.get_k8s_deployment('metrics-server', 'kube-system', cli)
-    except core_exceptions.NotFound:
-        pass
-    else:
-        checked['Metrics Server']['status'] = True
+    def _installed(getter, name, namespace):
+        try:
+            getter(name, namespace, cli)
+        except core_exceptions.NotFound:
+            return False
+        return True
 
-    # Check nvidia device plugin
-    try:
-        ctlr.get_k8s_daemonset('nvidia-device-plugin', 'kube-system', cli)
-    except core_exceptions.NotFound:
-        pass
-    else:
-        checked['NVIDIA Device Plugin']['status'] = True
+    def _obtain_server_address():
+        try:
+            return config_core.obtain_server_address(config)
+        except APIServerNotInstalledError:
+            return None
 
-    # Check node feature discovery
-    try:
-        ctlr.get_k8s_daemonset('nfd', 'node-feature-discovery', cli)
-    except core_exceptions.NotFound:
-        pass
-    else:
-        checked['Node Feature Discovery']['status'] = True
-    try:
-        ctlr.get_k8s_daemonset('gpu-feature-discovery', 'node-feature-discovery', cli)
-    except core_exceptions.NotFound:
-        pass
-    else:
-        checked['GPU Feature Discovery']['status'] = True
+    async def _check_all():
+        # The lookups are independent, so run them concurrently.
+        loop = asyncio.get_event_loop()
+        plugins = [loop.run_in_executor(None, _installed, *target) for target in targets.values()]
+        address, *statuses = await asyncio.gather(
+            loop.run_in_executor(None, _obtain_server_address), *plugins)
+        version = None
+        if address is not None:
+            async with AsyncAPI(address=address) as api:
+                try:
+                    version = (await api.check.check_version())['version']
+                except VersionCheckError as e:
+                    version = e
+        return address, statuses, version
 
-    # Check mlad api server
-    api_server_address = None
-    try:
-        api_server_address = config_core.obtain_server_address(config)
-    except APIServerNotInstalledError:
-        pass
-    else:
-        checked['MLAD API Server']['status'] = True
+    api_server_address, statuses, server_version = asyncio.run(_check_all())
+    for plugin, status in zip(targets, statuses):
+        checked[plugin]['status'] = status
+    checked['MLAD API Server']['status'] = api_server_address is not None
 
     for plugin, result in checked.items():
         status = result['status']
@@ -115,10 +113,8 @@ def check():
 
         if plugin == 'MLAD API Server' and status:
             yield f' · API Server Address : {api_server_address}'
-            try:
-                server_version = API.check.check_version()['version']
-            except VersionCheckError as e:
+            if isinstance(server_version, VersionCheckError):
                 yield 'The API server version should be 0.4.1 or higher.'
                 yield 'Please use command \'helm upgrade mlad -n mlad ./charts/api-server\'.'
-                raise e
+                raise server_version
             yield f' · API Server Version : {server_version}'
@@ -1,7 +1,9 @@
 import click
-from mlad.cli import install
+from mlad.cli.libs import lazy_import
 from . import echo_exception
 
+install = lazy_import('mlad.cli.install')
+
 
 @click.command()
 @echo_exception
@@ -1,9 +1,25 @@
 import sys
 import click
+import importlib.util
 
+from types import ModuleType
 from click import command, option, Option, UsageError
 
 
+def lazy_import(name: str) -> ModuleType:
+    '''Returns a module which is executed when one of its attributes is first accessed.'''
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    spec = importlib.util.find_spec(name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
 class MutuallyExclusiveOption(Option):
     def __init__(self, *args, **kwargs):
         self.mutually_exclusive = set(kwargs.pop('mutually_exclusive', []))
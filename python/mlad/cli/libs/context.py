@@ -0,0 +1,158 @@
+'''Streams a docker build context without writing it to the disk.
+
+A producer thread writes the tar archive into a bounded queue that the build request
+consumes as a chunked body, so the daemon starts receiving the context while the
+workspace is still being archived. Small files are read ahead by a pool of threads
+to overlap the file I/O with the archiving.
+'''
+import io
+import os
+import zlib
+import queue
+import tarfile
+import threading
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, Optional, Tuple
+
+CHUNK_SIZE = 256 * 1024
+QUEUE_SIZE = 16
+READ_AHEAD_FILES = 32
+READ_AHEAD_FILE_SIZE = 1024 * 1024
+READ_AHEAD_WORKERS = 4
+GZIP_LEVEL = 1
+
+
+class _Cancelled(Exception):
+    pass
+
+
+class _QueueWriter(io.RawIOBase):
+    '''File object handing the written bytes to the consumer in chunks.'''
+
+    def __init__(self, chunks: queue.Queue, cancelled: threading.Event, compress: bool):
+        self._chunks = chunks
+        self._cancelled = cancelled
+        self._buffer = bytearray()
+        # wbits 31 writes a gzip header and trailer.
+        self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31) if compress else None
+
+    def writable(self):
+        return True
+
+    def _put(self, item):
+        while True:
+            if self._cancelled.is_set():
+                raise _Cancelled
+            try:
+                self._chunks.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def write(self, data) -> int:
+        size = len(data)
+        if self._compressor is not None:
+            data = self._compressor.compress(data)
+        self._buffer += data
+        if len(self._buffer) >= CHUNK_SIZE:
+            self._put(bytes(self._buffer))
+            self._buffer.clear()
+        return size
+
+    def finish(self):
+        if self._compressor is not None:
+            self._buffer += self._compressor.flush()
+        if self._buffer:
+            self._put(bytes(self._buffer))
+            self._buffer.clear()
+
+
+def _read(path: str) -> bytes:
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def _read_ahead(executor: ThreadPoolExecutor,
+                files: Iterable[Tuple[str, str]]) -> Iterator[Tuple[str, str, Optional[bytes]]]:
+    '''Yields the files in order with the contents of the small ones already read.'''
+    pending = deque()
+    for name, arcname in files:
+        try:
+            small = os.lstat(name).st_size <= READ_AHEAD_FILE_SIZE
+        except OSError:
+            small = False
+        pending.append((name, arcname, executor.submit(_read, name) if small else None))
+        if len(pending) >= READ_AHEAD_FILES:
+            yield _resolve(*pending.popleft())
+    while pending:
+        yield _resolve(*pending.popleft())
+
+
+def _resolve(name, arcname, future):
+    if future is None:
+        return name, arcname, None
+    try:
+        return name, arcname, future.result()
+    except OSError:
+        # Let tarfile report the error of the file, e.g. a dangling symlink.
+        return name, arcname, None
+
+
+def _produce(files, dockerfile: Tuple[str, bytes], writer: _QueueWriter):
+    with ThreadPoolExecutor(READ_AHEAD_WORKERS, thread_name_prefix='mlad-context') as executor:
+        with tarfile.open(fileobj=writer, mode='w|') as tar:
+            for name, arcname, data in _read_ahead(executor, files):
+                tarinfo = tar.gettarinfo(name, arcname)
+                if not tarinfo.isreg():
+                    tar.addfile(tarinfo)
+                elif data is not None and tarinfo.size == len(data):
+                    tar.addfile(tarinfo, io.BytesIO(data))
+                else:
+                    with open(name, 'rb') as f:
+                        tar.addfile(tarinfo, f)
+            dockerfile_info = tarfile.TarInfo(dockerfile[0])
+            dockerfile_info.size = len(dockerfile[1])
+            tar.addfile(dockerfile_info, io.BytesIO(dockerfile[1]))
+    writer.finish()
+
+
+def stream_context(files: Iterable[Tuple[str, str]], dockerfile: Tuple[str, bytes],
+                   compress: bool = False) -> Iterator[bytes]:
+    '''Yields the tar archive of the (path, arcname) files and the dockerfile in chunks.
+
+    The archive is gzip compressed when compress is set, e.g. for a remote docker daemon.
+    '''
+    chunks = queue.Queue(QUEUE_SIZE)
+    cancelled = threading.Event()
+    done = object()
+    errors = []
+
+    def target():
+        try:
+            _produce(files, dockerfile, _QueueWriter(chunks, cancelled, compress))
+        except _Cancelled:
+            return
+        except BaseException as e:
+            errors.append(e)
+        while not cancelled.is_set():
+            try:
+                chunks.put(done, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    producer = threading.Thread(target=target, name='mlad-context-producer', daemon=True)
+    producer.start()
+    try:
+        while True:
+            chunk = chunks.get()
+            if chunk is done:
+                break
+            yield chunk
+        if errors:
+            raise errors[0]
+    finally:
+        cancelled.set()
+        producer.join()
@@ -0,0 +1,85 @@
+'''Content addressed digests of build contexts.
+
+A manifest per project under ~/.mlad/context records the size, mtime and hash of every
+file of the last build context, so only the files changed since then are hashed again.
+The digest of the context, the dockerfile and the image labels is stored as a label of
+the built image, and a build whose digest matches the existing image can be skipped.
+'''
+import os
+import json
+import hashlib
+import tempfile
+
+from typing import Dict, List, Tuple
+
+from mlad.cli.config import MLAD_HOME_PATH
+
+CONTEXT_CACHE_PATH = f'{MLAD_HOME_PATH}/context'
+HASH_BLOCK_SIZE = 1024 * 1024
+
+Manifest = Dict
+
+
+def _manifest_path(project_key: str) -> str:
+    return f'{CONTEXT_CACHE_PATH}/{project_key}.json'
+
+
+def load_manifest(project_key: str) -> Manifest:
+    try:
+        with open(_manifest_path(project_key)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = {}
+    manifest.setdefault('files', {})
+    return manifest
+
+
+def save_manifest(project_key: str, manifest: Manifest):
+    os.makedirs(CONTEXT_CACHE_PATH, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(suffix='.json', dir=CONTEXT_CACHE_PATH)
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(manifest, f)
+        os.replace(temp_path, _manifest_path(project_key))
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+def _hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    if os.path.islink(path):
+        digest.update(os.readlink(path).encode())
+    else:
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def update_manifest(manifest: Manifest, files: List[Tuple[str, str]],
+                    dockerfile: str, labels: Dict[str, str]) -> str:
+    '''Updates the manifest with the (path, arcname) files and returns the context digest.'''
+    cached = manifest['files']
+    entries = {}
+    for path, arcname in files:
+        stat = os.lstat(path)
+        entry = cached.get(arcname)
+        # Only the files changed since the last build are hashed again.
+        if entry is None or entry[:2] != [stat.st_size, stat.st_mtime_ns]:
+            file_hash = _hash_file(path)
+        else:
+            file_hash = entry[2]
+        entries[arcname] = [stat.st_size, stat.st_mtime_ns, file_hash, stat.st_mode]
+
+    digest = hashlib.sha256()
+    for arcname in sorted(entries):
+        _, _, file_hash, mode = entries[arcname]
+        digest.update(f'{arcname}\0{file_hash}\0{mode:o}\n'.encode())
+    manifest['dockerfile'] = hashlib.sha256(dockerfile.encode()).hexdigest()
+    digest.update(f"dockerfile\0{manifest['dockerfile']}\n".encode())
+    digest.update(json.dumps(labels, sort_keys=True).encode())
+
+    manifest['files'] = entries
+    manifest['digest'] = digest.hexdigest()
+    return manifest['digest']
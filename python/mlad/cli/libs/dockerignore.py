@@ -0,0 +1,124 @@
+'''Compiled matcher of .dockerignore patterns.
+
+Patterns follow the rules of the docker daemon. They are matched against paths relative
+to the context root, `*` and `?` do not cross a path separator, `**` matches any number
+of directories and a pattern also matches everything below a matching directory. A
+pattern starting with `!` re-includes paths and the last matching pattern wins.
+
+Consecutive patterns of the same kind are compiled into one regular expression, so a
+path is tested with one match per group instead of per pattern. Ignored directories are
+pruned without being walked unless an exception pattern may re-include a path below.
+'''
+import os
+import re
+import posixpath
+
+from typing import Iterator, List, Optional, Tuple
+
+
+def _translate(pattern: str) -> str:
+    i, n = 0, len(pattern)
+    regex = ''
+    while i < n:
+        c = pattern[i]
+        i += 1
+        if c == '*':
+            if i < n and pattern[i] == '*':
+                i += 1
+                if i < n and pattern[i] == '/':
+                    i += 1
+                    regex += '(?:.*/)?'
+                else:
+                    regex += '.*'
+            else:
+                regex += '[^/]*'
+        elif c == '?':
+            regex += '[^/]'
+        elif c == '[':
+            j = pattern.find(']', i + 1 if i < n and pattern[i] in '^!' else i)
+            if j < 0:
+                regex += re.escape(c)
+            else:
+                body = pattern[i:j]
+                negate = body[:1] in ('^', '!')
+                body = ''.join(_ if _ == '-' else re.escape(_) for _ in body[negate:])
+                regex += f'[{"^" if negate else ""}{body}]'
+                i = j + 1
+        elif c == '\\' and i < n:
+            regex += re.escape(pattern[i])
+            i += 1
+        else:
+            regex += re.escape(c)
+    return regex
+
+
+def _clean(pattern: str) -> Optional[str]:
+    pattern = posixpath.normpath(pattern.strip().replace(os.sep, '/')).lstrip('/')
+    return pattern if pattern not in ('', '.') else None
+
+
+class IgnoreMatcher:
+    def __init__(self, patterns: List[str]):
+        rules: List[Tuple[bool, str]] = []
+        for line in patterns:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            exclusion = line.startswith('!')
+            pattern = _clean(line[1:] if exclusion else line)
+            if pattern is not None:
+                rules.append((exclusion, pattern))
+
+        groups: List[Tuple[bool, List[str]]] = []
+        for exclusion, pattern in rules:
+            if groups and groups[-1][0] == exclusion:
+                groups[-1][1].append(pattern)
+            else:
+                groups.append((exclusion, [pattern]))
+        # One regex per group of consecutive patterns of the same kind, last group first.
+        self._groups = [
+            (exclusion, re.compile(
+                '(?:' + '|'.join(_translate(_) for _ in group) + ')(?:/.*)?\\Z', re.S))
+            for exclusion, group in reversed(groups)
+        ]
+        # Path components of the exception patterns, None for a component with `**`.
+        self._exclusions = [
+            [None if '**' in part else re.compile(_translate(part) + '\\Z', re.S)
+             for part in pattern.split('/')]
+            for exclusion, pattern in rules if exclusion
+        ]
+
+    def ignored(self, path: str) -> bool:
+        '''Checks the slash separated path relative to the context root.'''
+        for exclusion, regex in self._groups:
+            if regex.match(path):
+                return not exclusion
+        return False
+
+    def _may_include_below(self, path: str) -> bool:
+        parts = path.split('/')
+        for pattern in self._exclusions:
+            for part, regex in zip(parts, pattern):
+                if regex is None:
+                    return True
+                if not regex.match(part):
+                    break
+            else:
+                if len(pattern) > len(parts) or pattern[-1] is None:
+                    return True
+        return False
+
+    def prunable(self, path: str) -> bool:
+        '''Checks if nothing below the directory can be included.'''
+        return self.ignored(path) and not self._may_include_below(path)
+
+    def walk(self, root: str = '.') -> Iterator[Tuple[str, str]]:
+        '''Yields the (path, arcname) of the files in the context which are not ignored.'''
+        for dirpath, dirs, files in os.walk(root):
+            reldir = os.path.relpath(dirpath, root).replace(os.sep, '/')
+            prefix = '' if reldir == '.' else f'{reldir}/'
+            for name in files:
+                arcname = prefix + name
+                if not self.ignored(arcname):
+                    yield os.path.join(dirpath, name), arcname
+            dirs[:] = [name for name in dirs if not self.prunable(prefix + name)]
@@ -8,7 +8,6 @@ import hashlib
 import itertools
 import subprocess
 
-import jwt
 import yaml
 
 from typing import Dict, Optional, List, Any
@@ -170,6 +169,7 @@ def prompt(msg, default='', ty=str):
 
 @lru_cache(maxsize=None)
 def get_username(session):
+    import jwt
     decoded = jwt.decode(session, "mlad", algorithms="HS256")
     if decoded["user"]:
         return decoded["user"]
@@ -179,6 +179,7 @@ def get_username(session):
 
 @lru_cache(maxsize=None)
 def get_hostname(session):
+    import jwt
     decoded = jwt.decode(session, "mlad", algorithms="HS256")
     if decoded["hostname"]:
         return decoded["hostname"]
@@ -1,8 +1,10 @@
 import click
-from mlad.cli import node
+from mlad.cli.libs import lazy_import
 from . import echo_exception
 from mlad.cli.autocompletion import list_node_names
 
+node = lazy_import('mlad.cli.node')
+
 
 @click.command()
 @click.option('--no-trunc', is_flag=True, help='Don\'t truncate output.')
@@ -4,6 +4,7 @@ import json
 import copy
 import socket
 import time
+import asyncio
 
 from datetime import datetime
 from typing import Optional, List, Dict, Tuple, Union
@@ -25,9 +26,11 @@ from mlad.cli.exceptions import (
     MountPortAlreadyUsedError, InvalidDependsError
 )
 from mlad.core.docker import controller as docker_ctlr
+from mlad.core.exceptions import NFSServerNotReadyError, NFSPortConflictError
 from mlad.core.libs.constants import CONFIG_ENVS, MLAD_PROJECT, MLAD_PROJECT_IMAGE
 
 from mlad.api import API
+from mlad.api.aio import AsyncAPI
 from mlad.api.exceptions import ProjectNotFound, InvalidLogRequest, NotFound
 
 
@@ -124,10 +127,16 @@ def export(file: Optional[str], target_directory: Optional[str]):
 
 
 def ls(no_trunc: bool):
+    async def _fetch():
+        async with AsyncAPI() as api:
+            project_specs, app_specs, metrics_server_running = await asyncio.gather(
+                api.project.get(), api.app.get(), api.check.check_metrics_server())
+            resources = await asyncio.gather(*[
+                api.project.resource(spec['key'], no_trunc=no_trunc) for spec in project_specs])
+        return project_specs, app_specs['specs'], metrics_server_running, resources
+
     projects = {}
-    project_specs = API.project.get()
-    app_specs = API.app.get()['specs']
-    metrics_server_running = API.check.check_metrics_server()
+    project_specs, app_specs, metrics_server_running, resources = asyncio.run(_fetch())
 
     if not metrics_server_running:
         yield f'{utils.info_msg("Warning: Metrics server must be installed to load resource information. Please contact the admin.")}'
@@ -135,7 +144,7 @@ def ls(no_trunc: bool):
     columns = [('USERNAME', 'PROJECT', 'KEY', 'APPS',
                 'TASKS', 'HOSTNAME', 'WORKSPACE', 'AGE',
                 'MEM(Mi)', 'CPU', 'GPU')]
-    for spec in project_specs:
+    for spec, resource in zip(project_specs, resources):
         project_key = spec['key']
         default = {
             'username': spec['username'],
@@ -160,7 +169,6 @@ def ls(no_trunc: bool):
             projects[project_key]['replicas'] += spec['replicas']
             projects[project_key]['tasks'] += tasks_state.count('Running')
 
-        resource = API.project.resource(project_key, no_trunc=no_trunc)
         projects[project_key].update(resource)
 
     for project in projects.values():
@@ -180,15 +188,20 @@ def status(file: Optional[str], project_key: Optional[str], no_trunc: bool, even
     if project_key is None:
         project_key = utils.workspace_key()
 
+    async def _fetch():
+        async with AsyncAPI() as api:
+            project, apps, metrics_server_running = await asyncio.gather(
+                api.project.inspect(project_key=project_key), api.app.get(project_key),
+                api.check.check_metrics_server())
+            if 'deleted' in project and project['deleted']:
+                raise ProjectDeletedError(project['key'])
+            resources = await api.project.resource(project_key, group_by='app', no_trunc=no_trunc) \
+                if metrics_server_running else {}
+        return project, apps['specs'], metrics_server_running, resources
+
     # Raise exception if the target project is not found.
     try:
-        project = API.project.inspect(project_key=project_key)
-        if 'deleted' in project and project['deleted']:
-            raise ProjectDeletedError(project['key'])
-        apps = API.app.get(project_key)['specs']
-        metrics_server_running = API.check.check_metrics_server()
-        resources = API.project.resource(project_key, group_by='app', no_trunc=no_trunc) \
-            if metrics_server_running else {}
+        project, apps, metrics_server_running, resources = asyncio.run(_fetch())
     except NotFound as e:
         raise e
 
@@ -295,7 +308,7 @@ def check_nvidia_plugin_installed(app_spec: dict):
                                          'Please contact the admin.')
 
 
-def up(file: Optional[str]):
+def up(file: Optional[str], prepull: bool = False, dry_run: bool = False):
 
     utils.process_file(file)
     config = config_core.get()
@@ -328,6 +341,9 @@ def up(file: Optional[str]):
               if image_tag in image.tags]
     if len(images) == 0:
         raise ImageNotFoundError(image_tag)
+    image_digest = _get_image_digest(images[0], image_tag)
+    if image_digest is None:
+        yield f'{utils.info_msg(f"Warning: Image [{image_tag}] is not pushed, the apps will pull it by the tag.")}'
 
     # check ingress controller
     ingress_ctrl_running = API.check.check_ingress_controller()
@@ -336,6 +352,7 @@ def up(file: Optional[str]):
 
     # Check app specs
     app_specs = []
+    nfs_exports = docker_ctlr.get_nfs_exports()
     app_dict = project.get('app', dict())
     for name, app_spec in app_dict.items():
         check_nvidia_plugin_installed(app_spec)
@@ -344,11 +361,16 @@ def up(file: Optional[str]):
             yield warning_msg
         app_spec['name'] = name
         app_spec = _convert_tag_only_image_prop(app_spec, image_tag)
-        app_spec = _bind_default_values_for_mounts(app_spec, app_specs, images[0])
+        app_spec = _pin_image_digest(app_spec, image_tag, image_digest)
+        app_spec = _bind_default_values_for_mounts(app_spec, app_specs, images[0], nfs_exports)
         app_specs.append(app_spec)
 
     _validate_depends(app_specs)
 
+    if dry_run:
+        yield from _print_placements(app_specs)
+        return
+
     # Create a project
     yield 'Deploy apps to the cluster...'
     credential = docker_ctlr.obtain_credential()
@@ -360,20 +382,19 @@ def up(file: Optional[str]):
             break
 
     try:
-        # Run NFS server containers
-        for app_spec in app_specs:
-            for mount in app_spec.get('mounts', []):
-                if 'nfs' in mount:
-                    continue
-                path = mount['path']
-                port = _find_port_from_mount_options(mount)
-                yield 'Run NFS server container'
-                yield f'  Path: {path}'
-                yield f'  Port: {port}'
-                try:
-                    docker_ctlr.run_nfs_container(project_key, path, port)
-                except docker.errors.APIError as e:
-                    raise MountError(str(e))
+        # Run NFS server containers shared with other projects
+        exports = _obtain_nfs_exports(app_specs)
+        if exports:
+            yield 'Run NFS server containers'
+            for path, port in exports.items():
+                yield f'  Path: {path}, Port: {port}'
+            try:
+                docker_ctlr.acquire_nfs_exports(project_key, exports)
+            except (docker.errors.APIError, NFSServerNotReadyError, NFSPortConflictError) as e:
+                raise MountError(str(e))
+
+        if prepull:
+            yield from _prepull_images(project_key, app_specs, image_tag)
 
         yield 'Start apps...'
 
@@ -383,7 +404,7 @@ def up(file: Optional[str]):
                 pass
     except Exception as e:
         next(API.project.delete(project_key))
-        docker_ctlr.remove_nfs_containers(project_key)
+        docker_ctlr.release_nfs_exports(project_key)
         raise e
     yield 'Done.'
     yield utils.info_msg(f'Project key : {project_key}')
@@ -416,8 +437,7 @@ def down(file: Optional[str], project_key: Optional[str], dump: bool):
             if not os.path.isfile(filepath):
                 with open(filepath, 'w') as log_file:
                     yaml.dump(project, log_file)
-            for app_name in app_names:
-                yield _dump_logs(app_name, project_key, dirpath)
+            yield from _dump_logs(app_names, project_key, dirpath)
 
         # Remove the apps
         lines = API.app.remove(project_key, apps=app_names)
@@ -436,8 +456,8 @@ def down(file: Optional[str], project_key: Optional[str], dump: bool):
                 yield 'The namespace was successfully removed.'
                 break
 
-        # Remove NFS server containers
-        docker_ctlr.remove_nfs_containers(project_key)
+        # Release NFS server containers
+        docker_ctlr.release_nfs_exports(project_key)
 
     yield 'Done.'
 
@@ -464,8 +484,7 @@ def down_force(file: Optional[str], project_key: Optional[str], dump: bool):
             if not os.path.isfile(filepath):
                 with open(filepath, 'w') as log_file:
                     yaml.dump(project, log_file)
-            for app_name in app_names:
-                yield _dump_logs(app_name, project_key, dirpath)
+            yield from _dump_logs(app_names, project_key, dirpath)
 
         # Remove the apps
         k8s_cli = config_core.get_admin_k8s_cli(k8s_ctlr)
@@ -504,6 +523,9 @@ def down_force(file: Optional[str], project_key: Optional[str], dump: bool):
             if 'result' in line and line['result'] == 'succeed':
                 yield 'The namespace was successfully removed.'
                 break
+
+        # Release NFS server containers
+        docker_ctlr.release_nfs_exports(project_key)
     yield 'Done.'
 
 
@@ -515,12 +537,12 @@ def _get_log_dirpath(project: Dict, project_key_assigned: bool) -> Path:
     return path
 
 
-def _dump_logs(app_name: str, project_key: str, dirpath: Path):
+async def _dump_app_logs(api: AsyncAPI, app_name: str, project_key: str, dirpath: Path):
     path = dirpath / f'{app_name}.log'
     with open(path, 'w') as log_file:
         try:
-            logs = API.project.log(project_key, timestamps=True, filters=[app_name])
-            for log in logs:
+            logs = api.project.log(project_key, timestamps=True, filters=[app_name])
+            async for log in logs:
                 log = _format_log(log, pretty=False) + '\n'
                 log_file.write(log)
         except InvalidLogRequest:
@@ -528,6 +550,14 @@ def _dump_logs(app_name: str, project_key: str, dirpath: Path):
     return f'The log file of app [{app_name}] saved.'
 
 
+def _dump_logs(app_names: List[str], project_key: str, dirpath: Path) -> List[str]:
+    async def _dump():
+        async with AsyncAPI() as api:
+            return await asyncio.gather(*[
+                _dump_app_logs(api, app_name, project_key, dirpath) for app_name in app_names])
+    return asyncio.run(_dump())
+
+
 def run(file: Optional[str], env: Dict[str, str], quota: Dict[str, str], command: List[str]):
     utils.process_file(file)
     config = config_core.get()
@@ -562,6 +592,7 @@ def run(file: Optional[str], env: Dict[str, str], quota: Dict[str, str], command
         'quota': quota,
         'command': command
     }
+    app_spec = _pin_image_digest(app_spec, image_tag, _get_image_digest(images[0], image_tag))
     check_nvidia_plugin_installed(app_spec)
     warning_msg = _check_config_envs(app_spec['name'], app_spec)
     if warning_msg:
@@ -622,7 +653,7 @@ def scale(file: Optional[str], project_key: Optional[str], scales: List[Tuple[st
             yield f'Cannot find app [{target_name}] in project [{project_key}].'
 
 
-def update(file: Optional[str], project_key: Optional[str]):
+def update(file: Optional[str], project_key: Optional[str], prepull: bool = False):
     utils.process_file(file)
     config = config_core.get()
     if project_key is None:
@@ -648,12 +679,21 @@ def update(file: Optional[str], project_key: Optional[str]):
     if cur_image_tag != image_tag:
         yield f'Image tag [{cur_image_tag}] and [{image_tag}] are different.'
         yield f'The base image will be updated to [{image_tag}].'
+    images = [image for image in docker_ctlr.get_images(project_key=project_key)
+              if image_tag in image.tags]
+    image_digest = _get_image_digest(images[0], image_tag) if images else None
+    deployed_images = {spec['name']: spec['image'] for spec in API.app.get(project_key)['specs']}
 
     default_update_spec = {
         'image': image_tag,
         'command': None,
         'args': None,
         'scale': 1,
+        'parallelism': None,
+        'completions': None,
+        'completionMode': None,
+        'workers': None,
+        'autoscale': None,
         'env': {
             'current': {},
             'update': {}
@@ -694,6 +734,7 @@ def update(file: Optional[str], project_key: Optional[str]):
         if 'env' in app:
             update_spec['env']['current'] = app['env']
         update_spec['name'] = name
+        update_spec = _pin_image_digest(update_spec, image_tag, image_digest)
 
         diff_keys[name] = set()
         diffs = list(diff(app, update_app))
@@ -725,8 +766,9 @@ def update(file: Optional[str], project_key: Optional[str]):
             yield utils.info_msg(f"Warning: '{name}' env {env_ignored} "
                                  'will be ignored for MLAD preferences.')
 
-        # Add an update spec if there are any changes in the app spec or image tag
-        if len(diff_keys[name]) > 0 or image_tag != cur_image_tag:
+        # Add an update spec if there are any changes in the app spec or image
+        if len(diff_keys[name]) > 0 or image_tag != cur_image_tag or \
+                update_spec['image'] != deployed_images.get(name, update_spec['image']):
             update_specs.append(update_spec)
 
     for name, keys in diff_keys.items():
@@ -734,12 +776,53 @@ def update(file: Optional[str], project_key: Optional[str]):
             yield f'Update {list(keys)} for app "{name}"...'
 
     if len(update_specs) > 0:
+        if prepull:
+            targets = [{**update_apps[spec['name']], 'image': spec['image']} for spec in update_specs]
+            yield from _prepull_images(project_key, targets, image_tag)
         API.project.update(project_key, project, update_specs)
         yield 'Done.'
     else:
         yield 'No changes to update.'
 
 
+def _print_placements(app_specs: List[Dict]):
+    placements = API.node.placement(app_specs)
+    yield 'Placement of the apps (dry run):'
+    for spec in app_specs:
+        name = spec['name']
+        if name not in placements:
+            yield f'  [{name}] Scheduled by the cluster.'
+            continue
+        nodes = ', '.join(f'{node} x{pods}' for node, pods in placements[name]['nodes'].items())
+        yield f'  [{name}] {nodes or "-"}'
+        if placements[name]['unplaced'] > 0:
+            yield utils.info_msg(
+                f"Warning: {placements[name]['unplaced']} pods of the app [{name}] do not fit any node now.")
+
+
+def _prepull_images(project_key: str, app_specs: List[Dict], image_tag: str):
+    # The images are warmed per group of the apps placed by the same constraints.
+    groups = defaultdict(set)
+    for app_spec in app_specs:
+        constraints = json.dumps(app_spec.get('constraints'), sort_keys=True)
+        groups[constraints].add(app_spec.get('image') or image_tag)
+    for constraints, images in groups.items():
+        for line in API.project.prepull(project_key, sorted(images), json.loads(constraints)):
+            if 'stream' in line:
+                yield line['stream'].rstrip('\n')
+
+
+def _get_image_digest(image, image_tag) -> Optional[str]:
+    return docker_ctlr.get_repo_digest(image, image_tag.rsplit(':', 1)[0])
+
+
+def _pin_image_digest(app_spec, image_tag, image_digest):
+    # The apps of the project image run the pushed image by its digest.
+    if image_digest is not None and app_spec.get('image', image_tag) == image_tag:
+        app_spec['image'] = image_digest
+    return app_spec
+
+
 def _convert_tag_only_image_prop(app_spec, image_tag):
     if 'image' in app_spec and app_spec['image'].startswith(':'):
         app_spec['image'] = image_tag.rsplit(':', 1)[0] + app_spec['image']
@@ -767,7 +850,12 @@ def _find_port_from_mount_options(mount) -> Optional[str]:
     return None
 
 
-def _bind_default_values_for_mounts(app_spec, app_specs, image):
+def _obtain_nfs_exports(app_specs) -> Dict[str, str]:
+    return {os.path.realpath(mount['path']): _find_port_from_mount_options(mount)
+            for spec in app_specs for mount in spec.get('mounts', []) if 'nfs' not in mount}
+
+
+def _bind_default_values_for_mounts(app_spec, app_specs, image, nfs_exports=None):
     if 'mounts' not in app_spec:
         return app_spec
 
@@ -778,6 +866,8 @@ def _bind_default_values_for_mounts(app_spec, app_specs, image):
             if port is not None:
                 used_ports.add(port)
 
+    exports = {**(nfs_exports or {}), **_obtain_nfs_exports(app_specs)}
+    used_ports.update(exports.values())
     ip = utils.obtain_my_ip()
     for mount in app_spec['mounts']:
         # Set the server and server path
@@ -797,7 +887,14 @@ def _bind_default_values_for_mounts(app_spec, app_specs, image):
         # Set the options
         if 'nfs' not in mount:
             registered_port = _find_port_from_mount_options(mount)
-            if registered_port is not None and registered_port in used_ports:
+            # The mounts of the same path share the NFS server of the path.
+            shared_port = exports.get(os.path.realpath(mount['path']))
+            if shared_port is not None:
+                if registered_port is None:
+                    mount['options'].append(f'port={shared_port}')
+                elif registered_port != shared_port:
+                    raise MountError(str(NFSPortConflictError(mount['path'], shared_port)))
+            elif registered_port is not None and registered_port in used_ports:
                 raise MountPortAlreadyUsedError(registered_port)
             elif registered_port is None:
                 free_port = _find_free_port(used_ports)
@@ -805,6 +902,7 @@ def _bind_default_values_for_mounts(app_spec, app_specs, image):
                 mount['options'].append(f'port={free_port}')
             else:
                 used_ports.add(registered_port)
+            exports[os.path.realpath(mount['path'])] = _find_port_from_mount_options(mount)
 
     return app_spec
 
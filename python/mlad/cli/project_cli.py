@@ -1,12 +1,14 @@
 import getpass
 import click
 from typing import Optional, List, Union
-from mlad.cli import project, config
-from mlad.cli.libs import utils, MutuallyExclusiveOption
+from mlad.cli.libs import utils, MutuallyExclusiveOption, lazy_import
 from mlad.cli.autocompletion import list_project_keys
 
 from . import echo_exception
 
+project = lazy_import('mlad.cli.project')
+config = lazy_import('mlad.cli.config')
+
 
 @click.command()
 @click.option('--name', '-n', help='Project name.')
@@ -97,10 +99,12 @@ def ingress():
     'Specify an alternate project file.\t\t\t\n'
     f'Same as {utils.PROJECT_FILE_ENV_KEY} in environment variable.')
 )
+@click.option('--prepull', is_flag=True, help='Pull the images on the nodes before running the apps.')
+@click.option('--dry-run', is_flag=True, help='Print the placement of the apps without deploying.')
 @echo_exception
-def up(file: Optional[str]):
+def up(file: Optional[str], prepull: bool, dry_run: bool):
     '''Deploy and run a project on the cluster.'''
-    for line in project.up(file):
+    for line in project.up(file, prepull, dry_run):
         click.echo(line)
 
 
@@ -133,11 +137,12 @@ def down(file: Optional[str], project_key: Optional[str], dump: bool):
 @click.option('--project-key', '-k', help='Project Key\t\t\t\t\t', default=None,
               cls=MutuallyExclusiveOption, mutually_exclusive=['file'],
               autocompletion=list_project_keys)
+@click.option('--prepull', is_flag=True, help='Pull the images on the nodes before updating the apps.')
 @echo_exception
-def update(file: Optional[str], project_key: Optional[str]):
+def update(file: Optional[str], project_key: Optional[str], prepull: bool):
     '''Update deployed apps with updated project file.\n
     Valid options for update: [image, command, args, scale, env, quota]'''
-    for line in project.update(file, project_key):
+    for line in project.update(file, project_key, prepull):
         click.echo(line)
 
 
@@ -1,7 +1,9 @@
 import click
-from mlad.cli import quota
+from mlad.cli.libs import lazy_import
 from . import echo_exception
 
+quota = lazy_import('mlad.cli.quota')
+
 
 @click.command('set-default')
 @click.option('--cpu', required=True, type=float, help='Set default cpu quota limits.')
@@ -1,27 +1,86 @@
 #!/home/onetop21/base3.7/bin/python
 import os
+import re
+import copy
+import pickle
+import hashlib
+import tempfile
+
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Tuple
 
 from cerberus.validator import DocumentError
 from cerberus_kind.utils import parse_error
-from cerberus_document_editor import yaml_parser
 
+from mlad.cli.config import MLAD_HOME_PATH
 from mlad.cli.validator.yaml_validator import Validator
 from mlad.cli.validator.exceptions import InvalidProjectYaml
 
 
 SCHEMA_PATH = os.path.dirname(os.path.abspath(__file__))
+SCHEMA_CACHE_PATH = f'{MLAD_HOME_PATH}/cache'
+MAX_CACHED_RESULTS = 32
 
+_ENV_PATTERN = re.compile(r'\$\{([\w.-]+)')
+# Normalized documents keyed by the schema key and the hash of the document.
+_results: Dict[Tuple[str, str], Dict] = OrderedDict()
 
-def validate(target):
+
+def _schema_key(text: str) -> str:
+    # Environment variables interpolated by the YAML parser change the parsed schema.
+    digest = hashlib.sha256(text.encode())
+    for name in sorted(set(_ENV_PATTERN.findall(text))):
+        digest.update(f'\0{name}={os.environ.get(name)!r}'.encode())
+    return digest.hexdigest()
+
+
+def _load_schema(key: str, text: str) -> Dict:
+    cache_path = f'{SCHEMA_CACHE_PATH}/schema-{key}.pickle'
+    try:
+        with open(cache_path, 'rb') as f:
+            return pickle.load(f)
+    except Exception:
+        pass
+
+    # Importing the editor package is the most expensive part of a validation.
+    from cerberus_document_editor import yaml_parser
+    schema = yaml_parser.load(text)
+    try:
+        os.makedirs(SCHEMA_CACHE_PATH, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(suffix='.pickle', dir=SCHEMA_CACHE_PATH)
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(schema, f)
+        os.replace(temp_path, cache_path)
+    except OSError:
+        pass
+    return schema
+
+
+@lru_cache(maxsize=None)
+def _compile() -> Tuple[str, Validator]:
     with open(f'{SCHEMA_PATH}/schema.yaml') as f:
-        schema = yaml_parser.load(f)
-    v = Validator(schema)
+        text = f.read()
+    key = _schema_key(text)
+    return key, Validator(_load_schema(key, text))
+
+
+def validate(target):
+    schema_key, v = _compile()
+    key = (schema_key, hashlib.sha256(pickle.dumps(target)).hexdigest())
+    if key in _results:
+        return copy.deepcopy(_results[key])
+
     try:
         res = v.validate(target)
     except DocumentError as e:
         raise InvalidProjectYaml(str(e))
 
     if res:
-        return v.normalized_by_order(target)
+        normalized = v.normalized_by_order(target)
+        _results[key] = copy.deepcopy(normalized)
+        if len(_results) > MAX_CACHED_RESULTS:
+            _results.popitem(last=False)
+        return normalized
     else:
         raise InvalidProjectYaml(parse_error(v.errors, with_path=True))
@@ -16,5 +16,38 @@ service_config = {
         'host': os.environ.get('HOST', '0.0.0.0'),
         'port': int(os.environ.get('PORT', 8440)),
         'debug': bool(strtobool(os.environ.get('DEBUG', 'True'))),
+        'workers': int(os.environ.get('WORKERS', 1)),
+    },
+    'cache': {
+        'socket': os.environ.get('CACHE_SOCKET', '/tmp/mlad-cache.sock'),
+        'ttl': float(os.environ.get('CACHE_TTL', 1)),
+    },
+    'operation': {
+        'workers': int(os.environ.get('OPERATION_WORKERS', 8)),
+        'ttl': int(os.environ.get('OPERATION_TTL', 3600)),
+    },
+    'dependency': {
+        'image': os.environ.get('DEPENDENCY_WAITER_IMAGE', 'curlimages/curl:7.85.0'),
+        'timeout': int(os.environ.get('DEPENDENCY_WAIT_TIMEOUT', 60)),
+        'retries': int(os.environ.get('DEPENDENCY_WAIT_RETRIES', 60)),
+    },
+    'dataset_cache': {
+        'root': os.environ.get('DATASET_CACHE_ROOT', '/var/lib/mlad/datasets'),
+        'capacity': os.environ.get('DATASET_CACHE_CAPACITY', '100Gi'),
+        'image': os.environ.get('DATASET_CACHE_IMAGE', 'busybox:1.35'),
+    },
+    'ratelimit': {
+        'read': {
+            'rate': float(os.environ.get('RATELIMIT_READ_QPS', 50)),
+            'burst': int(os.environ.get('RATELIMIT_READ_BURST', 100)),
+            'session_rate': float(os.environ.get('RATELIMIT_SESSION_READ_QPS', 20)),
+            'session_burst': int(os.environ.get('RATELIMIT_SESSION_READ_BURST', 40)),
+        },
+        'write': {
+            'rate': float(os.environ.get('RATELIMIT_WRITE_QPS', 20)),
+            'burst': int(os.environ.get('RATELIMIT_WRITE_BURST', 40)),
+            'session_rate': float(os.environ.get('RATELIMIT_SESSION_WRITE_QPS', 5)),
+            'session_burst': int(os.environ.get('RATELIMIT_SESSION_WRITE_BURST', 10)),
+        },
     }
 }
@@ -1,9 +1,13 @@
 import os
 import pwd
 import json
+import time
 import base64
+import socket
+import hashlib
 
-from typing import List, Optional
+from multiprocessing.pool import ThreadPool
+from typing import Dict, List, Optional, Set
 import docker
 from docker.types import Mount
 
@@ -13,11 +17,16 @@ from mlad.core.libs.constants import (
     MLAD_PROJECT_NAME, MLAD_PROJECT_WORKSPACE, MLAD_PROJECT_API_VERSION
 )
 from mlad.core.exceptions import (
-    DockerNotFoundError
+    DockerNotFoundError, NFSServerNotReadyError, NFSPortConflictError
 )
 
 
 DOCKER_API_TIMEOUT = None
+NFS_SERVER_IMAGE = 'ghcr.io/onetop21/nfs-server-alpine'
+NFS_EXPORT_LABEL = 'MLAD.NFS.EXPORT'
+NFS_PORT_LABEL = 'MLAD.NFS.PORT'
+NFS_READY_TIMEOUT = 30
+NFS_START_WORKERS = 8
 
 
 def get_cli(host=None) -> docker.client.DockerClient:
@@ -65,6 +74,14 @@ def get_images(project_key: str = None, extra_labels: List[str] = []):
     return cli.images.list(filters={'label': filters + extra_labels})
 
 
+def get_repo_digest(image: docker.models.images.Image, repository: str) -> Optional[str]:
+    # Reference of the image by the digest in the registry, only known after pushing.
+    for repo_digest in image.attrs.get('RepoDigests') or []:
+        if repo_digest.split('@', 1)[0] == repository:
+            return repo_digest
+    return None
+
+
 def inspect_image(image: docker.models.images.Image):
     return {
         # For image
@@ -84,11 +101,15 @@ def inspect_image(image: docker.models.images.Image):
     }
 
 
-def build_image(base_labels, tar, dockerfile, no_cache=False, pull=False, stream=False):
+def build_image(base_labels, tar, dockerfile, no_cache=False, pull=False, stream=False,
+                compress=False, buildkit=False):
+    # The tar can be a file object or an iterator of chunks sent with chunked encoding.
     cli = get_cli()
     latest_name = base_labels[MLAD_PROJECT_IMAGE]
     headers = _get_auth_headers()
     headers['content-type'] = 'application/x-tar'
+    if compress:
+        headers['Content-Encoding'] = 'gzip'
 
     params = {
         'dockerfile': dockerfile,
@@ -98,11 +119,16 @@ def build_image(base_labels, tar, dockerfile, no_cache=False, pull=False, stream
         'nocache': no_cache,
         'pull': pull
     }
+    # BuildKit is selected with the builder version since API 1.38.
+    api_version = 'v1.24'
+    if buildkit:
+        params['version'] = '2'
+        api_version = 'v1.38'
     host = utils.get_requests_host(cli)
 
     def _request_build(headers, params, tar):
         import requests_unixsocket
-        with requests_unixsocket.post(f"{host}/v1.24/build", headers=headers, params=params, data=tar, stream=True) as resp:
+        with requests_unixsocket.post(f"{host}/{api_version}/build", headers=headers, params=params, data=tar, stream=True) as resp:
             for _ in resp.iter_lines(decode_unicode=True):
                 line = json.loads(_ or '{}')
                 yield line
@@ -142,33 +168,142 @@ def prune_images(project_key: Optional[str] = None):
     return cli.images.prune(filters={'label': filters, 'dangling': True})
 
 
-def run_nfs_container(project_key: str, path: str, port: str):
+def _nfs_export_id(path: str) -> str:
+    return hashlib.sha256(os.path.realpath(path).encode()).hexdigest()[:16]
+
+
+def _list_nfs_servers(cli: docker.client.DockerClient) -> List[docker.models.containers.Container]:
+    return cli.containers.list(filters={'label': [NFS_EXPORT_LABEL, 'role=nfs-server']}, all=True)
+
+
+def _list_nfs_claimed_paths(cli: docker.client.DockerClient) -> Set[str]:
+    return {claim.attrs['Labels'][NFS_EXPORT_LABEL]
+            for claim in cli.volumes.list(filters={'label': 'role=nfs-claim'})}
+
+
+def get_nfs_exports() -> Dict[str, str]:
+    '''Returns the ports of the shared NFS servers by the exported host paths.'''
     cli = get_cli()
+    return {container.labels[NFS_EXPORT_LABEL]: container.labels[NFS_PORT_LABEL]
+            for container in _list_nfs_servers(cli)}
+
+
+def _wait_nfs_server(container: docker.models.containers.Container, port: str):
+    deadline = time.monotonic() + NFS_READY_TIMEOUT
+    while True:
+        container.reload()
+        if container.status in ('exited', 'dead'):
+            raise NFSServerNotReadyError(container.labels[NFS_EXPORT_LABEL],
+                                         container.logs(tail=10).decode())
+        try:
+            with socket.create_connection(('localhost', int(port)), timeout=1):
+                return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise NFSServerNotReadyError(container.labels[NFS_EXPORT_LABEL], 'Timed out.')
+            time.sleep(0.5)
+
+
+def _run_nfs_server(cli: docker.client.DockerClient, path: str, port: str):
+    name = f'mlad-nfs-{_nfs_export_id(path)}'
     pwuid = pwd.getpwuid(os.getuid())
     uid = pwuid.pw_uid
     gid = pwuid.pw_gid
-    cli.containers.run(
-        'ghcr.io/onetop21/nfs-server-alpine',
-        privileged=True,
-        environment=[
-            'SHARED_DIRECTORY=/shared',
-            'SQUASH=1',
-            f'ANONUID={uid}',
-            f'ANONGID={gid}'
-        ],
-        ports={'2049/tcp': port},
-        mounts=[Mount(source=path, target='/shared', type='bind')],
-        detach=True,
-        labels={
-            MLAD_PROJECT: project_key,
-            'role': 'nfs-server'
-        },
-        restart_policy={'Name': 'always'}
-    )
-
-
-def remove_nfs_containers(project_key: str):
+    try:
+        container = cli.containers.run(
+            NFS_SERVER_IMAGE,
+            name=name,
+            privileged=True,
+            environment=[
+                'SHARED_DIRECTORY=/shared',
+                'SQUASH=1',
+                f'ANONUID={uid}',
+                f'ANONGID={gid}'
+            ],
+            ports={'2049/tcp': port},
+            mounts=[Mount(source=path, target='/shared', type='bind')],
+            detach=True,
+            labels={
+                NFS_EXPORT_LABEL: path,
+                NFS_PORT_LABEL: port,
+                'role': 'nfs-server'
+            },
+            restart_policy={'Name': 'always'}
+        )
+    except docker.errors.APIError as e:
+        if e.status_code != 409:
+            raise
+        # Another project started the server of the path meanwhile.
+        container = cli.containers.get(name)
+        if container.labels[NFS_PORT_LABEL] != port:
+            raise NFSPortConflictError(path, container.labels[NFS_PORT_LABEL])
+        _start_nfs_server(container)
+    _wait_nfs_server(container, port)
+
+
+def _start_nfs_server(container: docker.models.containers.Container):
+    # The server stopped by the host or the docker daemon is started again.
+    if container.status in ('created', 'exited'):
+        container.start()
+
+
+def acquire_nfs_exports(project_key: str, exports: Dict[str, str]):
+    '''Shares the NFS servers of the host paths with the project.
+
+    A server is run per host path and is shared by all projects. The projects using a server
+    are counted by the claim volumes labelled with the project key, so the state survives
+    the CLI. The missing or stopped servers are started in parallel and are waited to accept
+    mounts.
+    '''
     cli = get_cli()
+    exports = {os.path.realpath(path): port for path, port in exports.items()}
+    for path in exports:
+        # The claim is made first so that a server is not torn down while being shared.
+        cli.volumes.create(
+            name=f'mlad-nfs-claim-{_nfs_export_id(path)}-{project_key}',
+            labels={NFS_EXPORT_LABEL: path, MLAD_PROJECT: project_key, 'role': 'nfs-claim'})
+    servers = {container.labels[NFS_EXPORT_LABEL]: container
+               for container in _list_nfs_servers(cli)}
+
+    def ensure(path: str, port: str):
+        container = servers.get(path)
+        if container is None or container.status == 'dead':
+            if container is not None:
+                container.remove(force=True)
+            _run_nfs_server(cli, path, port)
+            return
+        if container.labels[NFS_PORT_LABEL] != port:
+            raise NFSPortConflictError(path, container.labels[NFS_PORT_LABEL])
+        _start_nfs_server(container)
+        _wait_nfs_server(container, port)
+
+    with ThreadPool(max(min(len(exports), NFS_START_WORKERS), 1)) as pool:
+        results = [pool.apply_async(ensure, export) for export in exports.items()]
+        for result in results:
+            result.get()
+
+
+def release_nfs_exports(project_key: str):
+    '''Releases the NFS servers of the project and removes the ones no project uses.'''
+    cli = get_cli()
+    claims = cli.volumes.list(
+        filters={'label': [f'{MLAD_PROJECT}={project_key}', 'role=nfs-claim']})
+    paths = {claim.attrs['Labels'][NFS_EXPORT_LABEL] for claim in claims}
+    for claim in claims:
+        claim.remove()
+    remaining = _list_nfs_claimed_paths(cli)
+    removed = {}
+    for container in _list_nfs_servers(cli):
+        path = container.labels[NFS_EXPORT_LABEL]
+        if path in paths - remaining:
+            container.remove(force=True)
+            removed[path] = container.labels[NFS_PORT_LABEL]
+    # A project may have claimed a server and found it running while it was removed,
+    # the claims are made before the servers are listed so they are seen here.
+    for path in removed.keys() & _list_nfs_claimed_paths(cli):
+        _run_nfs_server(cli, path, removed[path])
+
+    # The servers run by the project before the servers were shared.
     containers = cli.containers.list(
         filters={'label': [f'{MLAD_PROJECT}={project_key}', 'role=nfs-server']},
         all=True)
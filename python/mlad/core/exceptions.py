@@ -2,8 +2,6 @@ import json
 from inspect import signature
 from typing import Optional, Callable
 
-from kubernetes.client.rest import ApiException
-
 
 class MLADException(Exception):
     pass
@@ -46,6 +44,7 @@ def handle_k8s_api_error(e):
 def handle_k8s_exception(obj: str, namespaced: bool = False):
     def decorator(func: Callable):
         def wrapper(*args, **kwargs):
+            from kubernetes.client.rest import ApiException
             params = list(signature(func).parameters.keys())
             name = args[params.index('name')]
             if namespaced:
@@ -108,6 +107,26 @@ class DockerNotFoundError(MLADException):
         return 'Need to install the docker daemon.'
 
 
+class NFSServerNotReadyError(MLADException):
+
+    def __init__(self, path: str, reason: str):
+        self.path = path
+        self.reason = reason
+
+    def __str__(self):
+        return f'NFS server of the path [{self.path}] is not ready.\n{self.reason}'
+
+
+class NFSPortConflictError(MLADException):
+
+    def __init__(self, path: str, port: str):
+        self.path = path
+        self.port = port
+
+    def __str__(self):
+        return f'The path [{self.path}] is already exported by the NFS server of the port [{self.port}].'
+
+
 class InvalidMetricUnitError(MLADException):
 
     def __init__(self, metric, value: str):
@@ -1,10 +1,14 @@
 import copy
+import math
+import hashlib
 import time
 import json
+import uuid
 
 from multiprocessing.pool import ThreadPool
-from typing import Union, List, Dict, Optional, Tuple, Generator, Any
+from typing import Union, List, Dict, Optional, Tuple, Generator, Any, Iterable, Container
 from collections import defaultdict
+from datetime import datetime, timedelta
 from pathlib import Path
 
 import jwt
@@ -14,12 +18,13 @@ from kubernetes.client.api_client import ApiClient
 from kubernetes.client.rest import ApiException
 
 from mlad.core import exceptions
+from mlad.core.default.config import service_config
 from mlad.core.exceptions import (
     InsufficientSessionQuotaError, NamespaceAlreadyExistError,
     DeprecatedError, InvalidAppError, InvalidMetricUnitError,
     ProjectNotFoundError, handle_k8s_exception, InvalidCronJobScheduleError
 )
-from mlad.core.libs import utils
+from mlad.core.libs import utils, ratelimit
 from mlad.core.libs.constants import (
     CONFIG_ENVS, MLAD_PROJECT, MLAD_PROJECT_API_VERSION, MLAD_PROJECT_APP, MLAD_PROJECT_APP_KIND,
     MLAD_PROJECT_APP_CONTROLLER, MLAD_PROJECT_BASE, MLAD_PROJECT_ENV, MLAD_PROJECT_HOSTNAME,
@@ -35,6 +40,170 @@ App = Union[client.V1Job, client.V1Deployment]
 LogGenerator = Generator[Dict[str, str], None, None]
 LogTuple = Tuple[Dict[str, str]]
 
+JOB_COMPLETION_INDEX_ANNOTATION = 'batch.kubernetes.io/job-completion-index'
+JOB_COMPLETION_INDEX_FIELD = f"metadata.annotations['{JOB_COMPLETION_INDEX_ANNOTATION}']"
+JOB_INDEX_PHASE_PRIORITIES = ['Succeeded', 'Running', 'Pending', 'Failed']
+HPA_DEFAULT_TARGET_CPU = 80
+PREPULL_LABEL = 'MLAD.PROJECT.PREPULL'
+PREPULL_POLL_INTERVAL = 1
+PREPULL_PENDING_REASONS = frozenset(['ContainerCreating', 'PodInitializing'])
+PREPULL_FAILED_REASONS = frozenset([
+    'ErrImagePull', 'ImagePullBackOff', 'InvalidImageName', 'ErrImageNeverPull'])
+WORKER_GATE_CONTAINER = 'worker-gate-container'
+STARTUP_PHASES = ['scheduling', 'init', 'image_pull', 'startup', 'total']
+PLACEMENT_RESOURCES = ['gpu', 'cpu', 'mem']
+PLACEMENT_PREFERRED_NODES = 3
+DEPENDENCY_WAIT_SCRIPT = '''echo "Wait for the app [{app}] to be {condition}."
+failures=0
+while true; do
+  rm -f /tmp/wait
+  status=$(curl -sS -o /tmp/wait -w '%{{http_code}}' --max-time {max_time} \\
+    "$MLAD_ADDRESS/api/v1/project/$PROJECT_KEY/app/{app}/wait?condition={condition}&timeout={timeout}")
+  if [ "$status" = 200 ]; then
+    grep -q '"satisfied":true' /tmp/wait && break
+    failures=0
+  else
+    failures=$((failures + 1))
+    echo "Failed to wait for the app [{app}] ($failures/{retries}): HTTP $status $(cat /tmp/wait 2> /dev/null)"
+    [ $failures -ge {retries} ] && exit 1
+    sleep 5
+  fi
+done
+'''
+WORKER_GATE_SCRIPT = '''deadline=$(( $(date +%s) + {timeout} ))
+i=0
+while [ $i -lt $WORLD_SIZE ]; do
+  until getent hosts "$APP-$i.$APP" > /dev/null 2>&1; do
+    if [ $(date +%s) -ge $deadline ]; then
+      echo "Timed out waiting for worker $i to be placed."
+      exit 1
+    fi
+    sleep 1
+  done
+  i=$((i + 1))
+done
+'''
+CACHE_PREFETCH_SCRIPT = '''set -e
+entry="/cache/$CACHE_KEY"
+mkdir -p /cache/.leases /cache/.manifests /cache/.reserved /cache/.retired
+size() {
+  du -sk "$@" 2> /dev/null | awk '{s += $1} END {print s + 0}'
+}
+# The API server tells which pods holding the leases are still running.
+# While it is unreachable, every pod is taken as running and no dataset is evicted.
+check_running() {
+  uids=$(for lease in /cache/.leases/*/* /cache/.retired/*/leases/* /cache/.reserved/*; do
+    [ -e "$lease" ] && echo "${lease##*/}"
+  done | sort -u)
+  query=$(for uid in $uids; do printf 'uid=%s&' "$uid"; done)
+  if ! wget -q -T 30 -O /tmp/running "$MLAD_ADDRESS/api/v1/node/pods/running?$query"; then
+    echo "Failed to check the running pods, the datasets in the cache are kept."
+    echo "$uids" > /tmp/running
+  fi
+}
+is_running() {
+  grep -qF "$1" /tmp/running
+}
+# A pod holds a lease on the datasets it mounts until it is not running anymore.
+in_use() {
+  for lease in "$1"/*; do
+    [ -e "$lease" ] || continue
+    is_running "${lease##*/}" && return 0
+    rm -f "$lease"
+  done
+  return 1
+}
+lease() {
+  mkdir -p "/cache/.leases/$CACHE_KEY"
+  touch "/cache/.leases/$CACHE_KEY/$POD_UID" "$entry"
+}
+# A stale dataset in use stays mounted by its pods until they are gone.
+retire() {
+  if in_use "/cache/.leases/$CACHE_KEY"; then
+    retired="/cache/.retired/$CACHE_KEY-$POD_UID-$(date +%s)"
+    mkdir "$retired"
+    mv "$entry" "$retired/data"
+    mv "/cache/.leases/$CACHE_KEY" "$retired/leases"
+  else
+    rm -rf "$entry" "/cache/.leases/$CACHE_KEY"
+  fi
+}
+# Evicts the least recently used datasets of all projects not in use until the dataset fits.
+reserve() {
+  check_running
+  for reserved in /cache/.reserved/*; do
+    [ -e "$reserved" ] || continue
+    is_running "${reserved##*/}" || rm -rf "$reserved" "/cache/.prefetch-${reserved##*/}"
+  done
+  for retired in /cache/.retired/*; do
+    [ -e "$retired" ] || continue
+    in_use "$retired/leases" || rm -rf "$retired"
+  done
+  # The prefetches in progress count by their reserved sizes.
+  pending=$(cat /cache/.reserved/* 2> /dev/null | awk '{s += $1} END {print s + 0}')
+  used=$(( $(size /cache) - $(size /cache/.prefetch-*) + pending ))
+  for old in $(ls -tr /cache); do
+    [ $((used + need)) -le "$CACHE_CAPACITY" ] && break
+    in_use "/cache/.leases/$old" && continue
+    used=$((used - $(size "/cache/$old")))
+    rm -rf "/cache/$old" "/cache/.leases/$old" "/cache/.manifests/$old"
+  done
+  [ $((used + need)) -le "$CACHE_CAPACITY" ] || return 1
+  echo "$need" > "/cache/.reserved/$POD_UID"
+}
+# The modification time of the dataset root tells whether the cached dataset is stale without
+# walking the dataset, so a dataset changed in its subdirectories is fetched again once its root
+# is touched.
+manifest=$(stat -c %Y /source)
+exec 9> /cache/.lock
+flock 9
+if [ -d "$entry" ] && [ "$(cat "/cache/.manifests/$CACHE_KEY" 2> /dev/null)" = "$manifest" ]; then
+  lease
+  echo hit > /dev/termination-log
+  exit 0
+fi
+flock -u 9
+need=$(size /source)
+if [ "$need" -gt "$CACHE_CAPACITY" ]; then
+  echo "Dataset of $need KiB exceeds the cache capacity of $CACHE_CAPACITY KiB." | tee /dev/termination-log
+  exit 1
+fi
+flock 9
+until reserve; do
+  echo "Wait for the datasets in use to free $need KiB of the cache."
+  flock -u 9
+  sleep 10
+  flock 9
+done
+flock -u 9
+tmp="/cache/.prefetch-$POD_UID"
+rm -rf "$tmp"
+mkdir "$tmp"
+cp -a /source/. "$tmp"
+flock 9
+rm -f "/cache/.reserved/$POD_UID"
+# Another pod on the node may have prefetched the dataset meanwhile.
+if [ -d "$entry" ] && [ "$(cat "/cache/.manifests/$CACHE_KEY" 2> /dev/null)" = "$manifest" ]; then
+  rm -rf "$tmp"
+else
+  [ -d "$entry" ] && { check_running; retire; }
+  mv "$tmp" "$entry"
+  echo "$manifest" > "/cache/.manifests/$CACHE_KEY"
+fi
+lease
+echo miss > /dev/termination-log
+'''
+
+
+class V1JobSpec(client.V1JobSpec):
+    '''V1JobSpec with the completion mode which is unknown to the kubernetes client < 20.'''
+    openapi_types = {**client.V1JobSpec.openapi_types, 'completion_mode': 'str'}
+    attribute_map = {**client.V1JobSpec.attribute_map, 'completion_mode': 'completionMode'}
+
+    def __init__(self, completion_mode: Optional[str] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.completion_mode = completion_mode
+
 
 def get_contexts(config_file: str = f'{Path.home()}/.kube/config') -> Tuple[List[Union[Dict, List, Any]], Any]:
     return config.list_kube_config_contexts(config_file)
@@ -313,6 +482,18 @@ def get_k8s_service_of_app(namespace: str, app_name: str, cli: ApiClient = DEFAU
         return service.items[0]
 
 
+def get_k8s_hpa_of_app(
+    namespace: str, app_name: str, cli: ApiClient = DEFAULT_CLI
+) -> Optional[client.V2beta2HorizontalPodAutoscaler]:
+    api = client.AutoscalingV2beta2Api(cli)
+    hpa = api.list_namespaced_horizontal_pod_autoscaler(
+        namespace, label_selector=f"{MLAD_PROJECT_APP}={app_name}")
+    if len(hpa.items) == 0:
+        return None
+    elif len(hpa.items) == 1:
+        return hpa.items[0]
+
+
 def get_app_from_controller(app_name: str, namespace: str, controller: str, cli: ApiClient = DEFAULT_CLI) -> Optional[App]:
     if controller == 'Job':
         batch_api = client.BatchV1Api(cli)
@@ -351,18 +532,130 @@ def get_app_from_kind(app_name: str, namespace: str, kind: str, cli: ApiClient =
         raise exceptions.Duplicated(f"Duplicated {kind} exists in namespace {namespace}")
 
 
-def get_pod_events(pod: client.V1Pod, cli: ApiClient = DEFAULT_CLI) -> List[Dict[str, str]]:
+def _get_k8s_pod_events(
+    namespace: str, pod_name: Optional[str] = None, cli: ApiClient = DEFAULT_CLI
+) -> Dict[str, List[client.CoreV1Event]]:
     api = client.CoreV1Api(cli)
+    field_selector = 'involvedObject.kind=Pod'
+    if pod_name is not None:
+        field_selector += f',involvedObject.name={pod_name}'
+    events = defaultdict(list)
+    for event in api.list_namespaced_event(namespace, field_selector=field_selector).items:
+        events[event.involved_object.name].append(event)
+    return events
+
+
+def _event_time(event: client.CoreV1Event):
+    return event.last_timestamp or event.event_time or event.metadata.creation_timestamp
+
+
+def obtain_pod_startup(pod: client.V1Pod, events: List[client.CoreV1Event]) -> Dict[str, Optional[float]]:
+    '''Breaks down the startup latency of the pod in seconds, None for the unknown phases.'''
+    conditions = {condition.type: condition.last_transition_time
+                  for condition in pod.status.conditions or [] if condition.status == 'True'}
+    created = pod.metadata.creation_timestamp
+    scheduled = conditions.get('PodScheduled')
+    initialized = conditions.get('Initialized')
+    started = conditions.get('ContainersReady')
+    if started is None:
+        # Completed pods are not ready anymore, so the containers tell when they started.
+        started_times = [status.state.running.started_at if status.state.running
+                         else status.state.terminated.started_at if status.state.terminated
+                         else None for status in pod.status.container_statuses or []]
+        if started_times and None not in started_times:
+            started = max(started_times)
+
+    def _seconds(start, end) -> Optional[float]:
+        return max((end - start).total_seconds(), 0.0) if start and end else None
+
+    pulling = [_event_time(event) for event in events if event.reason == 'Pulling']
+    pulled = [_event_time(event) for event in events if event.reason == 'Pulled']
+    if pulling and pulled:
+        image_pull = _seconds(min(pulling), max(pulled))
+    else:
+        # Pulled without Pulling means that the image is present on the node.
+        image_pull = 0.0 if pulled else None
+
+    startup = {
+        'scheduling': _seconds(created, scheduled),
+        'init': _seconds(scheduled, initialized),
+        'image_pull': image_pull,
+        'startup': _seconds(initialized, started),
+        'total': _seconds(created, started)
+    }
+    return startup
 
-    name = pod.metadata.name
-    namespace = pod.metadata.namespace
 
-    events = api.list_namespaced_event(namespace, field_selector='type=Warning').items
-    return [{'name': name, 'message': e.message, 'datetime': e.metadata.creation_timestamp}
-            for e in events if e.involved_object.name == name]
+@ratelimit.admission(ratelimit.PRIORITY_LOW)
+def watch_pod_startups(since: datetime, skip: Container[str] = (), timeout: int = 300,
+                       cli: ApiClient = DEFAULT_CLI
+                       ) -> Generator[Tuple[str, Dict[str, Optional[float]]], None, None]:
+    '''Yields the uids and the startup breakdowns of the pods of the apps started since the time.
+
+    The pods in skip, e.g. the pods yielded by the previous watches, are not inspected again.
+    '''
+    api = client.CoreV1Api(cli)
+    w = watch.Watch()
+    try:
+        for event in w.stream(api.list_pod_for_all_namespaces, label_selector=MLAD_PROJECT_APP,
+                              timeout_seconds=timeout):
+            pod = event['object']
+            if event['type'] == 'DELETED' or pod.metadata.uid in skip:
+                continue
+            total = obtain_pod_startup(pod, [])['total']
+            if total is None or pod.metadata.creation_timestamp + timedelta(seconds=total) < since:
+                continue
+            events = _get_k8s_pod_events(pod.metadata.namespace, pod.metadata.name, cli=cli)
+            yield pod.metadata.uid, obtain_pod_startup(pod, events[pod.metadata.name])
+    except ApiException as e:
+        # The resource version is too old to watch, the caller watches again.
+        if e.status != 410:
+            raise
+    finally:
+        w.stop()
+
+
+def _summarize_startup(startups: Iterable[Dict[str, Optional[float]]]) -> Dict[str, Dict]:
+    def _percentile(values: List[float], q: float) -> float:
+        # Nearest-rank percentile of the sorted values.
+        return values[max(math.ceil(len(values) * q / 100) - 1, 0)]
+
+    startups = list(startups)
+    summary = {}
+    for phase in STARTUP_PHASES:
+        values = sorted(startup[phase] for startup in startups if startup[phase] is not None)
+        summary[phase] = {
+            'count': len(values),
+            'p50': _percentile(values, 50) if values else None,
+            'p95': _percentile(values, 95) if values else None,
+            'max': values[-1] if values else None
+        }
+    return summary
 
 
-def get_pod_info(pod: client.V1Pod, cli: ApiClient = DEFAULT_CLI) -> Dict:
+def get_project_startup(project_key: str, cli: ApiClient = DEFAULT_CLI) -> Dict:
+    '''Reports the startup latency of the pods of the project by apps.'''
+    api = client.CoreV1Api(cli)
+    namespace = get_k8s_namespace(project_key, cli=cli).metadata.name
+    pods = api.list_namespaced_pod(namespace, label_selector=MLAD_PROJECT_APP).items
+    events = _get_k8s_pod_events(namespace, cli=cli)
+
+    apps = defaultdict(dict)
+    for pod in pods:
+        app_name = pod.metadata.labels[MLAD_PROJECT_APP]
+        apps[app_name][pod.metadata.name] = obtain_pod_startup(pod, events[pod.metadata.name])
+    return {
+        'apps': {app_name: {'tasks': startups, 'summary': _summarize_startup(startups.values())}
+                 for app_name, startups in apps.items()},
+        'summary': _summarize_startup(
+            startup for startups in apps.values() for startup in startups.values())
+    }
+
+
+def get_pod_info(pod: client.V1Pod, cli: ApiClient = DEFAULT_CLI,
+                 events: Optional[List[client.CoreV1Event]] = None) -> Dict:
+    if events is None:
+        events = _get_k8s_pod_events(pod.metadata.namespace, pod.metadata.name, cli=cli)[pod.metadata.name]
     pod_info = {
         'name': pod.metadata.name,
         'namespace': pod.metadata.namespace,
@@ -372,8 +665,13 @@ def get_pod_info(pod: client.V1Pod, cli: ApiClient = DEFAULT_CLI) -> Dict:
         'node': pod.spec.node_name,
         # Pending, Running, Succeeded, Failed, Unknown
         'phase': pod.status.phase,
-        'events': get_pod_events(pod, cli),
-        'restart': 0
+        'events': [{'name': pod.metadata.name, 'message': e.message,
+                    'datetime': e.metadata.creation_timestamp}
+                   for e in events if e.type == 'Warning'],
+        'startup': obtain_pod_startup(pod, events),
+        'cache': _get_pod_cache_results(pod),
+        'restart': 0,
+        'index': (pod.metadata.annotations or {}).get(JOB_COMPLETION_INDEX_ANNOTATION)
     }
 
     def _get_status(container_state: client.V1ContainerState) -> Dict:
@@ -452,9 +750,12 @@ def inspect_app(app: App, cli: ApiClient = DEFAULT_CLI) -> Dict:
                                        label_selector=f'{MLAD_PROJECT_APP}={name}').items
         config_labels = _get_k8s_config_map_data(namespace, f'app-{name}-labels', cli)
         service = get_k8s_service_of_app(namespace, name, cli=cli)
+    hpa = get_k8s_hpa_of_app(namespace, name, cli=cli) if kind == 'Service' else None
 
     hostname, path = config_labels.get(MLAD_PROJECT_WORKSPACE, ':').split(':')
     pod_spec = app.spec.template.spec
+    events = _get_k8s_pod_events(namespace, cli=cli)
+    task_dict = {pod.metadata.name: get_pod_info(pod, cli, events[pod.metadata.name]) for pod in pods}
 
     spec = {
         'key': config_labels[MLAD_PROJECT] if config_labels.get(
@@ -474,8 +775,12 @@ def inspect_app(app: App, cli: ApiClient = DEFAULT_CLI) -> Dict:
         'id': app.metadata.uid,
         'name': config_labels.get(MLAD_PROJECT_APP),
         'replicas': app.spec.replicas if kind == 'Service' else app.spec.parallelism,
-        'task_dict': {pod.metadata.name: get_pod_info(pod, cli) for pod in pods},
+        'completions': app.spec.completions if kind != 'Service' else None,
+        'task_dict': task_dict,
+        'indexes': _obtain_job_indexes(task_dict.values()),
         'expose': _obtain_app_expose(service, config_labels),
+        'autoscale': _obtain_app_autoscale(hpa),
+        'cache': _obtain_app_cache(task_dict.values()),
         'created': app.metadata.creation_timestamp,
         'kind': config_labels.get(MLAD_PROJECT_APP_KIND),
         'schedule': schedule if app.metadata.owner_references else None
@@ -483,6 +788,69 @@ def inspect_app(app: App, cli: ApiClient = DEFAULT_CLI) -> Dict:
     return spec
 
 
+def _obtain_job_indexes(pod_infos: List[Dict]) -> Dict[str, str]:
+    # The phase of an index is the most advanced phase among the pods of the index.
+    def _priority(phase: str) -> int:
+        if phase in JOB_INDEX_PHASE_PRIORITIES:
+            return JOB_INDEX_PHASE_PRIORITIES.index(phase)
+        return len(JOB_INDEX_PHASE_PRIORITIES)
+
+    indexes = {}
+    for pod_info in pod_infos:
+        index, phase = pod_info['index'], pod_info['phase']
+        if index is None:
+            continue
+        if index not in indexes or _priority(phase) < _priority(indexes[index]):
+            indexes[index] = phase
+    return dict(sorted(indexes.items(), key=lambda item: int(item[0])))
+
+
+def check_app_condition(phases: List[str], condition: str) -> bool:
+    if len(phases) == 0:
+        return False
+    if condition == 'Succeeded':
+        return all(phase == 'Succeeded' for phase in phases)
+    return all(phase in ('Succeeded', 'Running') for phase in phases)
+
+
+@ratelimit.admission(ratelimit.PRIORITY_LOW)
+def watch_app_phases(namespace: str, app_name: str, timeout: int = 60,
+                     cli: ApiClient = DEFAULT_CLI) -> Generator[Dict[str, str], None, None]:
+    '''Yields the phases of the pods of the app by their names on every change until timeout.'''
+    api = client.CoreV1Api(cli)
+    selector = f'{MLAD_PROJECT_APP}={app_name}'
+    pods = api.list_namespaced_pod(namespace, label_selector=selector)
+    phases = {pod.metadata.name: pod.status.phase for pod in pods.items}
+    yield dict(phases)
+
+    w = watch.Watch()
+    try:
+        for event in w.stream(api.list_namespaced_pod, namespace, label_selector=selector,
+                              resource_version=pods.metadata.resource_version,
+                              timeout_seconds=timeout):
+            pod = event['object']
+            if event['type'] == 'DELETED':
+                phases.pop(pod.metadata.name, None)
+            else:
+                phases[pod.metadata.name] = pod.status.phase
+            yield dict(phases)
+    except ApiException as e:
+        # The resource version is too old to watch, the caller lists again.
+        if e.status != 410:
+            raise
+    finally:
+        w.stop()
+
+
+def wait_app_condition(namespace: str, app_name: str, condition: str, timeout: int = 60,
+                       cli: ApiClient = DEFAULT_CLI) -> bool:
+    '''Waits until all pods of the app are in the condition, Running or Succeeded.'''
+    for phases in watch_app_phases(namespace, app_name, timeout, cli):
+        if check_app_condition(list(phases.values()), condition):
+            return True
+    return False
+
+
 def _obtain_app_expose(service: Optional[client.V1Service], config_labels: Dict[str, str]) -> List[Dict]:
     if service is None:
         return []
@@ -498,6 +866,17 @@ def _obtain_app_expose(service: Optional[client.V1Service], config_labels: Dict[
     return list(expose_dict.values())
 
 
+def _obtain_app_autoscale(hpa: Optional[client.V2beta2HorizontalPodAutoscaler]) -> Optional[Dict]:
+    if hpa is None:
+        return None
+    return {
+        'min': hpa.spec.min_replicas,
+        'max': hpa.spec.max_replicas,
+        'current': hpa.status.current_replicas if hpa.status else None,
+        'desired': hpa.status.desired_replicas if hpa.status else None
+    }
+
+
 def inspect_apps(apps: List[App], cli: ApiClient = DEFAULT_CLI) -> List[Dict]:
     if not apps:
         return []
@@ -514,6 +893,7 @@ def _convert_mounts_to_k8s_volume(
 ) -> Tuple[List[client.V1VolumeMount], List[client.V1Volume]]:
     _mounts = []
     _volumes = []
+    cache_volume_name = f'{name}-cache'
     if mounts:
         for i, _ in enumerate(mounts):
             host_path, mount_path = _.split(":")[0], _.split(":")[1]
@@ -537,13 +917,24 @@ def _convert_mounts_to_k8s_volume(
         mount_path = pvc_spec['mountPath']
         read_only = pvc_spec['readOnly']
         volume_name = f'{name}-vol'
-        _mounts.append(
-            client.V1VolumeMount(
-                name=volume_name,
-                mount_path=mount_path,
-                read_only=read_only
+        if pvc_spec.get('cache') is not None:
+            # The prefetch init container reads the volume and the app reads the cache.
+            _mounts.append(
+                client.V1VolumeMount(
+                    name=cache_volume_name,
+                    mount_path=mount_path,
+                    sub_path=pvc_spec['cache'],
+                    read_only=True
+                )
+            )
+        else:
+            _mounts.append(
+                client.V1VolumeMount(
+                    name=volume_name,
+                    mount_path=mount_path,
+                    read_only=read_only
+                )
             )
-        )
         _volumes.append(
             client.V1Volume(
                 name=volume_name,
@@ -552,9 +943,83 @@ def _convert_mounts_to_k8s_volume(
                 )
             )
         )
+    if any(pvc_spec.get('cache') is not None for pvc_spec in pvc_specs):
+        _volumes.append(
+            client.V1Volume(
+                name=cache_volume_name,
+                host_path=client.V1HostPathVolumeSource(
+                    path=service_config['dataset_cache']['root'],
+                    type='DirectoryOrCreate'
+                )
+            )
+        )
     return _mounts, _volumes
 
 
+def _obtain_cache_key(mount: Dict) -> str:
+    # The same dataset is shared by the apps of all projects on the node,
+    # the prefetch refreshes the dataset when the files of the source change.
+    source = f"{mount['server']}:{mount.get('path') or mount['serverPath']}"
+    return hashlib.sha256(source.encode()).hexdigest()[:32]
+
+
+def _obtain_k8s_cache_init_containers(
+    name: str, pvc_specs: List[Dict], envs: List[client.V1EnvVar]
+) -> List[client.V1Container]:
+    capacity = int(parse_mem(service_config['dataset_cache']['capacity']) * 1024)
+    # The prefetch asks the API server which pods holding the cached datasets are running.
+    address_envs = [env for env in envs if env.name == 'MLAD_ADDRESS']
+    return [
+        client.V1Container(
+            name=f'cache-prefetch-{i}',
+            image=service_config['dataset_cache']['image'],
+            image_pull_policy='IfNotPresent',
+            command=['sh', '-c', CACHE_PREFETCH_SCRIPT],
+            env=[
+                _create_k8s_env('CACHE_KEY', pvc_spec['cache']),
+                _create_k8s_env('CACHE_CAPACITY', capacity),
+                _create_k8s_env('CACHE_MOUNT_PATH', pvc_spec['mountPath']),
+                _create_k8s_env('POD_UID', field_path='metadata.uid'),
+                *address_envs
+            ],
+            volume_mounts=[
+                client.V1VolumeMount(name=f"{pvc_spec['name']}-vol", mount_path='/source',
+                                     read_only=True),
+                client.V1VolumeMount(name=f'{name}-cache', mount_path='/cache')
+            ]
+        )
+        for i, pvc_spec in enumerate(pvc_specs) if pvc_spec.get('cache') is not None
+    ]
+
+
+def get_running_pod_uids(uids: Iterable[str], cli: ApiClient = DEFAULT_CLI) -> List[str]:
+    '''Returns the uids of the pods of the apps which have not terminated out of the uids.'''
+    api = client.CoreV1Api(cli)
+    pods = api.list_pod_for_all_namespaces(label_selector=MLAD_PROJECT_APP).items
+    running = {pod.metadata.uid for pod in pods if pod.status.phase not in ('Succeeded', 'Failed')}
+    return [uid for uid in uids if uid in running]
+
+
+def _obtain_app_cache(tasks: Iterable[Dict]) -> Optional[Dict[str, int]]:
+    results = [result for task in tasks for result in task['cache'].values()]
+    if not results:
+        return None
+    return {'hits': results.count('hit'), 'misses': results.count('miss')}
+
+
+def _get_pod_cache_results(pod: client.V1Pod) -> Dict[str, Optional[str]]:
+    '''Returns whether the cache mounts of the pod were hit or missed by the mount paths.'''
+    mount_paths = {container.name: env.value
+                   for container in pod.spec.init_containers or []
+                   for env in container.env or [] if env.name == 'CACHE_MOUNT_PATH'}
+    results = dict.fromkeys(mount_paths.values())
+    for status in pod.status.init_container_statuses or []:
+        terminated = status.state.terminated if status.state else None
+        if status.name in mount_paths and terminated is not None and terminated.exit_code == 0:
+            results[mount_paths[status.name]] = (terminated.message or '').strip() or None
+    return results
+
+
 def _convert_quota_to_k8s_resource(
     type: str = 'Quota', resources: Optional[Dict] = None
 ) -> client.V1ResourceRequirements:
@@ -604,16 +1069,39 @@ def _convert_constraints_to_k8s_node_selector(constraints: Dict) -> Dict[str, st
     return selector
 
 
+def _obtain_image_pull_policy(image: str) -> str:
+    # An image pinned by the digest cannot change, so the cached image of the node is used.
+    return 'IfNotPresent' if '@sha256:' in image else 'Always'
+
+
 def _convert_depends_to_k8s_init_container(
     depends: Dict, envs: List[client.V1EnvVar]
 ) -> client.V1Container:
-    env = [*envs, _create_k8s_env('DEPENDENCY_SPECS', json.dumps(depends))]
+    # Long-polls the API server which watches the pods of the apps instead of polling them.
+    timeout = service_config['dependency']['timeout']
+    script = ''.join(DEPENDENCY_WAIT_SCRIPT.format(
+        app=depend['appName'], condition=depend['condition'], timeout=timeout,
+        max_time=timeout + 30, retries=service_config['dependency']['retries'])
+        for depend in depends)
     return client.V1Container(
         name='dependency-check-container',
-        image='ghcr.io/onetop21/mlappdeploy/api-server:dev',
-        image_pull_policy='Always',
-        command=['python', '-m', 'mlad.core.dependency'],
-        env=env
+        image=service_config['dependency']['image'],
+        image_pull_policy='IfNotPresent',
+        command=['sh', '-c', script],
+        env=envs
+    )
+
+
+def _obtain_k8s_worker_gate_init_container(
+    name: str, image: str, envs: List[client.V1EnvVar], timeout: int
+) -> client.V1Container:
+    # No worker starts until every worker is placed and resolvable by its hostname.
+    return client.V1Container(
+        name=WORKER_GATE_CONTAINER,
+        image=image,
+        image_pull_policy=_obtain_image_pull_policy(image),
+        command=['sh', '-c', WORKER_GATE_SCRIPT.format(timeout=timeout)],
+        env=envs
     )
 
 
@@ -622,7 +1110,9 @@ def _obtain_k8s_job_spec(
     envs: List[client.V1EnvVar] = [], mounts: List[str] = [], pvc_specs: List[Dict] = [],
     parallelism: int = 1, completions: int = 1, quota: Optional[Dict[str, str]] = None,
     resources: Optional[Dict] = None, init_containers: List[client.V1Container] = [],
-    labels: Optional[Dict[str, str]] = None, constraints: Optional[Dict] = None, secrets: str = ''
+    labels: Optional[Dict[str, str]] = None, constraints: Optional[Dict] = None, secrets: str = '',
+    completion_mode: Optional[str] = None, subdomain: Optional[str] = None,
+    affinity: Optional[client.V1Affinity] = None
 ) -> client.V1JobSpec:
 
     _resources = _convert_quota_to_k8s_resource(type='Resources', resources=resources) if resources \
@@ -632,7 +1122,13 @@ def _obtain_k8s_job_spec(
 
     _mounts, _volumes = _convert_mounts_to_k8s_volume(name, mounts, pvc_specs)
 
-    return client.V1JobSpec(
+    if completion_mode == 'Indexed':
+        # Completions is required by the indexed job.
+        completions = completions or parallelism
+        envs = [*envs, _create_k8s_env('JOB_COMPLETION_INDEX', field_path=JOB_COMPLETION_INDEX_FIELD)]
+
+    return V1JobSpec(
+            completion_mode=completion_mode,
             backoff_limit=0,
             parallelism=parallelism,
             completions=completions,
@@ -646,7 +1142,7 @@ def _obtain_k8s_job_spec(
                         client.V1Container(
                             name=name,
                             image=image,
-                            image_pull_policy='Always',
+                            image_pull_policy=_obtain_image_pull_policy(image),
                             command=command,
                             env=envs,
                             resources=_resources,
@@ -657,7 +1153,9 @@ def _obtain_k8s_job_spec(
                     node_selector=node_selector,
                     image_pull_secrets=[client.V1LocalObjectReference(name=secrets)]
                     if secrets else None,
-                    host_ipc=True
+                    host_ipc=True,
+                    subdomain=subdomain,
+                    affinity=affinity
                 )
             )
         )
@@ -669,7 +1167,8 @@ def _obtain_k8s_job(
     pvc_specs: List[Dict] = [], parallelism: int = 1, completions: int = 1,
     quota: Optional[Dict[str, str]] = None, resources: Optional[Dict] = None,
     init_containers: List[client.V1Container] = [], labels: Optional[Dict[str, str]] = None,
-    constraints: Optional[Dict] = None, secrets: str = ''
+    constraints: Optional[Dict] = None, secrets: str = '', completion_mode: Optional[str] = None,
+    subdomain: Optional[str] = None, affinity: Optional[client.V1Affinity] = None
 ) -> client.V1Job:
 
     return client.V1Job(
@@ -678,7 +1177,8 @@ def _obtain_k8s_job(
         metadata=client.V1ObjectMeta(name=name, labels=labels, namespace=namespace),
         spec=_obtain_k8s_job_spec(
             name, image, command, restart_policy, envs, mounts, pvc_specs, parallelism,
-            completions, quota, resources, init_containers, labels, constraints, secrets)
+            completions, quota, resources, init_containers, labels, constraints, secrets,
+            completion_mode, subdomain, affinity)
     )
 
 
@@ -688,7 +1188,8 @@ def _obtain_k8s_cron_job(
     pvc_specs: List[Dict] = [], parallelism: int = 1, completions: int = 1,
     quota: Optional[Dict[str, str]] = None, resources: Optional[Dict] = None,
     init_containers: List[client.V1Container] = [], labels: Optional[Dict[str, str]] = None,
-    constraints: Optional[Dict] = None, schedule: str = '* * * * *', secrets: str = ''
+    constraints: Optional[Dict] = None, schedule: str = '* * * * *', secrets: str = '',
+    completion_mode: Optional[str] = None, affinity: Optional[client.V1Affinity] = None
 ) -> client.V1beta1CronJob:
 
     return client.V1beta1CronJob(
@@ -700,7 +1201,8 @@ def _obtain_k8s_cron_job(
                 metadata=client.V1ObjectMeta(name=name, labels=labels, namespace=namespace),
                 spec=_obtain_k8s_job_spec(
                     name, image, command, restart_policy, envs, mounts, pvc_specs, parallelism,
-                    completions, quota, resources, init_containers, labels, constraints, secrets)
+                    completions, quota, resources, init_containers, labels, constraints, secrets,
+                    completion_mode, affinity=affinity)
             ),
             schedule=schedule,
         )
@@ -712,7 +1214,8 @@ def _obtain_k8s_deployment(
     envs: List[client.V1EnvVar] = [], mounts: List[str] = [], pvc_specs: List[Dict] = [],
     replicas: int = 1, quota: Optional[Dict] = None, resources: Optional[Dict] = None,
     init_containers: List[client.V1Container] = [], labels: Optional[Dict[str, str]] = None,
-    constraints: Optional[Dict] = None, secrets: str = ''
+    constraints: Optional[Dict] = None, secrets: str = '',
+    affinity: Optional[client.V1Affinity] = None
 ) -> client.V1Deployment:
 
     _resources = _convert_quota_to_k8s_resource(type='Resources', resources=resources) if resources \
@@ -746,7 +1249,7 @@ def _obtain_k8s_deployment(
                     containers=[client.V1Container(
                         name=name,
                         image=image,
-                        image_pull_policy='Always',
+                        image_pull_policy=_obtain_image_pull_policy(image),
                         env=envs,
                         command=command,
                         resources=_resources,
@@ -756,7 +1259,8 @@ def _obtain_k8s_deployment(
                     node_selector=node_selector,
                     image_pull_secrets=[client.V1LocalObjectReference(name=secrets)]
                     if secrets else None,
-                    host_ipc=True
+                    host_ipc=True,
+                    affinity=affinity
                 )
             )
         )
@@ -832,7 +1336,7 @@ def _create_k8s_env(
 
 
 def _obtain_k8s_service_for_app(expose: List[Dict], app_name: str, namespace: str,
-                                labels: Dict[str, str]) -> client.V1Service:
+                                labels: Dict[str, str], headless: bool = False) -> client.V1Service:
     ports = set([item['port'] for item in expose])
     return client.V1Service(
         api_version='v1',
@@ -844,13 +1348,77 @@ def _obtain_k8s_service_for_app(expose: List[Dict], app_name: str, namespace: st
         ),
         spec=client.V1ServiceSpec(
             selector={MLAD_PROJECT_APP: app_name},
-            ports=[client.V1ServicePort(port=port, name=f'port{port}') for port in ports]
+            ports=[client.V1ServicePort(port=port, name=f'port{port}') for port in ports],
+            # Pods are resolvable before they are ready, e.g. while waiting for their peers.
+            cluster_ip='None' if headless else None,
+            publish_not_ready_addresses=True if headless else None
         )
     )
 
 
+def _check_autoscale_quota(name: str, autoscale: Dict, quota: Optional[Dict]):
+    # The CPU utilization of the autoscaler is measured against the CPU requests of the app.
+    if autoscale.get('metric') is None and not (quota or {}).get('cpu'):
+        raise exceptions.APIError(
+            f'App {name} is autoscaled by CPU utilization without a CPU quota, '
+            'set the quota.cpu or the autoscale.metric of the app.', 400)
+
+
+def _obtain_k8s_hpa(name: str, namespace: str, labels: Dict[str, str],
+                    autoscale: Dict) -> client.V2beta2HorizontalPodAutoscaler:
+    metric = autoscale.get('metric')
+    if metric is not None:
+        metric_spec = client.V2beta2MetricSpec(
+            type='Pods',
+            pods=client.V2beta2PodsMetricSource(
+                metric=client.V2beta2MetricIdentifier(name=metric['name']),
+                target=client.V2beta2MetricTarget(
+                    type='AverageValue', average_value=str(metric['averageValue']))
+            )
+        )
+    else:
+        metric_spec = client.V2beta2MetricSpec(
+            type='Resource',
+            resource=client.V2beta2ResourceMetricSource(
+                name='cpu',
+                target=client.V2beta2MetricTarget(
+                    type='Utilization',
+                    average_utilization=autoscale.get('targetCPU') or HPA_DEFAULT_TARGET_CPU)
+            )
+        )
+    return client.V2beta2HorizontalPodAutoscaler(
+        api_version='autoscaling/v2beta2',
+        kind='HorizontalPodAutoscaler',
+        metadata=client.V1ObjectMeta(name=name, namespace=namespace, labels=labels),
+        spec=client.V2beta2HorizontalPodAutoscalerSpec(
+            scale_target_ref=client.V2beta2CrossVersionObjectReference(
+                api_version='apps/v1', kind='Deployment', name=name),
+            min_replicas=autoscale.get('minReplicas') or 1,
+            max_replicas=autoscale['maxReplicas'],
+            metrics=[metric_spec]
+        )
+    )
+
+
+def _apply_k8s_hpa(name: str, namespace: str, labels: Dict[str, str], autoscale: Optional[Dict],
+                   cli: ApiClient = DEFAULT_CLI) -> None:
+    # Creates, replaces or deletes the autoscaler of the app by the autoscale spec.
+    api = client.AutoscalingV2beta2Api(cli)
+    hpa = get_k8s_hpa_of_app(namespace, name, cli=cli)
+    if autoscale is None:
+        if hpa is not None:
+            api.delete_namespaced_horizontal_pod_autoscaler(hpa.metadata.name, namespace)
+        return
+    body = _obtain_k8s_hpa(name, namespace, labels, autoscale)
+    if hpa is None:
+        api.create_namespaced_horizontal_pod_autoscaler(namespace, body)
+    else:
+        body.metadata.resource_version = hpa.metadata.resource_version
+        api.replace_namespaced_horizontal_pod_autoscaler(hpa.metadata.name, namespace, body)
+
+
 def obtain_k8s_app_resources(namespace: client.V1Namespace, base_labels: Dict[str, str],
-                             name: str, app: Dict):
+                             name: str, app: Dict, placement: Optional[Dict[str, int]] = None):
     resources = defaultdict(list)
     namespace_name = namespace.metadata.name
     namespace_labels = copy.deepcopy(namespace.metadata.labels)
@@ -915,26 +1483,55 @@ def obtain_k8s_app_resources(namespace: client.V1Namespace, base_labels: Dict[st
         pvc_specs.append({
             'name': pvc.metadata.name,
             'mountPath': pv_mount['mountPath'],
-            'readOnly': pv_mount['readOnly']
+            'readOnly': pv_mount['readOnly'],
+            'cache': _obtain_cache_key(pv_mount) if pv_mount.get('cache') else None
         })
+    init_containers = [*init_containers, *_obtain_k8s_cache_init_containers(name, pvc_specs, envs)]
+    affinity = _obtain_k8s_placement_affinity(placement)
 
     if kind == 'Job':
+        parallelism = app.get('parallelism') or 1
+        completions = app.get('completions')
+        completion_mode = app.get('completionMode')
         if schedule is not None:
             config_labels[MLAD_PROJECT_APP_CONTROLLER] = 'CronJob'
             resources['cron_job'] = _obtain_k8s_cron_job(
-                name, image, command, namespace_name, restart_policy, envs, v_mounts, pvc_specs, 1,
-                None, quota, None, init_containers, labels, constraints, schedule, secrets)
+                name, image, command, namespace_name, restart_policy, envs, v_mounts, pvc_specs,
+                parallelism, completions, quota, None, init_containers, labels, constraints,
+                schedule, secrets, completion_mode, affinity)
         else:
             config_labels[MLAD_PROJECT_APP_CONTROLLER] = 'Job'
             resources['job'] = _obtain_k8s_job(
                 name, image, command, namespace_name, restart_policy, envs, v_mounts, pvc_specs,
-                1, None, quota, None, init_containers, labels, constraints, secrets)
+                parallelism, completions, quota, None, init_containers, labels, constraints,
+                secrets, completion_mode, affinity=affinity)
+    elif kind == 'Distributed':
+        config_labels[MLAD_PROJECT_APP_CONTROLLER] = 'Job'
+        workers = app['workers']
+        envs = [
+            *envs,
+            _create_k8s_env('WORLD_SIZE', workers),
+            _create_k8s_env('RANK', field_path=JOB_COMPLETION_INDEX_FIELD),
+            _create_k8s_env('MASTER_ADDR', f'{name}-0.{name}'),
+            _create_k8s_env('MASTER_PORT', app['masterPort'])
+        ]
+        init_containers = [*init_containers, _obtain_k8s_worker_gate_init_container(
+            name, image, envs, app['startupTimeout'])]
+        resources['job'] = _obtain_k8s_job(
+            name, image, command, namespace_name, restart_policy, envs, v_mounts, pvc_specs,
+            workers, workers, quota, None, init_containers, labels, constraints, secrets,
+            'Indexed', name, affinity)
     elif kind == 'Service':
         config_labels[MLAD_PROJECT_APP_CONTROLLER] = 'Deployment'
         scale = app['scale']
+        autoscale = app.get('autoscale')
+        if autoscale is not None:
+            _check_autoscale_quota(name, autoscale, quota)
+            scale = min(max(scale, autoscale.get('minReplicas') or 1), autoscale['maxReplicas'])
+            resources['hpa'] = _obtain_k8s_hpa(name, namespace_name, labels, autoscale)
         resources['deployment'] = _obtain_k8s_deployment(
             name, image, command, namespace_name, envs, v_mounts, pvc_specs, scale,
-            quota, None, init_containers, labels, constraints, secrets)
+            quota, None, init_containers, labels, constraints, secrets, affinity)
     else:
         raise DeprecatedError
 
@@ -952,17 +1549,25 @@ def obtain_k8s_app_resources(namespace: client.V1Namespace, base_labels: Dict[st
                     namespace_name, name, port, ingress_path, rewrite_path
                 )
                 resources['ingress'].append(k8s_ingress)
+    if kind == 'Distributed':
+        # Workers find each other by the stable hostnames of the headless service.
+        expose = [*(app.get('expose') or []), {'port': app['masterPort']}]
+        resources['service'] = _obtain_k8s_service_for_app(
+            expose, name, namespace_name, labels, headless=True)
     config_labels[MLAD_PROJECT_INGRESS] = json.dumps(ingress_specs)
     resources['configmap'] = obtain_k8s_config_map(f'app-{name}-labels', config_labels)
     return resources
 
 
+@ratelimit.admission(ratelimit.PRIORITY_NORMAL)
 def create_apps(namespace: client.V1Namespace, app_dict: Dict, cli: ApiClient = DEFAULT_CLI) -> List[App]:
     instances = []
     config_labels = _get_k8s_config_map_data(namespace, 'project-labels', cli)
     namespace_name = namespace.metadata.name
+    placements = plan_placements(app_dict, cli)
     for name, app in app_dict.items():
-        resources = obtain_k8s_app_resources(namespace, config_labels, name, app)
+        resources = obtain_k8s_app_resources(
+            namespace, config_labels, name, app, placements.get(name, {}).get('nodes'))
         api = client.CoreV1Api(cli)
         api.create_namespaced_config_map(namespace_name, resources['configmap'])
         for pv in resources['pv']:
@@ -990,16 +1595,23 @@ def create_apps(namespace: client.V1Namespace, app_dict: Dict, cli: ApiClient =
             api = client.AppsV1Api(cli)
             deployment = api.create_namespaced_deployment(namespace_name, resources['deployment'])
             instances.append(deployment)
+        if 'hpa' in resources:
+            api = client.AutoscalingV2beta2Api(cli)
+            api.create_namespaced_horizontal_pod_autoscaler(namespace_name, resources['hpa'])
     return instances
 
 
+@ratelimit.admission(ratelimit.PRIORITY_NORMAL)
 def update_apps(
     namespace: client.V1Namespace, update_yaml: Dict, update_specs: List[Dict], cli: ApiClient = DEFAULT_CLI
 ) -> List[App]:
     results = []
     for update_spec in update_specs:
         app_name = update_spec['name']
-        if update_yaml['app'][app_name]['kind'] == 'Service':
+        kind = update_yaml['app'][app_name]['kind']
+        if kind == 'Distributed':
+            update_spec = _convert_distributed_update_spec(update_spec)
+        if kind == 'Service':
             results.append(_update_k8s_deployment(namespace, update_spec, cli=cli))
         else:
             if 'schedule' in update_yaml['app'][app_name]:  # cron job
@@ -1009,6 +1621,13 @@ def update_apps(
     return results
 
 
+def _convert_distributed_update_spec(update_spec: Dict) -> Dict:
+    workers = update_spec['workers']
+    update_spec.update(parallelism=workers, completions=workers, completionMode='Indexed')
+    update_spec['env']['update']['WORLD_SIZE'] = str(workers)
+    return update_spec
+
+
 def _update_k8s_deployment(
     namespace: client.V1Namespace, update_spec: Dict, cli: ApiClient = DEFAULT_CLI
 ) -> client.V1Deployment:
@@ -1038,17 +1657,23 @@ def _update_k8s_deployment(
 
     # update
     body = []
-    body.append(_body("replicas", scale, "deployment"))
+    autoscale = update_spec.get('autoscale')
+    if autoscale is not None:
+        _check_autoscale_quota(app_name, autoscale, quota)
+    # The replicas of an autoscaled app are managed by the autoscaler.
+    if autoscale is None:
+        body.append(_body("replicas", scale, "deployment"))
     body.append(_body("command", command))
 
     for resource in resources:
         body.append(_body(f"resources/{resource}", resources[resource]))
 
-    if update_spec['image'] is not None:
-        body.append(_body("image", update_spec['image']))
-    else:
+    image = update_spec['image']
+    if image is None:
         namespace_spec = inspect_k8s_namespace(namespace, cli)
-        body.append(_body("image", namespace_spec['image']))
+        image = namespace_spec['image']
+    body.append(_body("image", image))
+    body.append(_body("imagePullPolicy", _obtain_image_pull_policy(image)))
 
     # update env
     deployment = get_k8s_deployment(app_name, namespace_name, cli)
@@ -1072,22 +1697,41 @@ def _update_k8s_deployment(
         cause = {"kubernetes.io/change-cause": f"MLAD:{update_spec}"}
         body.append(_body("annotations", cause, "metadata"))
         api = client.AppsV1Api(cli)
-        return api.patch_namespaced_deployment(app_name, namespace_name, body=body)
+        deployment = api.patch_namespaced_deployment(app_name, namespace_name, body=body)
+        _apply_k8s_hpa(app_name, namespace_name, deployment.metadata.labels, autoscale, cli=cli)
+        return deployment
     except ApiException as e:
         msg, status = exceptions.handle_k8s_api_error(e)
         err_msg = f'Failed to update apps: {msg}'
         raise exceptions.APIError(err_msg, status)
 
 
-def _update_k8s_job(
-    namespace: client.V1Namespace, update_spec: Dict, cli: ApiClient = DEFAULT_CLI
-) -> client.V1Job:
-    app_name = update_spec['name']
-    image = update_spec['image']
+def _update_k8s_job_spec(job_spec: client.V1JobSpec, update_spec: Dict) -> V1JobSpec:
+    # The completion mode is lost by reading the job, so it is taken from the update spec.
+    completion_mode = update_spec.get('completionMode')
+    spec = V1JobSpec(completion_mode=completion_mode, **{
+        attr: getattr(job_spec, attr) for attr in client.V1JobSpec.openapi_types})
+    # The fields dropped from the project file fall back to their defaults.
+    spec.parallelism = update_spec.get('parallelism') or 1
+    spec.completions = update_spec.get('completions')
+    container_spec = spec.template.spec.containers[0]
+    for init_container in spec.template.spec.init_containers or []:
+        if init_container.name == WORKER_GATE_CONTAINER:
+            # The gate waits for WORLD_SIZE workers in the image of the app.
+            init_container.env = copy.deepcopy(container_spec.env)
+            init_container.image = container_spec.image
+            init_container.image_pull_policy = container_spec.image_pull_policy
+    if completion_mode == 'Indexed':
+        spec.completions = spec.completions or spec.parallelism
+        spec.template.spec.containers[0].env.append(
+            _create_k8s_env('JOB_COMPLETION_INDEX', field_path=JOB_COMPLETION_INDEX_FIELD))
+    return spec
+
+
+def _update_k8s_job_template(k8s_job: client.V1Job, update_spec: Dict, image: str) -> client.V1Job:
     command = update_spec['command'] or []
     args = update_spec['args'] or []
     quota = update_spec['quota'] or {}
-    namespace_name = namespace.metadata.name
 
     resources = _convert_quota_to_k8s_resource(resources=quota)
 
@@ -1097,15 +1741,9 @@ def _update_k8s_job(
         args = args.split()
     command += args
 
-    k8s_job = get_app_from_controller(app_name, namespace_name, 'Job', cli=cli)
-
-    # remove invalid properties to re-run the job
-    k8s_job.metadata = client.V1ObjectMeta(name=k8s_job.metadata.name, labels=k8s_job.metadata.labels)
-    k8s_job.spec.selector = None
-    del k8s_job.spec.template.metadata.labels['controller-uid']
-
     container_spec = k8s_job.spec.template.spec.containers[0]
     current = {env.name: env.value for env in container_spec.env}
+    current.pop('JOB_COMPLETION_INDEX', None)
     for key in list(update_spec['env']['current'].keys()):
         if key not in CONFIG_ENVS:
             current.pop(key)
@@ -1117,17 +1755,38 @@ def _update_k8s_job(
         current.update({'NVIDIA_VISIBLE_DEVICES': 'none'})
     elif 'NVIDIA_VISIBLE_DEVICES' in current:
         del current['NVIDIA_VISIBLE_DEVICES']
-    env = [client.V1EnvVar(name=k, value=v).to_dict() for k, v in current.items()]
+    # Keep the envs from the fields of the pod, e.g. the rank of a worker.
+    field_envs = {env.name: env for env in container_spec.env if env.value_from is not None}
+    env = [field_envs[k] if v is None and k in field_envs
+           else client.V1EnvVar(name=k, value=v).to_dict() for k, v in current.items()]
 
     container_spec.command = command
     container_spec.resources = resources
-    if image is not None:
-        container_spec.image = image
-    else:
-        namespace_spec = inspect_k8s_namespace(namespace, cli)
-        container_spec.image = namespace_spec['image']
+    container_spec.image = image
+    container_spec.image_pull_policy = _obtain_image_pull_policy(container_spec.image)
 
     container_spec.env = env
+    k8s_job.spec = _update_k8s_job_spec(k8s_job.spec, update_spec)
+    return k8s_job
+
+
+def _update_k8s_job(
+    namespace: client.V1Namespace, update_spec: Dict, cli: ApiClient = DEFAULT_CLI
+) -> client.V1Job:
+    app_name = update_spec['name']
+    image = update_spec['image']
+    namespace_name = namespace.metadata.name
+
+    k8s_job = get_app_from_controller(app_name, namespace_name, 'Job', cli=cli)
+
+    # remove invalid properties to re-run the job
+    k8s_job.metadata = client.V1ObjectMeta(name=k8s_job.metadata.name, labels=k8s_job.metadata.labels)
+    k8s_job.spec.selector = None
+    del k8s_job.spec.template.metadata.labels['controller-uid']
+
+    if image is None:
+        image = inspect_k8s_namespace(namespace, cli)['image']
+    k8s_job = _update_k8s_job_template(k8s_job, update_spec, image)
     try:
         api = client.BatchV1Api(cli)
         api.delete_namespaced_job(app_name, namespace_name, propagation_policy='Foreground')
@@ -1151,50 +1810,17 @@ def _update_k8s_cron_job(
 ) -> client.V1Job:
     app_name = update_spec['name']
     image = update_spec['image']
-    command = update_spec['command'] or []
-    args = update_spec['args'] or []
-    quota = update_spec['quota'] or {}
     namespace_name = namespace.metadata.name
 
-    resources = _convert_quota_to_k8s_resource(resources=quota)
-
-    if isinstance(command, str):
-        command = command.split()
-    if isinstance(args, str):
-        args = args.split()
-    command += args
-
     k8s_cron_job = get_app_from_controller(app_name, namespace_name, 'CronJob', cli=cli)
     # remove invalid properties to re-run the cron job
     k8s_cron_job.metadata = client.V1ObjectMeta(name=k8s_cron_job.metadata.name,
                                                 labels=k8s_cron_job.metadata.labels)
-    k8s_job = k8s_cron_job.spec.job_template
-    k8s_job.spec.selector = None
-
-    container_spec = k8s_job.spec.template.spec.containers[0]
-    current = {env.name: env.value for env in container_spec.env}
-    for key in list(update_spec['env']['current'].keys()):
-        if key not in CONFIG_ENVS:
-            current.pop(key)
-    for key in list(update_spec['env']['update'].keys()):
-        if key in CONFIG_ENVS:
-            update_spec['env']['update'].pop(key)
-    current.update(update_spec['env']['update'])
-    if 'gpu' in quota and quota['gpu'] == 0:
-        current.update({'NVIDIA_VISIBLE_DEVICES': 'none'})
-    elif 'NVIDIA_VISIBLE_DEVICES' in current:
-        del current['NVIDIA_VISIBLE_DEVICES']
-    env = [client.V1EnvVar(name=k, value=v).to_dict() for k, v in current.items()]
-
-    container_spec.command = command
-    container_spec.resources = resources
-    if image is not None:
-        container_spec.image = image
-    else:
-        namespace_spec = inspect_k8s_namespace(namespace, cli)
-        container_spec.image = namespace_spec['image']
+    k8s_cron_job.spec.job_template.spec.selector = None
 
-    container_spec.env = env
+    if image is None:
+        image = inspect_k8s_namespace(namespace, cli)['image']
+    _update_k8s_job_template(k8s_cron_job.spec.job_template, update_spec, image)
     try:
         api = client.BatchV1beta1Api(cli)
         return api.patch_namespaced_cron_job(app_name, namespace_name, body=k8s_cron_job)
@@ -1222,6 +1848,7 @@ def _delete_k8s_deployment(
     return api.delete_namespaced_deployment(name, namespace, propagation_policy='Foreground')
 
 
+@ratelimit.admission(ratelimit.PRIORITY_HIGH)
 def remove_apps(
     apps: List[App], namespace: str, disconnect_handler: Optional[object] = None,
     cli: ApiClient = DEFAULT_CLI
@@ -1252,12 +1879,13 @@ def remove_apps(
         app_name, kind, controller, _ = spec
         try:
             _delete_k8s_pvs(app_name)
-            if kind == 'Job':
+            if kind in ('Job', 'Distributed'):
                 if controller == 'Job':
                     _delete_k8s_job(app_name, namespace, cli=cli)
                 elif controller == 'CronJob':
                     _delete_k8s_cron_job(app_name, namespace, cli=cli)
             elif kind == 'Service':
+                _apply_k8s_hpa(app_name, namespace, None, None, cli=cli)
                 _delete_k8s_deployment(app_name, namespace, cli=cli)
 
             if get_k8s_service_of_app(namespace, app_name, cli=cli) is not None:
@@ -1275,6 +1903,109 @@ def remove_apps(
         yield stream
 
 
+def _obtain_k8s_prepull_daemonset(
+    name: str, namespace: str, images: List[str], constraints: Optional[Dict] = None,
+    secrets: str = ''
+) -> client.V1DaemonSet:
+    labels = {PREPULL_LABEL: name}
+    # The images are pulled by the containers in parallel. A container exiting or failing to
+    # start after the pull, as an image without a shell does, is restarted but counted as pulled.
+    containers = [
+        client.V1Container(
+            name=f'prepull-{index}',
+            image=image,
+            image_pull_policy=_obtain_image_pull_policy(image),
+            command=['sh', '-c', 'exit 0'],
+            resources=client.V1ResourceRequirements(requests={'cpu': '10m', 'memory': '16Mi'})
+        ) for index, image in enumerate(images)
+    ]
+    return client.V1DaemonSet(
+        api_version='apps/v1',
+        kind='DaemonSet',
+        metadata=client.V1ObjectMeta(name=name, namespace=namespace, labels=labels),
+        spec=client.V1DaemonSetSpec(
+            selector=client.V1LabelSelector(match_labels=labels),
+            template=client.V1PodTemplateSpec(
+                metadata=client.V1ObjectMeta(labels=labels),
+                spec=client.V1PodSpec(
+                    containers=containers,
+                    node_selector=_convert_constraints_to_k8s_node_selector(constraints),
+                    image_pull_secrets=[client.V1LocalObjectReference(name=secrets)]
+                    if secrets else None,
+                    termination_grace_period_seconds=0
+                )
+            )
+        )
+    )
+
+
+def _get_prepull_progress(pod: client.V1Pod) -> Tuple[int, Optional[str]]:
+    # The number of pulled images and the reason of the pod failing to pull an image.
+    pulled = 0
+    reason = None
+    for status in pod.status.container_statuses or []:
+        waiting = status.state.waiting
+        if status.image_id or waiting is None:
+            pulled += 1
+        elif waiting.reason in PREPULL_FAILED_REASONS:
+            reason = reason or waiting.reason
+        elif waiting.reason not in PREPULL_PENDING_REASONS:
+            # CrashLoopBackOff or RunContainerError after the image is pulled.
+            pulled += 1
+    return pulled, reason
+
+
+@ratelimit.admission(ratelimit.PRIORITY_LOW)
+def prepull_images(
+    namespace: client.V1Namespace, images: List[str], constraints: Optional[Dict] = None,
+    timeout: int = 600, cli: ApiClient = DEFAULT_CLI
+) -> LogGenerator:
+    '''Warms the images on the nodes in parallel with a short-lived daemonset.'''
+    namespace_name = namespace.metadata.name
+    config_labels = _get_k8s_config_map_data(namespace, 'project-labels', cli)
+    secrets = f'{config_labels[MLAD_PROJECT_BASE]}-auth'
+    name = f'prepull-{uuid.uuid4().hex[:8]}'
+    apps_api = client.AppsV1Api(cli)
+    core_api = client.CoreV1Api(cli)
+
+    apps_api.create_namespaced_daemon_set(namespace_name, _obtain_k8s_prepull_daemonset(
+        name, namespace_name, images, constraints, secrets))
+    yield {'stream': f'Pre-pull {len(images)} image(s) on the nodes...\n'}
+    progress = {}
+    try:
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            daemonset = apps_api.read_namespaced_daemon_set(name, namespace_name)
+            desired = daemonset.status.desired_number_scheduled if daemonset.status else None
+            pods = core_api.list_namespaced_pod(
+                namespace_name, label_selector=f'{PREPULL_LABEL}={name}').items
+            for pod in pods:
+                node = pod.spec.node_name
+                if node is None:
+                    continue
+                pulled, reason = _get_prepull_progress(pod)
+                if progress.get(node) != (pulled, reason):
+                    progress[node] = (pulled, reason)
+                    detail = f' ({reason})' if reason is not None else ''
+                    yield {'stream': f'  {node}: {pulled}/{len(images)} image(s) pulled{detail}\n'}
+                if reason is not None:
+                    yield {'stream': f'Failed to pre-pull the images on {node}: {reason}\n'}
+                    return
+            done = sum(1 for pulled, _ in progress.values() if pulled == len(images))
+            if desired is not None and daemonset.status.observed_generation is not None:
+                if desired == 0:
+                    yield {'stream': 'No nodes match the constraints to pre-pull the images.\n'}
+                    return
+                if done >= desired:
+                    yield {'stream': f'Pre-pulled the images on {done} node(s).\n'}
+                    return
+            time.sleep(PREPULL_POLL_INTERVAL)
+        pending = [node for node, (pulled, _) in progress.items() if pulled < len(images)]
+        yield {'stream': f'Timed out pre-pulling the images, pending nodes: {pending}\n'}
+    finally:
+        apps_api.delete_namespaced_daemon_set(name, namespace_name, propagation_policy='Background')
+
+
 def get_k8s_nodes(cli: ApiClient = DEFAULT_CLI) -> List[client.V1Node]:
     api = client.CoreV1Api(cli)
     return api.list_node().items
@@ -1331,6 +2062,7 @@ def delete_k8s_node(name: str, cli: ApiClient = DEFAULT_CLI) -> client.V1Node:
     return api.delete_node(name)
 
 
+@ratelimit.admission(ratelimit.PRIORITY_HIGH)
 @handle_k8s_exception('node')
 def add_k8s_node_labels(name: str, cli: ApiClient = DEFAULT_CLI, **kv: str) -> client.V1Node:
     api = client.CoreV1Api(cli)
@@ -1344,6 +2076,7 @@ def add_k8s_node_labels(name: str, cli: ApiClient = DEFAULT_CLI, **kv: str) -> c
     return api.patch_node(name, body)
 
 
+@ratelimit.admission(ratelimit.PRIORITY_HIGH)
 @handle_k8s_exception('node')
 def remove_k8s_node_labels(
     name: str, cli: ApiClient = DEFAULT_CLI, *keys: str
@@ -1362,6 +2095,11 @@ def remove_k8s_node_labels(
 def scale_app(app: App, scale_spec: int, cli: ApiClient = DEFAULT_CLI) -> client.V1Scale:
     name = app.metadata.name
     namespace = app.metadata.namespace
+    hpa = get_k8s_hpa_of_app(namespace, name, cli=cli)
+    if hpa is not None:
+        raise exceptions.APIError(
+            f'App {name} is autoscaled between {hpa.spec.min_replicas} and '
+            f'{hpa.spec.max_replicas} replicas, update the autoscale of the project instead.', 409)
     api = client.AppsV1Api(cli)
     body = {
         "spec": {
@@ -1594,6 +2332,134 @@ def get_k8s_node_resources(
     return result
 
 
+def get_k8s_node_free_resources(cli: ApiClient = DEFAULT_CLI) -> List[Dict]:
+    '''Returns the capacity and the resources not requested yet of the schedulable nodes.'''
+    v1_api = client.CoreV1Api(cli)
+    nodes = {}
+    for node in v1_api.list_node().items:
+        ready = any(condition.type == 'Ready' and condition.status == 'True'
+                    for condition in node.status.conditions or [])
+        tainted = any(taint.effect in ('NoSchedule', 'NoExecute') for taint in node.spec.taints or [])
+        if not ready or tainted or node.spec.unschedulable:
+            continue
+        allocatable = node.status.allocatable
+        capacity = {
+            'gpu': parse_gpu(allocatable.get('nvidia.com/gpu')),
+            'cpu': parse_cpu(allocatable['cpu']),
+            'mem': parse_mem(allocatable['memory'])
+        }
+        nodes[node.metadata.name] = {
+            'name': node.metadata.name,
+            'labels': node.metadata.labels or {},
+            'capacity': capacity,
+            'free': dict(capacity)
+        }
+
+    # One list of the pods instead of a list per node.
+    selector = 'status.phase!=Succeeded,status.phase!=Failed'
+    for pod in v1_api.list_pod_for_all_namespaces(field_selector=selector).items:
+        node = nodes.get(pod.spec.node_name)
+        if node is None:
+            continue
+        for container in pod.spec.containers:
+            requests = container.resources.requests or {}
+            node['free']['gpu'] -= parse_gpu(requests.get('nvidia.com/gpu') or '0')
+            node['free']['cpu'] -= parse_cpu(requests.get('cpu') or '0')
+            node['free']['mem'] -= parse_mem(requests.get('memory') or '0')
+    return list(nodes.values())
+
+
+def _obtain_placement_request(quota: Optional[Dict]) -> Dict[str, float]:
+    quota = quota or {}
+    return {
+        'gpu': quota.get('gpu') or 0,
+        'cpu': quota.get('cpu') or 0,
+        'mem': parse_mem(str(quota['mem'])) if quota.get('mem') else 0
+    }
+
+
+def score_nodes_best_fit(request: Dict[str, float], nodes: List[Dict],
+                         constraints: Optional[Dict] = None) -> List[Tuple[str, int]]:
+    '''Scores the nodes which fit the request from 0 to 100, the tightest fit first.
+
+    The score is higher as less of the node is left after placing the request, so the
+    requests are packed onto the fewest nodes and the free GPUs are not fragmented.
+    '''
+    selector = _convert_constraints_to_k8s_node_selector(constraints)
+    scores = []
+    for node in nodes:
+        if any(node['labels'].get(key) != value for key, value in selector.items()):
+            continue
+        if any(node['free'][resource] < request[resource] for resource in PLACEMENT_RESOURCES):
+            continue
+        left = {resource: (node['free'][resource] - request[resource]) / node['capacity'][resource]
+                if node['capacity'][resource] else 0 for resource in PLACEMENT_RESOURCES}
+        # The fit of GPUs matters the most, and GPU nodes are kept for the GPU requests.
+        weights = {'gpu': 4, 'cpu': 1, 'mem': 1}
+        if not request['gpu'] and node['capacity']['gpu']:
+            left['gpu'] = 1
+        waste = sum(weights[_] * left[_] for _ in PLACEMENT_RESOURCES) / sum(weights.values())
+        scores.append((node['name'], round(100 * (1 - waste))))
+    return sorted(scores, key=lambda _: -_[1])
+
+
+def _obtain_app_pods(app: Dict) -> int:
+    if app['kind'] == 'Service':
+        return app.get('scale') or 1
+    if app['kind'] == 'Distributed':
+        return app['workers']
+    return app.get('parallelism') or 1
+
+
+def plan_placements(app_dict: Dict, cli: ApiClient = DEFAULT_CLI) -> Dict[str, Dict]:
+    '''Places the pods of the apps with the best fit placement one by one on the nodes.
+
+    Returns the number of the pods by the nodes and the number of pods which do not fit.
+    '''
+    targets = {name: app for name, app in app_dict.items() if app.get('placement') == 'BestFit'}
+    if not targets:
+        return {}
+    nodes = get_k8s_node_free_resources(cli)
+    placements = {}
+    for name, app in targets.items():
+        request = _obtain_placement_request(app.get('quota'))
+        placement = {'nodes': defaultdict(int), 'unplaced': 0}
+        for _ in range(_obtain_app_pods(app)):
+            scores = score_nodes_best_fit(request, nodes, app.get('constraints'))
+            if not scores:
+                placement['unplaced'] += 1
+                continue
+            node = next(node for node in nodes if node['name'] == scores[0][0])
+            for resource in PLACEMENT_RESOURCES:
+                node['free'][resource] -= request[resource]
+            placement['nodes'][node['name']] += 1
+        placement['nodes'] = dict(placement['nodes'])
+        placements[name] = placement
+    return placements
+
+
+def _obtain_k8s_placement_affinity(placement: Optional[Dict[str, int]]) -> Optional[client.V1Affinity]:
+    if not placement:
+        return None
+    total = sum(placement.values())
+    ranked = sorted(placement.items(), key=lambda _: -_[1])[:PLACEMENT_PREFERRED_NODES]
+    # Preferences only, the scheduler still places the pods when the nodes changed.
+    return client.V1Affinity(
+        node_affinity=client.V1NodeAffinity(
+            preferred_during_scheduling_ignored_during_execution=[
+                client.V1PreferredSchedulingTerm(
+                    weight=max(round(100 * pods / total), 1),
+                    preference=client.V1NodeSelectorTerm(
+                        match_fields=[client.V1NodeSelectorRequirement(
+                            key='metadata.name', operator='In', values=[node_name])]
+                    )
+                )
+                for node_name, pods in ranked
+            ]
+        )
+    )
+
+
 def get_project_resources(
     project_key: str, group_by: str = 'project', no_trunc: bool = True,
     cli: ApiClient = DEFAULT_CLI
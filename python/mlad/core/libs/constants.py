@@ -25,3 +25,4 @@ MLAD_PROJECT_HOSTNAME = 'MLAD.PROJECT.HOSTNAME'
 MLAD_PROJECT_VERSION = 'MLAD.PROJECT.VERSION'
 MLAD_PROJECT_API_VERSION = 'MLAD.PROJECT.API_VERSION'
 MLAD_PROJECT_YAML = 'MLAD.PROJECT.YAML'
+MLAD_PROJECT_CONTEXT_DIGEST = 'MLAD.PROJECT.CONTEXT_DIGEST'
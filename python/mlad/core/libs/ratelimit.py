@@ -0,0 +1,200 @@
+import time
+import inspect
+import itertools
+import threading
+import contextvars
+
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Dict, List, Optional, Tuple
+
+READ = 'read'
+WRITE = 'write'
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+
+# Session of the request being served, set by the API server middleware.
+current_session = contextvars.ContextVar('mlad_session', default=None)
+# Priority of the admission scope the current call runs in, None outside of any scope.
+_current_priority = contextvars.ContextVar('mlad_admission_priority', default=None)
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now: float) -> float:
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0
+        return (1 - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+
+class AdmissionQueue:
+    '''Admits calls of one kind (read or write) against a global and a per-session budget.
+
+    Waiters are admitted in priority order. A waiter whose own session is out of tokens
+    does not hold back waiters of other sessions.
+    '''
+
+    def __init__(self, kind: str, rate: float, burst: int,
+                 session_rate: float, session_burst: int, max_sessions: int = 1024):
+        self.kind = kind
+        self.rate = rate
+        self.burst = burst
+        self.session_rate = session_rate
+        self.session_burst = session_burst
+        self.max_sessions = max_sessions
+        self._global = TokenBucket(rate, burst) if rate > 0 else None
+        self._sessions: Dict[Optional[str], TokenBucket] = OrderedDict()
+        self._cond = threading.Condition()
+        self._counter = itertools.count()
+        self._waiters: List[Tuple[int, int, Optional[str]]] = []
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    def _session_bucket(self, session: Optional[str]) -> Optional[TokenBucket]:
+        if self.session_rate <= 0:
+            return None
+        bucket = self._sessions.get(session)
+        if bucket is None:
+            if len(self._sessions) >= self.max_sessions:
+                self._sessions.popitem(last=False)
+            bucket = self._sessions[session] = TokenBucket(self.session_rate, self.session_burst)
+        else:
+            self._sessions.move_to_end(session)
+        return bucket
+
+    def _wait_time(self, session: Optional[str], now: float) -> float:
+        bucket = self._session_bucket(session)
+        return bucket.wait_time(now) if bucket is not None else 0
+
+    def acquire(self, session: Optional[str], priority: int = PRIORITY_NORMAL) -> float:
+        '''Blocks until the call is admitted and returns the time spent in the queue.'''
+        started = time.monotonic()
+        entry = (priority, next(self._counter), session)
+        with self._cond:
+            self._waiters.append(entry)
+            self._waiters.sort()
+            try:
+                while True:
+                    now = time.monotonic()
+                    timeout = None
+                    # The first waiter in priority order whose session has a token is next.
+                    for waiter in self._waiters:
+                        session_wait = self._wait_time(waiter[2], now)
+                        if session_wait == 0:
+                            break
+                        timeout = session_wait if timeout is None else min(timeout, session_wait)
+                    else:
+                        waiter = None
+                    if waiter is entry:
+                        global_wait = self._global.wait_time(now) if self._global else 0
+                        if global_wait == 0:
+                            if self._global:
+                                self._global.take()
+                            bucket = self._session_bucket(session)
+                            if bucket is not None:
+                                bucket.take()
+                            break
+                        timeout = global_wait
+                    self._cond.wait(timeout)
+            finally:
+                self._waiters.remove(entry)
+                self._cond.notify_all()
+        return time.monotonic() - started
+
+
+_listeners: List[Callable[[str, float, int], None]] = []
+_queues: Dict[str, AdmissionQueue] = {}
+
+
+def _share(budget: Dict, shares: int) -> Dict:
+    return {key: value / shares if key.endswith('rate') else max(int(value // shares), 1)
+            for key, value in budget.items()}
+
+
+def configure(read: Dict, write: Dict, shares: int = 1):
+    '''Sets the budgets with dicts of rate, burst, session_rate and session_burst.
+
+    With several processes calling kube-apiserver, each process gets an even share.
+    '''
+    _queues[READ] = AdmissionQueue(READ, **_share(read, shares))
+    _queues[WRITE] = AdmissionQueue(WRITE, **_share(write, shares))
+
+
+def add_listener(listener: Callable[[str, float, int], None]):
+    '''Registers a callback called with (kind, queueing delay, waiters) on each admission.'''
+    _listeners.append(listener)
+
+
+def waiting(kind: str) -> int:
+    queue = _queues.get(kind)
+    return queue.waiting if queue is not None else 0
+
+
+def acquire(kind: str, priority: int = PRIORITY_NORMAL):
+    queue = _queues.get(kind)
+    if queue is None:
+        return
+    delay = queue.acquire(current_session.get(), priority)
+    for listener in _listeners:
+        listener(kind, delay, queue.waiting)
+
+
+@contextmanager
+def scope(priority: int = PRIORITY_NORMAL):
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def admission(priority: int = PRIORITY_NORMAL):
+    '''Rate limits the kube-apiserver calls made while the decorated function runs.'''
+    def decorator(func: Callable):
+        if inspect.isgeneratorfunction(func):
+            @wraps(func)
+            def generator_wrapper(*args, **kwargs):
+                with scope(priority):
+                    yield from func(*args, **kwargs)
+            return generator_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with scope(priority):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def instrument_api_client(cli):
+    if cli is None or getattr(cli, '_mlad_ratelimited', False):
+        return cli
+    call_api = cli.call_api
+
+    def limited_call_api(resource_path, method, *args, **kwargs):
+        priority = _current_priority.get()
+        if priority is not None:
+            acquire(READ if method.upper() == 'GET' else WRITE, priority)
+        return call_api(resource_path, method, *args, **kwargs)
+
+    cli.call_api = limited_call_api
+    cli._mlad_ratelimited = True
+    return cli
@@ -2,12 +2,12 @@ import copy
 import uuid
 import json
 import base64
-import jwt
 
 from mlad.core import exceptions
 
 
 def get_username(session):
+    import jwt
     decoded = jwt.decode(session, "mlad", algorithms="HS256")
     if decoded["user"]:
         return decoded["user"]
@@ -1,19 +1,32 @@
 import os
+import time
+import asyncio
+import tempfile
+import multiprocessing
 import uvicorn
 from mlad import __version__
-from mlad.service.libs import utils
+from mlad.service.libs import utils, metrics, cache
+from mlad.service.libs.middleware import VersionCheckMiddleware, SessionContextMiddleware
 
-from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from mlad.service.exceptions import VersionCompatabilityError
-from mlad.service.routers import app as app_router, project, node, check, quota
+from mlad.service.routers import (
+    app as app_router, project, node, check, quota, operation, metrics as metrics_router
+)
+from mlad.core.kubernetes import controller as ctlr
+from mlad.core.libs import ratelimit
 from mlad.core.default.config import service_config
 
 
 APIV1 = '/api/v1'
 
 
+def _ratelimit_shares():
+    # Workers and the cache daemon split the kube-apiserver budget evenly.
+    workers = service_config['server']['workers']
+    return workers + 1 if workers > 1 else 1
+
+
 def create_app():
     root_path = os.environ.get('ROOT_PATH', '')
     app = FastAPI(
@@ -24,6 +37,16 @@ def create_app():
         root_path=root_path,
     )
 
+    metrics.instrument_api_client(ctlr.DEFAULT_CLI)
+    cache_client = cache.get_client()
+    if cache_client is not None:
+        cache.install(ctlr.DEFAULT_CLI, client=cache_client)
+    ratelimit.instrument_api_client(ctlr.DEFAULT_CLI)
+    ratelimit.configure(**service_config['ratelimit'], shares=_ratelimit_shares())
+    ratelimit.add_listener(metrics.observe_admission)
+
+    app.add_middleware(SessionContextMiddleware)
+    app.add_middleware(VersionCheckMiddleware)
     app.add_middleware(
         CORSMiddleware,
         allow_origins=['*'],
@@ -31,12 +54,19 @@ def create_app():
         allow_methods=['*'],
         allow_headers=['*'],
     )
+    app.add_middleware(metrics.MetricsMiddleware)
+
+    @app.on_event('startup')
+    async def init_metrics():
+        metrics.init_gauges(asyncio.get_event_loop())
 
     app.include_router(node.router, prefix=APIV1)
     app.include_router(app_router.router, prefix=APIV1)
     app.include_router(project.router, prefix=APIV1)
     app.include_router(check.router, prefix=APIV1)
     app.include_router(quota.router, prefix=APIV1)
+    app.include_router(operation.router, prefix=APIV1)
+    app.include_router(metrics_router.router)
 
     print("Orchestrator : 'Kubernetes'")
     print(f"Debug        : {'TRUE' if utils.is_debug_mode() else 'FALSE'}")
@@ -44,24 +74,43 @@ def create_app():
     return app
 
 
-app = create_app()
-
+def __getattr__(name):
+    # Build the app on first access, uvicorn workers and the cache daemon re-import
+    # this module when they are spawned and must not build an app they don't serve.
+    if name == 'app':
+        global app
+        app = create_app()
+        return app
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
 
-@app.middleware('http')
-async def check_version(request: Request, call_next):
-    client_ver = request.headers.get('version', '0.3.1')
-    client_major, client_minor = client_ver.split('.', 2)[:2]
-    server_major, server_minor = __version__.split('.', 2)[:2]
-    if client_major != server_major or client_minor != server_minor:
-        return JSONResponse(
-            status_code=400,
-            content={'detail': str(VersionCompatabilityError(client_ver, __version__))}
-        )
 
-    return await call_next(request)
+def _start_cache_daemon():
+    os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', tempfile.mkdtemp(prefix='mlad-metrics-'))
+    authkey = os.urandom(32)
+    os.environ[cache.AUTHKEY_ENV] = authkey.hex()
+    cache_config = service_config['cache']
+    daemon = multiprocessing.get_context('spawn').Process(
+        target=cache.run_daemon, name='mlad-cache',
+        args=(cache_config, service_config['ratelimit'], authkey, _ratelimit_shares()),
+        daemon=True
+    )
+    daemon.start()
+    for _ in range(300):
+        if os.path.exists(cache_config['socket']) or not daemon.is_alive():
+            break
+        time.sleep(0.1)
+    print(f"Cache daemon : {cache_config['socket']}")
 
 
 if __name__ == '__main__':
-    uvicorn.run(app, host=service_config['server']['host'],
-                port=service_config['server']['port'],
-                debug=service_config['server']['debug'])
+    server_config = service_config['server']
+    if server_config['workers'] > 1:
+        _start_cache_daemon()
+        uvicorn.run('mlad.service.__main__:app', host=server_config['host'],
+                    port=server_config['port'], debug=server_config['debug'],
+                    workers=server_config['workers'])
+    else:
+        app = create_app()
+        metrics.record_pod_startups()
+        uvicorn.run(app, host=server_config['host'],
+                    port=server_config['port'], debug=server_config['debug'])
@@ -24,6 +24,15 @@ class VersionCompatabilityError(MLADException):
         return f'The CLI version [{self.client}] is not compatible with the server version [{self.server}]'
 
 
+class OperationNotFoundError(MLADException):
+
+    def __init__(self, operation_id: str):
+        self.operation_id = operation_id
+
+    def __str__(self):
+        return f'Cannot find operation [{self.operation_id}]'
+
+
 def exception_detail(e):
     exception = e.__class__.__name__
     msg = str(e)
@@ -36,6 +45,8 @@ def exception_detail(e):
         reason = 'ProjectNotFound'
     elif exception == 'InvalidLogRequest':
         reason = 'AppNotRunning'
+    elif exception == 'OperationNotFoundError':
+        reason = 'OperationNotFound'
     elif exception == 'InsufficientSessionQuotaError':
         reason = 'InsufficientSessionQuotaError'
     else:
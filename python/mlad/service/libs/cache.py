@@ -0,0 +1,234 @@
+'''Cache daemon shared by the worker processes of the API server.
+
+With several uvicorn workers, one daemon process owns the kube-apiserver reads that
+workers would otherwise repeat N times. Workers forward their GET calls to the daemon
+over a local socket, which answers them from a short-lived response cache and coalesces
+identical in-flight requests into one apiserver call. Background operations also run in
+the daemon so that every worker sees the same operations.
+'''
+import os
+import json
+import time
+import threading
+
+from multiprocessing.connection import Client, Listener
+from typing import Dict, Optional, Tuple
+
+from kubernetes.client.rest import ApiException
+
+from mlad.core.libs import ratelimit
+from mlad.service.libs import operation as operation_lib
+
+
+AUTHKEY_ENV = 'MLAD_CACHE_AUTHKEY'
+
+
+class _Response:
+    # Minimal stand-in for the urllib3 response consumed by ApiClient.deserialize.
+    def __init__(self, data: bytes):
+        self.data = data
+
+
+def _cache_key(resource_path: str, path_params: Optional[Dict], query_params) -> Tuple:
+    query = query_params.items() if isinstance(query_params, dict) else (query_params or [])
+    return (resource_path,
+            tuple(sorted((path_params or {}).items())),
+            tuple(sorted((str(k), str(v)) for k, v in query)))
+
+
+def _is_cacheable(method: str, query_params, kwargs: Dict) -> bool:
+    if method.upper() != 'GET' or kwargs.get('async_req'):
+        return False
+    if not kwargs.get('_preload_content', True) or kwargs.get('response_type') is None:
+        return False
+    if not kwargs.get('_return_http_data_only'):
+        return False
+    params = dict(query_params.items() if isinstance(query_params, dict) else (query_params or []))
+    return not params.get('watch') and not params.get('follow')
+
+
+class CacheDaemon:
+    def __init__(self, cli, address: str, authkey: bytes, ttl: float):
+        self.cli = cli
+        self.address = address
+        self.authkey = authkey
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple, Tuple[float, int, bytes]] = {}
+        self._inflight: Dict[Tuple, threading.Lock] = {}
+        self._generation = 0
+
+    def _fetch(self, resource_path, path_params, query_params, kwargs) -> Tuple[int, bytes]:
+        key = _cache_key(resource_path, path_params, query_params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                return 200, entry[2]
+            lock = self._inflight.setdefault(key, threading.Lock())
+        with lock:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] > time.monotonic():
+                    return 200, entry[2]
+                generation = self._generation
+            try:
+                resp = self.cli.call_api(
+                    resource_path, 'GET', path_params, query_params,
+                    kwargs.get('header_params'), auth_settings=kwargs.get('auth_settings'),
+                    collection_formats=kwargs.get('collection_formats'),
+                    _request_timeout=kwargs.get('_request_timeout'),
+                    _return_http_data_only=True, _preload_content=False)
+                data = resp.data
+            except ApiException as e:
+                return e.status, json.dumps({'reason': e.reason, 'body': e.body}).encode()
+            finally:
+                with self._lock:
+                    self._inflight.pop(key, None)
+            with self._lock:
+                # Drop the response if a write invalidated the cache meanwhile.
+                if generation == self._generation:
+                    self._entries[key] = (time.monotonic() + self.ttl, generation, data)
+            return 200, data
+
+    def _invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def _handle(self, request: Tuple):
+        command, args = request
+        if command == 'get':
+            return self._fetch(*args)
+        elif command == 'invalidate':
+            return self._invalidate()
+        elif command == 'submit':
+            kind, project_key, func, func_args, session = args
+            token = ratelimit.current_session.set(session)
+            try:
+                return operation_lib.get_manager().submit(kind, project_key, func, *func_args).to_dict()
+            finally:
+                ratelimit.current_session.reset(token)
+        elif command == 'operation':
+            operation_id, since = args
+            try:
+                return operation_lib.get_manager().get(operation_id).to_dict(since)
+            except operation_lib.OperationNotFoundError:
+                return None
+        elif command == 'operations':
+            return [_.to_dict() for _ in operation_lib.get_manager().list(*args)]
+        raise ValueError(f'Unknown cache daemon command [{command}]')
+
+    def _serve_connection(self, conn):
+        with conn:
+            while True:
+                try:
+                    request = conn.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    conn.send((True, self._handle(request)))
+                except Exception as e:
+                    conn.send((False, f'{e.__class__.__name__}: {e}'))
+
+    def serve_forever(self):
+        if os.path.exists(self.address):
+            os.remove(self.address)
+        with Listener(self.address, family='AF_UNIX', authkey=self.authkey) as listener:
+            while True:
+                try:
+                    conn = listener.accept()
+                except Exception as e:
+                    print(f'Cache daemon failed to accept a connection [{e}]')
+                    continue
+                threading.Thread(target=self._serve_connection, args=(conn,), daemon=True).start()
+
+
+def run_daemon(config: Dict, ratelimit_config: Dict, authkey: bytes, shares: int = 1):
+    # The daemon serves the workers and runs operations itself, it is not a client.
+    os.environ.pop(AUTHKEY_ENV, None)
+    from mlad.core.kubernetes import controller as ctlr
+    from mlad.service.libs import metrics
+    metrics.instrument_api_client(ctlr.DEFAULT_CLI)
+    daemon = CacheDaemon(ctlr.DEFAULT_CLI, config['socket'], authkey, config['ttl'])
+    install(ctlr.DEFAULT_CLI, daemon=daemon)
+    ratelimit.instrument_api_client(ctlr.DEFAULT_CLI)
+    ratelimit.configure(**ratelimit_config, shares=shares)
+    ratelimit.add_listener(metrics.observe_admission)
+    metrics.record_pod_startups()
+    daemon.serve_forever()
+
+
+class CacheClient:
+    def __init__(self, address: str, authkey: bytes):
+        self.address = address
+        self.authkey = authkey
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = Client(self.address, family='AF_UNIX', authkey=self.authkey)
+        return conn
+
+    def request(self, command: str, *args):
+        for retry in range(2):
+            try:
+                conn = self._connection()
+                conn.send((command, args))
+                succeed, result = conn.recv()
+                break
+            except (EOFError, OSError):
+                self._local.conn = None
+                if retry:
+                    raise
+        if not succeed:
+            raise RuntimeError(result)
+        return result
+
+
+_client: Optional[CacheClient] = None
+
+
+def get_client() -> Optional[CacheClient]:
+    global _client
+    if _client is None and AUTHKEY_ENV in os.environ:
+        from mlad.core.default.config import service_config
+        _client = CacheClient(service_config['cache']['socket'],
+                              bytes.fromhex(os.environ[AUTHKEY_ENV]))
+    return _client
+
+
+def install(cli, client: Optional[CacheClient] = None, daemon: Optional[CacheDaemon] = None):
+    '''Route cacheable reads of the client through the daemon and invalidate it on writes.
+
+    In the daemon itself, only the invalidation on writes made by operations is installed.
+    '''
+    if cli is None or getattr(cli, '_mlad_cached', False):
+        return cli
+    call_api = cli.call_api
+
+    def cached_call_api(resource_path, method, path_params=None, query_params=None,
+                        *args, **kwargs):
+        if client is not None and not args and _is_cacheable(method, query_params, kwargs):
+            status, data = client.request('get', resource_path, path_params, query_params, {
+                key: kwargs.get(key) for key in
+                ('header_params', 'auth_settings', 'collection_formats', '_request_timeout')
+            })
+            if status != 200:
+                error = json.loads(data)
+                e = ApiException(status=status, reason=error['reason'])
+                e.body = error['body']
+                raise e
+            return cli.deserialize(_Response(data), kwargs['response_type'])
+        try:
+            return call_api(resource_path, method, path_params, query_params, *args, **kwargs)
+        finally:
+            if method.upper() != 'GET':
+                if client is not None:
+                    client.request('invalidate')
+                elif daemon is not None:
+                    daemon._invalidate()
+
+    cli.call_api = cached_call_api
+    cli._mlad_cached = True
+    return cli
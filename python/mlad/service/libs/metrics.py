@@ -0,0 +1,265 @@
+import os
+import time
+import asyncio
+import threading
+
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+from fastapi.responses import Response
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest,
+    multiprocess
+)
+from kubernetes.client.api_client import ApiClient
+
+
+REQUEST_LATENCY = Histogram(
+    'mlad_http_request_duration_seconds',
+    'Latency of API server requests until the response starts.',
+    ['method', 'route', 'status']
+)
+K8S_API_CALLS = Counter(
+    'mlad_k8s_api_calls_total',
+    'Number of calls to the kube-apiserver.',
+    ['verb', 'resource', 'status']
+)
+K8S_API_LATENCY = Histogram(
+    'mlad_k8s_api_call_duration_seconds',
+    'Latency of calls to the kube-apiserver.',
+    ['verb', 'resource']
+)
+# Set by the API server when it runs several worker processes.
+MULTIPROCESS = 'PROMETHEUS_MULTIPROC_DIR' in os.environ
+LOG_FOLLOWERS = Gauge(
+    'mlad_log_followers',
+    'Number of clients following project logs.',
+    multiprocess_mode='livesum'
+)
+WATCH_STREAMS = Gauge(
+    'mlad_watch_streams',
+    'Number of open watch streams against the kube-apiserver.',
+    multiprocess_mode='livesum'
+)
+THREADPOOL_WORKERS = Gauge(
+    'mlad_threadpool_workers',
+    'Number of threads spawned by the request threadpool.',
+    multiprocess_mode='livesum'
+)
+THREADPOOL_MAX_WORKERS = Gauge(
+    'mlad_threadpool_max_workers',
+    'Maximum number of threads of the request threadpool.',
+    multiprocess_mode='livesum'
+)
+THREADPOOL_QUEUE = Gauge(
+    'mlad_threadpool_queue',
+    'Number of sync handlers waiting for a free thread.',
+    multiprocess_mode='livesum'
+)
+ADMISSION_DELAY = Histogram(
+    'mlad_admission_queue_delay_seconds',
+    'Time kube-apiserver calls waited for the admission rate limiter.',
+    ['kind'],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+)
+ADMISSION_WAITING = Gauge(
+    'mlad_admission_queue_waiting',
+    'Number of kube-apiserver calls waiting for the admission rate limiter.',
+    ['kind'],
+    multiprocess_mode='livesum'
+)
+# The quantiles are derived by histogram_quantile to aggregate the workers.
+POD_STARTUP_LATENCY = Histogram(
+    'mlad_pod_startup_duration_seconds',
+    'Startup latency of pods by phases.',
+    ['phase'],
+    buckets=(0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300, 600, 1800)
+)
+# Pods are reported by every change, so each of them is observed once.
+POD_STARTUP_OBSERVED = 10000
+
+_executor_loop: Optional[asyncio.AbstractEventLoop] = None
+_observed_pods: Dict[str, None] = OrderedDict()
+
+
+def _default_executor():
+    # Sync path operations run on the default executor of the serving loop.
+    if _executor_loop is None:
+        return None
+    return getattr(_executor_loop, '_default_executor', None)
+
+
+def _count_threads(*classes) -> int:
+    return len([thread for thread in threading.enumerate()
+                if isinstance(thread, classes) and thread.is_alive()])
+
+
+def init_gauges(loop: asyncio.AbstractEventLoop):
+    global _executor_loop
+    _executor_loop = loop
+
+    from mlad.core.kubernetes.monitor import DelMonitor
+    from mlad.core.kubernetes.logs import LogMonitor
+
+    functions = [
+        (WATCH_STREAMS, lambda: _count_threads(DelMonitor, LogMonitor)),
+        (THREADPOOL_WORKERS, lambda: len(getattr(_default_executor(), '_threads', ()))),
+        (THREADPOOL_MAX_WORKERS, lambda: getattr(_default_executor(), '_max_workers', 0)),
+        (THREADPOOL_QUEUE,
+         lambda: _default_executor()._work_queue.qsize() if _default_executor() else 0),
+    ]
+    if not MULTIPROCESS:
+        for gauge, function in functions:
+            gauge.set_function(function)
+        return
+
+    # Values of other processes are read from files, so refresh them periodically.
+    def refresh():
+        while True:
+            for gauge, function in functions:
+                gauge.set(function())
+            time.sleep(5)
+    threading.Thread(target=refresh, daemon=True).start()
+
+
+def observe_admission(kind: str, delay: float, waiting: int):
+    ADMISSION_DELAY.labels(kind).observe(delay)
+    ADMISSION_WAITING.labels(kind).set(waiting)
+
+
+def observe_pod_startup(uid: str, startup: Dict[str, Optional[float]]):
+    if uid in _observed_pods:
+        return
+    _observed_pods[uid] = None
+    if len(_observed_pods) > POD_STARTUP_OBSERVED:
+        _observed_pods.popitem(last=False)
+    for phase, seconds in startup.items():
+        if seconds is not None:
+            POD_STARTUP_LATENCY.labels(phase).observe(seconds)
+
+
+def record_pod_startups():
+    '''Observe the startup latency of the pods started from now on by a pod watch.
+
+    Only one process of the API server records them, the cache daemon with several workers.
+    '''
+    from mlad.core.kubernetes import controller as ctlr
+    since = datetime.now(timezone.utc)
+
+    def record():
+        while True:
+            try:
+                for uid, startup in ctlr.watch_pod_startups(since, _observed_pods):
+                    observe_pod_startup(uid, startup)
+            except Exception as e:
+                print(f'Failed to watch the startup of pods [{e}]')
+                time.sleep(5)
+    threading.Thread(target=record, daemon=True, name='mlad-pod-startups').start()
+
+
+def metrics_response() -> Response:
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
+def parse_k8s_call(resource_path: str, method: str,
+                   query_params: Optional[list] = None) -> Tuple[str, str]:
+    # ex) /apis/apps/v1/namespaces/{namespace}/deployments/{name}/scale
+    #     -> ('patch', 'deployments/scale')
+    segments = [_ for _ in resource_path.strip('/').split('/') if _]
+    if segments[:1] == ['api']:
+        segments = segments[2:]
+    elif segments[:1] == ['apis']:
+        segments = segments[3:]
+    if segments[:2] == ['namespaces', '{namespace}'] and len(segments) > 2:
+        segments = segments[2:]
+    named = any(_.startswith('{') for _ in segments)
+    resource = '/'.join([_ for _ in segments if not _.startswith('{')]) or 'unknown'
+
+    method = method.upper()
+    params = dict(query_params or [])
+    if method == 'GET':
+        if params.get('watch'):
+            verb = 'watch'
+        else:
+            verb = 'get' if named else 'list'
+    elif method == 'POST':
+        verb = 'create'
+    elif method == 'PUT':
+        verb = 'update'
+    elif method == 'PATCH':
+        verb = 'patch'
+    elif method == 'DELETE':
+        verb = 'delete' if named else 'deletecollection'
+    else:
+        verb = method.lower()
+    return verb, resource
+
+
+def instrument_api_client(cli: Optional[ApiClient]) -> Optional[ApiClient]:
+    if cli is None or getattr(cli, '_mlad_instrumented', False):
+        return cli
+    call_api = cli.call_api
+
+    def instrumented_call_api(resource_path, method, path_params=None, query_params=None,
+                              *args, **kwargs):
+        verb, resource = parse_k8s_call(resource_path, method, query_params)
+        status = 'error'
+        started = time.monotonic()
+        try:
+            resp = call_api(resource_path, method, path_params, query_params, *args, **kwargs)
+            status = 'success'
+            return resp
+        except Exception as e:
+            status = str(getattr(e, 'status', None) or 'error')
+            raise
+        finally:
+            K8S_API_CALLS.labels(verb, resource, status).inc()
+            K8S_API_LATENCY.labels(verb, resource).observe(time.monotonic() - started)
+
+    cli.call_api = instrumented_call_api
+    cli._mlad_instrumented = True
+    return cli
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    def _route_of(self, scope) -> str:
+        from starlette.routing import Match
+        for route in scope['app'].routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return getattr(route, 'path', scope['path'])
+        return 'unmatched'
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        started = time.monotonic()
+        responded = False
+
+        def observe(status: str):
+            REQUEST_LATENCY.labels(scope['method'], self._route_of(scope), status) \
+                .observe(time.monotonic() - started)
+
+        async def send_wrapper(message):
+            nonlocal responded
+            if message['type'] == 'http.response.start':
+                responded = True
+                observe(str(message['status']))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            if not responded:
+                observe('500')
+            raise
@@ -0,0 +1,88 @@
+import re
+import json
+
+from mlad import __version__
+from mlad.core.libs import ratelimit
+from mlad.service.exceptions import VersionCompatabilityError
+
+
+DEFAULT_CLIENT_VERSION = '0.3.1'
+# Called by the init containers of the apps, which outlive the upgrades of the API server.
+INIT_CONTAINER_PATH_PATTERNS = (r'/project/[^/]+/app/[^/]+/wait$', r'/node/pods/running$')
+
+
+def _major_minor(version: str):
+    return tuple(version.split('.', 2)[:2])
+
+
+class VersionCheckMiddleware:
+    '''Reject requests from incompatible CLI versions without wrapping the response stream.'''
+
+    def __init__(self, app, server_version: str = __version__, exclude_paths=('/metrics',),
+                 exclude_patterns=INIT_CONTAINER_PATH_PATTERNS):
+        self.app = app
+        self.server_version = server_version
+        self.server_major_minor = _major_minor(server_version)
+        self.exclude_paths = set(exclude_paths)
+        self.exclude_pattern = re.compile('|'.join(exclude_patterns)) if exclude_patterns else None
+        self._compatibles = {}
+
+    def _is_compatible(self, client_version: str) -> bool:
+        compatible = self._compatibles.get(client_version)
+        if compatible is None:
+            compatible = _major_minor(client_version) == self.server_major_minor
+            # Bound the cache since the header value comes from clients.
+            if len(self._compatibles) < 1024:
+                self._compatibles[client_version] = compatible
+        return compatible
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['path'] in self.exclude_paths or \
+                (self.exclude_pattern is not None and self.exclude_pattern.search(scope['path'])):
+            await self.app(scope, receive, send)
+            return
+
+        client_version = DEFAULT_CLIENT_VERSION
+        for key, value in scope['headers']:
+            if key == b'version':
+                client_version = value.decode('latin-1')
+                break
+
+        if self._is_compatible(client_version):
+            await self.app(scope, receive, send)
+            return
+
+        error = VersionCompatabilityError(client_version, self.server_version)
+        body = json.dumps({'detail': str(error)}).encode()
+        await send({
+            'type': 'http.response.start',
+            'status': 400,
+            'headers': [
+                (b'content-type', b'application/json'),
+                (b'content-length', str(len(body)).encode())
+            ]
+        })
+        await send({'type': 'http.response.body', 'body': body})
+
+
+class SessionContextMiddleware:
+    '''Expose the session header of the request to the admission rate limiter.'''
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        session = None
+        for key, value in scope['headers']:
+            if key == b'session':
+                session = value.decode('latin-1')
+                break
+        token = ratelimit.current_session.set(session)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            ratelimit.current_session.reset(token)
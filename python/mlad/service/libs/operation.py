@@ -0,0 +1,237 @@
+import time
+import uuid
+import asyncio
+import threading
+import contextvars
+
+from functools import partial
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Deque, Dict, Generator, List, Optional
+
+from mlad.core.default.config import service_config
+from mlad.service.exceptions import OperationNotFoundError
+
+
+LogGenerator = Generator[Dict[str, str], None, None]
+
+PENDING = 'pending'
+RUNNING = 'running'
+SUCCEED = 'succeed'
+FAILED = 'failed'
+
+
+class Operation:
+    def __init__(self, kind: str, project_key: str, target: Callable[[], LogGenerator]):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.project_key = project_key
+        self.status = PENDING
+        self.created = time.time()
+        self.finished: Optional[float] = None
+        self.events: List[Dict] = []
+        self._target = target
+        # Keep the request context, e.g. the session seen by the rate limiter.
+        self._context = contextvars.copy_context()
+        self._lock = threading.Lock()
+        self._waiters = set()
+
+    @property
+    def done(self) -> bool:
+        return self.status in (SUCCEED, FAILED)
+
+    def _notify(self):
+        for loop, event in list(self._waiters):
+            loop.call_soon_threadsafe(event.set)
+
+    def _append(self, event: Dict):
+        with self._lock:
+            self.events.append(event)
+        self._notify()
+
+    def run(self):
+        self._context.run(self._run)
+
+    def _run(self):
+        self.status = RUNNING
+        failed = False
+        try:
+            for event in self._target():
+                if event.get('result') == 'failed':
+                    failed = True
+                self._append(event)
+        except Exception as e:
+            failed = True
+            self._append({'error': True, 'stream': f'{e.__class__.__name__}: {e}'})
+        finally:
+            self._target = None
+            self.finished = time.time()
+            self.status = FAILED if failed else SUCCEED
+            self._notify()
+
+    def to_dict(self, since: Optional[int] = None) -> Dict:
+        spec = {
+            'id': self.id,
+            'kind': self.kind,
+            'project_key': self.project_key,
+            'status': self.status,
+            'created': self.created,
+            'finished': self.finished,
+        }
+        if since is not None:
+            with self._lock:
+                spec['events'] = self.events[since:]
+        return spec
+
+    async def follow(self, since: int = 0):
+        loop = asyncio.get_event_loop()
+        event = asyncio.Event()
+        waiter = (loop, event)
+        self._waiters.add(waiter)
+        try:
+            while True:
+                event.clear()
+                done = self.done
+                with self._lock:
+                    events = self.events[since:]
+                since += len(events)
+                for _ in events:
+                    yield _
+                if done:
+                    break
+                await event.wait()
+        finally:
+            self._waiters.discard(waiter)
+
+
+class OperationManager:
+    '''Runs long project mutations in the background.
+
+    Operations on the same project run one at a time in submission order while
+    operations on different projects share a bounded pool of workers.
+    '''
+
+    def __init__(self, max_workers: int, ttl: int):
+        self.ttl = ttl
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix='mlad-operation')
+        self._lock = threading.Lock()
+        self._operations: Dict[str, Operation] = {}
+        self._queues: Dict[str, Deque[Operation]] = {}
+
+    def submit(self, kind: str, project_key: str,
+               func: Callable[..., LogGenerator], *args) -> Operation:
+        operation = Operation(kind, project_key, partial(func, *args))
+        with self._lock:
+            self._prune()
+            self._operations[operation.id] = operation
+            queue = self._queues.setdefault(project_key, deque())
+            queue.append(operation)
+            if len(queue) == 1:
+                self._executor.submit(self._run, operation)
+        return operation
+
+    def _run(self, operation: Operation):
+        try:
+            operation.run()
+        finally:
+            with self._lock:
+                queue = self._queues[operation.project_key]
+                queue.popleft()
+                if queue:
+                    self._executor.submit(self._run, queue[0])
+                else:
+                    del self._queues[operation.project_key]
+
+    def _prune(self):
+        expired = time.time() - self.ttl
+        for key, operation in list(self._operations.items()):
+            if operation.done and operation.finished < expired:
+                del self._operations[key]
+
+    def get(self, operation_id: str) -> Operation:
+        operation = self._operations.get(operation_id)
+        if operation is None:
+            raise OperationNotFoundError(operation_id)
+        return operation
+
+    def list(self, project_key: Optional[str] = None) -> List[Operation]:
+        with self._lock:
+            self._prune()
+            operations = list(self._operations.values())
+        if project_key is not None:
+            operations = [_ for _ in operations if _.project_key == project_key]
+        return sorted(operations, key=lambda _: _.created)
+
+
+class RemoteOperation:
+    '''Operation run by the cache daemon on behalf of a worker process.'''
+
+    poll_interval = 0.5
+
+    def __init__(self, client, spec: Dict):
+        self._client = client
+        self.id = spec['id']
+        self.project_key = spec['project_key']
+        self.created = spec['created']
+        self._spec = spec
+
+    def to_dict(self, since: Optional[int] = None) -> Dict:
+        if since is None:
+            return self._spec
+        return self._client.request('operation', self.id, since)
+
+    async def follow(self, since: int = 0):
+        from starlette.concurrency import run_in_threadpool
+        while True:
+            spec = await run_in_threadpool(self._client.request, 'operation', self.id, since)
+            if spec is None:
+                break
+            since += len(spec['events'])
+            for _ in spec['events']:
+                yield _
+            if spec['status'] in (SUCCEED, FAILED):
+                break
+            if not spec['events']:
+                await asyncio.sleep(self.poll_interval)
+
+
+class RemoteOperationManager:
+    '''Submits operations to the cache daemon shared by the API server workers.'''
+
+    def __init__(self, client):
+        self._client = client
+
+    def submit(self, kind: str, project_key: str,
+               func: Callable[..., LogGenerator], *args) -> RemoteOperation:
+        from mlad.core.libs.ratelimit import current_session
+        spec = self._client.request('submit', kind, project_key, func, args, current_session.get())
+        return RemoteOperation(self._client, spec)
+
+    def get(self, operation_id: str) -> RemoteOperation:
+        spec = self._client.request('operation', operation_id, None)
+        if spec is None:
+            raise OperationNotFoundError(operation_id)
+        return RemoteOperation(self._client, spec)
+
+    def list(self, project_key: Optional[str] = None) -> List[RemoteOperation]:
+        return [RemoteOperation(self._client, spec)
+                for spec in self._client.request('operations', project_key)]
+
+
+_manager: Optional[OperationManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_manager() -> OperationManager:
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            from mlad.service.libs import cache
+            client = cache.get_client()
+            if client is not None:
+                _manager = RemoteOperationManager(client)
+            else:
+                config = service_config['operation']
+                _manager = OperationManager(config['workers'], config['ttl'])
+        return _manager
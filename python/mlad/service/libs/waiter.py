@@ -0,0 +1,105 @@
+import asyncio
+import threading
+
+from typing import Dict, Optional, Tuple
+
+from mlad.core.kubernetes import controller as ctlr
+
+
+WATCH_TIMEOUT = 30
+
+
+class AppWatch:
+    def __init__(self, namespace: str, app_name: str):
+        self.namespace = namespace
+        self.app_name = app_name
+        self.phases: Optional[Dict[str, str]] = None
+        self.error: Optional[Exception] = None
+        self.waiters = set()
+
+    def notify(self):
+        for loop, event in list(self.waiters):
+            loop.call_soon_threadsafe(event.set)
+
+
+class AppWaiter:
+    '''Waits for the conditions of the apps without blocking the request threads.
+
+    The waiters of an app share one pod watch run by a thread, which ends when the
+    last waiter of the app leaves.
+    '''
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._watches: Dict[Tuple[str, str], AppWatch] = {}
+
+    def _join(self, namespace: str, app_name: str, waiter) -> AppWatch:
+        with self._lock:
+            watch = self._watches.get((namespace, app_name))
+            if watch is None:
+                watch = AppWatch(namespace, app_name)
+                self._watches[(namespace, app_name)] = watch
+                threading.Thread(target=self._run, args=(watch,), daemon=True,
+                                 name=f'mlad-wait-{app_name}').start()
+            watch.waiters.add(waiter)
+            return watch
+
+    def _leave(self, watch: AppWatch, waiter):
+        with self._lock:
+            watch.waiters.discard(waiter)
+
+    def _stop_if_idle(self, watch: AppWatch) -> bool:
+        with self._lock:
+            if watch.waiters and watch.error is None:
+                return False
+            self._watches.pop((watch.namespace, watch.app_name), None)
+            return True
+
+    def _run(self, watch: AppWatch):
+        while not self._stop_if_idle(watch):
+            try:
+                for phases in ctlr.watch_app_phases(watch.namespace, watch.app_name, WATCH_TIMEOUT):
+                    watch.phases = phases
+                    watch.notify()
+                    if not watch.waiters:
+                        break
+            except Exception as e:
+                # The waiters fail and the next waiters of the app start a new watch.
+                watch.error = e
+                watch.notify()
+
+    async def wait(self, namespace: str, app_name: str, condition: str, timeout: int) -> bool:
+        loop = asyncio.get_event_loop()
+        event = asyncio.Event()
+        waiter = (loop, event)
+        watch = self._join(namespace, app_name, waiter)
+        deadline = loop.time() + timeout
+        try:
+            while True:
+                event.clear()
+                if watch.error is not None:
+                    raise watch.error
+                if watch.phases is not None and \
+                        ctlr.check_app_condition(list(watch.phases.values()), condition):
+                    return True
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    return False
+                try:
+                    await asyncio.wait_for(event.wait(), remaining)
+                except asyncio.TimeoutError:
+                    return False
+        finally:
+            self._leave(watch, waiter)
+
+
+_waiter: Optional[AppWaiter] = None
+_waiter_lock = threading.Lock()
+
+
+def get_waiter() -> AppWaiter:
+    global _waiter
+    with _waiter_lock:
+        if _waiter is None:
+            _waiter = AppWaiter()
+        return _waiter
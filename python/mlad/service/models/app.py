@@ -26,6 +26,7 @@ class Mount(BaseModel):
     serverPath: str
     options: Optional[List[str]]
     readOnly: bool
+    cache: bool = False
 
 
 class Dependency(BaseModel):
@@ -62,6 +63,7 @@ class App(AppBase):
     restartPolicy: Optional[str] = 'Never'
     quota: Optional[Quota]
     depends: Optional[List[Dependency]]
+    placement: Optional[str]
 
 
 class JobRunSpec(BaseModel):
@@ -91,12 +93,37 @@ class AppJob(App):
     # Never | onFailure
     restartPolicy: Optional[str] = 'Never'
     schedule: Optional[str]
+    parallelism: Optional[int] = 1
+    completions: Optional[int]
+    # NonIndexed | Indexed
+    completionMode: Optional[str] = 'NonIndexed'
+
+
+class Metric(BaseModel):
+    name: str
+    averageValue: Union[str, int]
+
+
+class Autoscale(BaseModel):
+    minReplicas: int = 1
+    maxReplicas: int
+    targetCPU: Optional[int]
+    metric: Optional[Metric]
 
 
 class AppService(App):
     kind = 'Service'
     scale: Optional[int] = 1
     restartPolicy: Optional[str] = 'Always'
+    autoscale: Optional[Autoscale]
+
+
+class AppDistributed(App):
+    kind = 'Distributed'
+    restartPolicy: Optional[str] = 'Never'
+    workers: Optional[int] = 2
+    masterPort: Optional[int] = 29500
+    startupTimeout: Optional[int] = 600
 
 
 class CreateRequest(BaseModel):
@@ -113,6 +140,8 @@ class CreateRequest(BaseModel):
                 _ = AppJob(**_)
             elif kind == 'Service':
                 _ = AppService(**_)
+            elif kind == 'Distributed':
+                _ = AppDistributed(**_)
             app = json.loads(_.json())
             targets[_.name] = app
             del targets[_.name]['name']
@@ -1,7 +1,7 @@
 from typing import List, Union, Optional
 from pydantic import BaseModel
 
-from mlad.service.models.app import Quota
+from mlad.service.models.app import Quota, Autoscale
 
 
 class CreateRequest(BaseModel):
@@ -21,6 +21,11 @@ class AppUpdateSpec(BaseModel):
     command: Optional[Union[List[str], str]]
     args: Optional[Union[List[str], str]]
     scale: int = 1
+    parallelism: Optional[int]
+    completions: Optional[int]
+    completionMode: Optional[str]
+    workers: Optional[int]
+    autoscale: Optional[Autoscale]
     env: Optional[EnvUpdateSpec]
     quota: Optional[Quota]
 
@@ -28,3 +33,9 @@ class AppUpdateSpec(BaseModel):
 class UpdateRequest(BaseModel):
     update_yaml: dict
     update_specs: List[AppUpdateSpec]
+
+
+class PrepullRequest(BaseModel):
+    images: List[str]
+    constraints: Optional[dict]
+    timeout: int = 600
@@ -1,5 +1,5 @@
 import json
-from typing import Any, Generator, Dict
+from typing import Any, AsyncGenerator, Generator, Dict, Union
 
 from fastapi.responses import StreamingResponse
 
@@ -7,13 +7,26 @@ from fastapi.responses import StreamingResponse
 def jsonify_response(generator):
     try:
         for elem in generator:
-            yield json.dumps(elem)
+            yield json.dumps(elem) + '\n'
     except Exception as e:
-        yield json.dumps({'error': True, 'stream': f'{e.__class__.__name__}: {e}'})
+        yield json.dumps({'error': True, 'stream': f'{e.__class__.__name__}: {e}'}) + '\n'
+        return
+
+
+async def jsonify_async_response(generator):
+    try:
+        async for elem in generator:
+            yield json.dumps(elem) + '\n'
+    except Exception as e:
+        yield json.dumps({'error': True, 'stream': f'{e.__class__.__name__}: {e}'}) + '\n'
         return
 
 
 class DictStreamingResponse(StreamingResponse):
 
-    def __init__(self, content: Generator[Dict[str, str], None, None], *args, **kwargs):
-        super().__init__(jsonify_response(content), *args, **kwargs)
+    def __init__(self, content: Union[Generator[Dict[str, str], None, None],
+                                      AsyncGenerator[Dict[str, str], None]], *args, **kwargs):
+        if hasattr(content, '__aiter__'):
+            super().__init__(jsonify_async_response(content), *args, **kwargs)
+        else:
+            super().__init__(jsonify_response(content), *args, **kwargs)
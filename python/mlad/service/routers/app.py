@@ -1,10 +1,12 @@
 import traceback
 from typing import List
 from fastapi import APIRouter, Query, Header, HTTPException
+from starlette.concurrency import run_in_threadpool
 from mlad.core.exceptions import APIError, InsufficientSessionQuotaError, InvalidAppError, ProjectNotFoundError
-from mlad.service.routers import DictStreamingResponse
 from mlad.service.models import app as app_models
 from mlad.service.exceptions import InvalidSessionError, exception_detail
+from mlad.service.libs.operation import get_manager
+from mlad.service.libs.waiter import get_waiter
 from mlad.core.kubernetes import controller as ctlr
 
 
@@ -104,6 +106,21 @@ def inspect_tasks(project_key: str, app_name: str, session: str = Header(None)):
         raise HTTPException(status_code=500, detail=exception_detail(e))
 
 
+@router.get('/project/{project_key}/app/{app_name}/wait')
+async def wait_app(project_key: str, app_name: str,
+                   condition: str = Query('Running', regex='^(Running|Succeeded)$'),
+                   timeout: int = Query(60, ge=1, le=300), session: str = Header(None)):
+    try:
+        namespace = (await run_in_threadpool(ctlr.get_k8s_namespace, project_key)).metadata.name
+        satisfied = await get_waiter().wait(namespace, app_name, condition, timeout)
+        return {'satisfied': satisfied, 'condition': condition}
+    except ProjectNotFoundError as e:
+        raise HTTPException(status_code=404, detail=exception_detail(e))
+    except Exception as e:
+        print(traceback.format_exc())
+        raise HTTPException(status_code=500, detail=exception_detail(e))
+
+
 @router.put("/project/{project_key}/app/{app_name}/scale")
 def scale_app(project_key: str, app_name: str, req: app_models.ScaleRequest, session: str = Header(None)):
     try:
@@ -113,13 +130,15 @@ def scale_app(project_key: str, app_name: str, req: app_models.ScaleRequest, ses
         ctlr.scale_app(app, req.scale_spec)
     except InvalidAppError as e:
         raise HTTPException(status_code=404, detail=exception_detail(e))
+    except APIError as e:
+        raise HTTPException(status_code=e.status_code, detail=exception_detail(e))
     except Exception as e:
         print(traceback.format_exc())
         raise HTTPException(status_code=500, detail=exception_detail(e))
     return {'message': f'App {app_name} scale updated'}
 
 
-@router.delete("/project/{project_key}/app")
+@router.delete("/project/{project_key}/app", status_code=202)
 def remove_apps(project_key: str, req: app_models.RemoveRequest, session: str = Header(None)):
     try:
         _check_session_key(project_key, session)
@@ -128,20 +147,9 @@ def remove_apps(project_key: str, req: app_models.RemoveRequest, session: str =
         for target in targets:
             ctlr.check_project_key(project_key, target)
 
-        class DisconnectHandler:
-            def __init__(self):
-                self._callbacks = []
-
-            def add_callback(self, callback):
-                self._callbacks.append(callback)
-
-            async def __call__(self):
-                for cb in self._callbacks:
-                    cb()
-
-        handler = DisconnectHandler()
-        res = ctlr.remove_apps(targets, namespace, disconnect_handler=handler)
-        return DictStreamingResponse(res, background=handler)
+        operation = get_manager().submit(
+            'remove_apps', project_key, ctlr.remove_apps, targets, namespace)
+        return operation.to_dict()
     except InvalidAppError as e:
         raise HTTPException(status_code=404, detail=exception_detail(e))
     except InvalidSessionError as e:
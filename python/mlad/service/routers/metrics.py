@@ -0,0 +1,11 @@
+from fastapi import APIRouter
+
+from mlad.service.libs import metrics
+
+
+router = APIRouter()
+
+
+@router.get('/metrics', include_in_schema=False)
+def send_metrics():
+    return metrics.metrics_response()
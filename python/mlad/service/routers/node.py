@@ -5,6 +5,7 @@ from fastapi import APIRouter, Query, Header, HTTPException
 
 from mlad.core import exceptions
 from mlad.core.kubernetes import controller as ctlr
+from mlad.service.models import app as app_models
 from mlad.service.exceptions import exception_detail
 from mlad.service.libs.log import init_logger
 
@@ -44,6 +45,26 @@ def node_resource(names: List[str] = Query(None), no_trunc: bool = Query(True)):
         raise HTTPException(status_code=500, detail=exception_detail(e))
 
 
+@router.get('/node/pods/running')
+def running_pods(uid: List[str] = Query([])):
+    try:
+        return ctlr.get_running_pod_uids(uid)
+    except Exception as e:
+        logger.error(e)
+        print(traceback.format_exc())
+        raise HTTPException(status_code=500, detail=exception_detail(e))
+
+
+@router.post('/node/placement')
+def plan_placements(req: app_models.CreateRequest, session: str = Header(None)):
+    try:
+        return ctlr.plan_placements(req.json)
+    except Exception as e:
+        logger.error(e)
+        print(traceback.format_exc())
+        raise HTTPException(status_code=500, detail=exception_detail(e))
+
+
 @router.get('/node/resource/session')
 def send_node_resource_by_session():
     try:
@@ -0,0 +1,35 @@
+import traceback
+from typing import Optional
+
+from fastapi import APIRouter, Query, HTTPException, Header
+
+from mlad.service.routers import DictStreamingResponse
+from mlad.service.exceptions import OperationNotFoundError, exception_detail
+from mlad.service.libs.operation import get_manager
+
+
+router = APIRouter()
+
+
+@router.get('/operation')
+def send_operations(project_key: Optional[str] = Query(None), session: str = Header(None)):
+    try:
+        return [operation.to_dict() for operation in get_manager().list(project_key)]
+    except Exception as e:
+        print(traceback.format_exc())
+        raise HTTPException(status_code=500, detail=exception_detail(e))
+
+
+@router.get('/operation/{operation_id}')
+def inspect_operation(operation_id: str, follow: bool = Query(False),
+                      since: int = Query(0, ge=0), session: str = Header(None)):
+    try:
+        operation = get_manager().get(operation_id)
+        if follow:
+            return DictStreamingResponse(operation.follow(since))
+        return operation.to_dict(since)
+    except OperationNotFoundError as e:
+        raise HTTPException(status_code=404, detail=exception_detail(e))
+    except Exception as e:
+        print(traceback.format_exc())
+        raise HTTPException(status_code=500, detail=exception_detail(e))
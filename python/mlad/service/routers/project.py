@@ -3,14 +3,19 @@ from typing import Optional, List
 
 from fastapi import APIRouter, Query, HTTPException, Header
 
-from mlad.core.exceptions import InsufficientSessionQuotaError, ProjectNotFoundError, InvalidAppError
+from mlad.core.exceptions import (
+    InsufficientSessionQuotaError, ProjectNotFoundError, InvalidAppError, APIError
+)
 from mlad.core.kubernetes import controller as ctlr
+from mlad.core.libs.constants import MLAD_PROJECT
 
 from mlad.service.routers import DictStreamingResponse
 from mlad.service.exceptions import (
     InvalidLogRequest, InvalidSessionError, exception_detail
 )
 from mlad.service.models import project
+from mlad.service.libs import metrics
+from mlad.service.libs.operation import get_manager
 
 
 router = APIRouter()
@@ -24,16 +29,19 @@ def _check_session_key(namespace, session):
         raise InvalidSessionError
 
 
-@router.post("/project")
+@router.post("/project", status_code=202)
 def create_project(req: project.CreateRequest, session: str = Header(None)):
     base_labels = req.base_labels
     credential = req.credential
     project_yaml = req.project_yaml
 
     try:
-        res = ctlr.create_k8s_namespace_with_data(base_labels, project_yaml, credential)
-        return DictStreamingResponse(res)
-    except TypeError as e:
+        project_key = base_labels[MLAD_PROJECT]
+        operation = get_manager().submit(
+            'create_project', project_key,
+            ctlr.create_k8s_namespace_with_data, base_labels, project_yaml, credential)
+        return operation.to_dict()
+    except (TypeError, KeyError) as e:
         raise HTTPException(status_code=500, detail=exception_detail(e))
     except Exception as e:
         print(traceback.format_exc())
@@ -68,13 +76,32 @@ def inspect_project(project_key: str, session: str = Header(None)):
         raise HTTPException(status_code=500, detail=exception_detail(e))
 
 
-@router.delete("/project/{project_key}")
+@router.delete("/project/{project_key}", status_code=202)
 def remove_project(project_key: str, session: str = Header(None)):
     try:
         namespace = ctlr.get_k8s_namespace(project_key)
         _check_session_key(namespace, session)
-        res = ctlr.delete_k8s_namespace(namespace)
-        return DictStreamingResponse(res)
+        operation = get_manager().submit(
+            'remove_project', project_key, ctlr.delete_k8s_namespace, namespace)
+        return operation.to_dict()
+    except ProjectNotFoundError as e:
+        raise HTTPException(status_code=404, detail=exception_detail(e))
+    except InvalidSessionError as e:
+        raise HTTPException(status_code=401, detail=exception_detail(e))
+    except Exception as e:
+        print(traceback.format_exc())
+        raise HTTPException(status_code=500, detail=exception_detail(e))
+
+
+@router.post("/project/{project_key}/prepull", status_code=202)
+def prepull_images(project_key: str, req: project.PrepullRequest, session: str = Header(None)):
+    try:
+        namespace = ctlr.get_k8s_namespace(project_key)
+        _check_session_key(namespace, session)
+        operation = get_manager().submit(
+            'prepull_images', project_key, ctlr.prepull_images, namespace, req.images,
+            req.constraints, req.timeout)
+        return operation.to_dict()
     except ProjectNotFoundError as e:
         raise HTTPException(status_code=404, detail=exception_detail(e))
     except InvalidSessionError as e:
@@ -107,6 +134,9 @@ def send_project_log(project_key: str, tail: str = Query('all'),
 
         handler = DisconnectHandler()
         res = ctlr.get_project_logs(project_key, filters, tail, follow, timestamps, handler)
+        if follow:
+            metrics.LOG_FOLLOWERS.inc()
+            handler.add_callback(metrics.LOG_FOLLOWERS.dec)
         return DictStreamingResponse(res, background=handler)
     except ProjectNotFoundError as e:
         raise HTTPException(status_code=404, detail=exception_detail(e))
@@ -130,6 +160,17 @@ def send_resources(project_key: str, group_by: Optional[str] = Query('project'),
         raise HTTPException(status_code=500, detail=exception_detail(e))
 
 
+@router.get("/project/{project_key}/startup")
+def send_startup(project_key: str, session: str = Header(None)):
+    try:
+        return ctlr.get_project_startup(project_key)
+    except ProjectNotFoundError as e:
+        raise HTTPException(status_code=404, detail=exception_detail(e))
+    except Exception as e:
+        print(traceback.format_exc())
+        raise HTTPException(status_code=500, detail=exception_detail(e))
+
+
 @router.post("/project/{project_key}")
 def update_project(project_key: str, req: project.UpdateRequest, session: str = Header(None)):
     update_yaml = req.update_yaml
@@ -142,6 +183,8 @@ def update_project(project_key: str, req: project.UpdateRequest, session: str =
         return [ctlr.inspect_app(_) for _ in res]
     except InsufficientSessionQuotaError as e:
         raise HTTPException(status_code=400, detail=exception_detail(e))
+    except APIError as e:
+        raise HTTPException(status_code=e.status_code, detail=exception_detail(e))
     except Exception as e:
         print(traceback.format_exc())
         raise HTTPException(status_code=500, detail=exception_detail(e))
@@ -38,7 +38,9 @@ def main():
             'kubernetes>=19.0.0,<20.0.0',
             'PyJWT>=2.1.0,<3.0.0',
             'dictdiffer==0.9.0',
-            'cerberus-document-editor==0.0.9'
+            'cerberus-document-editor==0.0.9',
+            'prometheus-client>=0.11.0,<1.0.0',
+            'aiohttp>=3.7.0,<4.0.0'
         ],
         package_data={
             'mlad.cli.validator': ['schema.yaml']
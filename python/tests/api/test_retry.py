@@ -0,0 +1,9 @@
+from mlad.api.base import get_http_session
+
+
+def test_delete_not_retried_on_status():
+    retry = get_http_session().get_adapter('http://localhost').max_retries
+    assert retry.is_retry('GET', 504)
+    # A retried DELETE would submit a duplicated operation.
+    assert not retry.is_retry('DELETE', 504)
+    assert not retry._is_method_retryable('DELETE')
@@ -0,0 +1,43 @@
+import json
+
+from mlad.api.base import JSONStreamDecoder
+
+
+def _feed(decoder, data, size):
+    objs = []
+    for i in range(0, len(data), size):
+        objs.extend(decoder.feed(data[i: i + size]))
+    return objs + decoder.close()
+
+
+def test_ndjson_frames():
+    frames = [{'stream': f'line {i}\n', 'name': 'app-1'} for i in range(100)]
+    data = ''.join(json.dumps(_) + '\n' for _ in frames).encode()
+    for size in [1, 7, 1024, len(data)]:
+        assert _feed(JSONStreamDecoder(), data, size) == frames
+
+
+def test_concatenated_frames():
+    frames = [{'stream': 'a}{b', 'nested': {'key': [1, 2, {}]}} for _ in range(20)]
+    data = ''.join(json.dumps(_) for _ in frames).encode()
+    for size in [1, 5, 1024]:
+        assert _feed(JSONStreamDecoder(), data, size) == frames
+
+
+def test_large_frame():
+    frame = {'stream': 'x' * 100000}
+    data = (json.dumps(frame) + '\n').encode() * 3
+    assert _feed(JSONStreamDecoder(), data, 1024) == [frame] * 3
+
+
+def test_multibyte_split():
+    frame = {'stream': '한글 로그'}
+    data = (json.dumps(frame, ensure_ascii=False) + '\n').encode()
+    assert _feed(JSONStreamDecoder(), data, 1) == [frame]
+
+
+def test_unterminated_last_frame():
+    data = b'{"result": "succeed"}\n{"result": "stopped"}'
+    decoder = JSONStreamDecoder()
+    assert decoder.feed(data) == [{'result': 'succeed'}]
+    assert decoder.close() == [{'result': 'stopped'}]
@@ -0,0 +1,48 @@
+import os
+import sys
+import subprocess
+
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+
+
+def _run(code, home):
+    env = dict(os.environ, HOME=str(home), PYTHONPATH=str(ROOT))
+    proc = subprocess.run([sys.executable, '-c', code], env=env, stdout=subprocess.PIPE,
+                          universal_newlines=True, check=True)
+    return proc.stdout.split()
+
+
+def _write_config(home):
+    (home / '.mlad').mkdir()
+    (home / '.mlad' / 'config.yml').write_text(
+        'current-config: test\n'
+        'configs:\n'
+        '- name: test\n'
+        '  apiserver:\n'
+        '    address: http://localhost:8440\n'
+        '  session: test\n')
+
+
+def test_heavy_modules_not_imported(tmp_path):
+    _write_config(tmp_path)
+    imported = _run(
+        'import sys\n'
+        'from click.testing import CliRunner\n'
+        'from mlad.cli.__main__ import main\n'
+        'assert CliRunner().invoke(main, ["--help"]).exit_code == 0\n'
+        'print(*[_ for _ in ["docker", "kubernetes", "requests", "cerberus", "jwt"]'
+        ' if _ in sys.modules])', tmp_path)
+    assert imported == []
+
+
+def test_command_module_imported_on_use(tmp_path):
+    _write_config(tmp_path)
+    imported = _run(
+        'import sys\n'
+        'from mlad.cli.__main__ import main\n'
+        'print("mlad.cli.quota_cli" in sys.modules)\n'
+        'main.get_command(None, "quota")\n'
+        'print("mlad.cli.quota_cli" in sys.modules)', tmp_path)
+    assert imported == ['False', 'True']
@@ -0,0 +1,39 @@
+import pytest
+
+from mlad.cli import project
+from mlad.cli.exceptions import MountError
+
+
+def _mount(path, *options):
+    return {'path': path, 'mountPath': '/data', 'options': ['soft', *options], 'readOnly': False}
+
+
+@pytest.fixture(autouse=True)
+def my_ip(monkeypatch):
+    monkeypatch.setattr(project.utils, 'obtain_my_ip', lambda: '10.0.0.1')
+
+
+def _port(mount):
+    return project._find_port_from_mount_options(mount)
+
+
+def test_mounts_share_nfs_server():
+    first = project._bind_default_values_for_mounts(
+        {'mounts': [_mount('/datasets'), _mount('/datasets/'), _mount('/outputs')]}, [], None)
+    mounts = first['mounts']
+    assert _port(mounts[0]) == _port(mounts[1]) != _port(mounts[2])
+
+    second = project._bind_default_values_for_mounts({'mounts': [_mount('/outputs')]}, [first], None)
+    assert _port(second['mounts'][0]) == _port(mounts[2])
+    assert project._obtain_nfs_exports([first, second]) == {
+        '/datasets': _port(mounts[0]), '/outputs': _port(mounts[2])}
+
+
+def test_mounts_share_running_nfs_server():
+    spec = project._bind_default_values_for_mounts(
+        {'mounts': [_mount('/datasets')]}, [], None, {'/datasets': '30000'})
+    assert _port(spec['mounts'][0]) == '30000'
+
+    with pytest.raises(MountError):
+        project._bind_default_values_for_mounts(
+            {'mounts': [_mount('/datasets', 'port=30001')]}, [], None, {'/datasets': '30000'})
@@ -0,0 +1,49 @@
+import os
+import pytest
+
+from mlad.cli.validator import validators
+from mlad.cli.validator.exceptions import InvalidProjectYaml
+
+PROJECT = {
+    'apiVersion': 'v1',
+    'name': 'test',
+    'maintainer': 'mlad',
+    'workspace': {'kind': 'Workspace', 'base': 'python:3.7-slim'},
+    'app': {'test': {'kind': 'Job', 'command': 'python test.py'}},
+}
+
+
+def _reset():
+    validators._compile.cache_clear()
+    validators._results.clear()
+
+
+@pytest.fixture(autouse=True)
+def schema_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(validators, 'SCHEMA_CACHE_PATH', str(tmp_path))
+    _reset()
+    yield
+    _reset()
+
+
+def test_schema_cache(tmp_path):
+    schema_key, _ = validators._compile()
+    assert os.listdir(tmp_path) == [f'schema-{schema_key}.pickle']
+    _reset()
+    assert validators._compile()[0] == schema_key
+    assert os.listdir(tmp_path) == [f'schema-{schema_key}.pickle']
+
+
+def test_memoized_result():
+    project = validators.validate(PROJECT)
+    assert project['version'] == '0.0.1'
+    assert len(validators._results) == 1
+    project['workdir'] = '/changed'
+    assert validators.validate(PROJECT) != project
+    assert len(validators._results) == 1
+
+
+def test_invalid_project():
+    with pytest.raises(InvalidProjectYaml):
+        validators.validate({**PROJECT, 'app': {'test': {'kind': 'Unknown'}}})
+    assert len(validators._results) == 0
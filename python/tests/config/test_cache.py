@@ -0,0 +1,54 @@
+import os
+import yaml
+
+from mlad.cli import config
+
+from . import mock
+
+
+def setup_module():
+    mock.setup()
+
+
+def teardown_module():
+    mock.teardown()
+
+
+def _spec(*names):
+    return {
+        'current-config': names[0],
+        'configs': [{'name': name, 'admin': False} for name in names]
+    }
+
+
+def test_cached_load():
+    config._save(_spec('test1'))
+    spec = config._load()
+    assert spec == _spec('test1')
+    # Callers get their own copy to modify.
+    spec['configs'].clear()
+    assert config.get('test1') == {'name': 'test1', 'admin': False}
+
+
+def test_reload_on_change():
+    config._save(_spec('test1'))
+    assert config.current() == 'test1'
+    # Another process rewrites the file.
+    with open(config.CFG_PATH, 'w') as cfg_file:
+        yaml.dump(_spec('test2', 'test1'), cfg_file)
+    assert config.current() == 'test2'
+    config.use('test1')
+    assert config.current() == 'test1'
+
+
+def test_atomic_save():
+    config._save(_spec('test1'))
+    dirpath = os.path.dirname(config.CFG_PATH)
+    assert [_ for _ in os.listdir(dirpath) if _.startswith('.config.')] == []
+    with open(config.CFG_PATH) as cfg_file:
+        assert yaml.safe_load(cfg_file) == _spec('test1')
+
+
+def test_missing_file():
+    os.remove(config.CFG_PATH)
+    assert config._load() == config.boilerplate
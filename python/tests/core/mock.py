@@ -0,0 +1,40 @@
+from typing import Dict, Optional
+
+from kubernetes import client
+
+from mlad.core.libs import utils
+from mlad.core.libs.constants import (
+    MLAD_PROJECT, MLAD_PROJECT_BASE, MLAD_PROJECT_ENV, MLAD_PROJECT_IMAGE, MLAD_PROJECT_NAME,
+    MLAD_PROJECT_NAMESPACE, MLAD_PROJECT_USERNAME
+)
+from mlad.core.kubernetes import controller as ctlr
+
+BASE_LABELS = {
+    MLAD_PROJECT: 'key',
+    MLAD_PROJECT_NAME: 'sweep',
+    MLAD_PROJECT_IMAGE: 'registry/sweep:latest',
+    MLAD_PROJECT_BASE: 'mlad-sweep',
+    MLAD_PROJECT_USERNAME: 'mlad',
+    MLAD_PROJECT_NAMESPACE: 'project-sweep',
+    MLAD_PROJECT_ENV: utils.encode_dict([]),
+}
+NAMESPACE = client.V1Namespace(metadata=client.V1ObjectMeta(name='project-sweep', labels={}))
+
+
+def sanitize(obj):
+    return client.ApiClient().sanitize_for_serialization(obj)
+
+
+def app_resources(name: str, app: Dict, *args) -> Dict:
+    return sanitize(ctlr.obtain_k8s_app_resources(NAMESPACE, BASE_LABELS, name, app, *args))
+
+
+def container_status(name: str = 'app', waiting: Optional[str] = None, image_id: str = '',
+                     **terminated) -> client.V1ContainerStatus:
+    if waiting is not None:
+        state = client.V1ContainerState(waiting=client.V1ContainerStateWaiting(reason=waiting))
+    else:
+        state = client.V1ContainerState(terminated=client.V1ContainerStateTerminated(
+            **{'exit_code': 0, **terminated}))
+    return client.V1ContainerStatus(name=name, image='', image_id=image_id, ready=False,
+                                    restart_count=0, state=state)
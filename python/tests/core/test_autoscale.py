@@ -0,0 +1,41 @@
+import pytest
+
+from mlad.core.exceptions import APIError
+
+from . import mock
+
+QUOTA = {'cpu': 1, 'gpu': 0, 'mem': '1G'}
+
+
+def _resources(**app):
+    app = {'kind': 'Service', 'restartPolicy': 'Always', 'scale': 1, **app}
+    return mock.app_resources('infer', app)
+
+
+def test_no_autoscale():
+    assert 'hpa' not in _resources()
+
+
+def test_cpu_autoscale():
+    resources = _resources(scale=10, quota=QUOTA, autoscale={'minReplicas': 2, 'maxReplicas': 4})
+    hpa = resources['hpa']['spec']
+    assert hpa['scaleTargetRef'] == {'apiVersion': 'apps/v1', 'kind': 'Deployment', 'name': 'infer'}
+    assert (hpa['minReplicas'], hpa['maxReplicas']) == (2, 4)
+    assert hpa['metrics'] == [{'type': 'Resource', 'resource': {
+        'name': 'cpu', 'target': {'type': 'Utilization', 'averageUtilization': 80}}}]
+    # The initial replicas are kept in the range of the autoscaler.
+    assert resources['deployment']['spec']['replicas'] == 4
+
+
+def test_metric_autoscale():
+    autoscale = {'minReplicas': 1, 'maxReplicas': 8, 'metric': {'name': 'qps', 'averageValue': 100}}
+    hpa = _resources(autoscale=autoscale)['hpa']['spec']
+    assert hpa['metrics'] == [{'type': 'Pods', 'pods': {
+        'metric': {'name': 'qps'}, 'target': {'type': 'AverageValue', 'averageValue': '100'}}}]
+
+
+def test_cpu_autoscale_without_quota():
+    # The CPU utilization is unknown to the autoscaler without CPU requests.
+    with pytest.raises(APIError) as e:
+        _resources(autoscale={'minReplicas': 1, 'maxReplicas': 4, 'targetCPU': 50})
+    assert e.value.status_code == 400
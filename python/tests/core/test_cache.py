@@ -0,0 +1,124 @@
+import os
+import shutil
+import subprocess
+
+import pytest
+from kubernetes import client
+
+from mlad.core.kubernetes import controller as ctlr
+
+from . import mock
+
+
+def _mount(path, cache=False, mount_path='/data'):
+    return {'path': path, 'mountPath': mount_path, 'server': '10.0.0.1', 'serverPath': '/',
+            'options': ['port=2049'], 'readOnly': False, 'cache': cache}
+
+
+def _job(*mounts):
+    app = {'kind': 'Job', 'restartPolicy': 'Never', 'command': 'python train.py',
+           'mounts': list(mounts)}
+    return mock.app_resources('train', app)['job']['spec']['template']['spec']
+
+
+def test_cache_mount():
+    spec = _job(_mount('/datasets/imagenet', cache=True), _mount('/outputs', mount_path='/outputs'))
+    key = ctlr._obtain_cache_key(_mount('/datasets/imagenet'))
+    mounts = {_['mountPath']: _ for _ in spec['containers'][0]['volumeMounts']}
+    assert mounts['/data'] == {'name': 'train-cache', 'mountPath': '/data', 'subPath': key,
+                               'readOnly': True}
+    volumes = {_['name']: _ for _ in spec['volumes']}
+    assert volumes['train-cache']['hostPath']['type'] == 'DirectoryOrCreate'
+
+    init_containers = spec['initContainers']
+    assert [_['name'] for _ in init_containers] == ['cache-prefetch-0']
+    env = {_['name']: _.get('value') or _['valueFrom'] for _ in init_containers[0]['env']}
+    assert env['CACHE_KEY'] == key
+    assert env['CACHE_CAPACITY'] == str(100 * 1024 * 1024)
+    assert env['POD_UID'] == {'fieldRef': {'fieldPath': 'metadata.uid'}}
+    assert [_['name'] for _ in init_containers[0]['volumeMounts']] == [
+        'train-0-pvc-vol', 'train-cache']
+    # The prefetch does not look into the pods on the node.
+    assert 'train-cache-pods' not in volumes
+
+
+def test_cache_key():
+    # The same dataset is cached once for the apps of all projects.
+    assert ctlr._obtain_cache_key(_mount('/datasets/a')) == ctlr._obtain_cache_key(_mount('/datasets/a'))
+    assert ctlr._obtain_cache_key(_mount('/datasets/a')) != ctlr._obtain_cache_key(_mount('/datasets/b'))
+
+
+def test_cache_results():
+    pod = client.V1Pod(
+        spec=client.V1PodSpec(containers=[], init_containers=[
+            client.V1Container(name=f'cache-prefetch-{i}', env=[
+                client.V1EnvVar(name='CACHE_MOUNT_PATH', value=f'/data{i}')]) for i in range(3)]),
+        status=client.V1PodStatus(init_container_statuses=[
+            mock.container_status('cache-prefetch-0', message='hit\n'),
+            mock.container_status('cache-prefetch-1', message='miss\n')]))
+    results = ctlr._get_pod_cache_results(pod)
+    assert results == {'/data0': 'hit', '/data1': 'miss', '/data2': None}
+    assert ctlr._obtain_app_cache([{'cache': results}, {'cache': {}}]) == {'hits': 1, 'misses': 1}
+    assert ctlr._obtain_app_cache([{'cache': {}}]) is None
+
+
+def test_running_pod_uids(monkeypatch):
+    phases = {'pending': 'Pending', 'running': 'Running', 'succeeded': 'Succeeded',
+              'failed': 'Failed'}
+    pods = client.V1PodList(items=[
+        client.V1Pod(metadata=client.V1ObjectMeta(uid=uid), status=client.V1PodStatus(phase=phase))
+        for uid, phase in phases.items()])
+    monkeypatch.setattr(client.CoreV1Api, 'list_pod_for_all_namespaces',
+                        lambda self, label_selector: pods)
+    uids = ['pending', 'running', 'succeeded', 'failed', 'deleted']
+    assert ctlr.get_running_pod_uids(uids, cli=None) == ['pending', 'running']
+
+
+def _prefetch(tmp_path, key, source, uid, capacity):
+    # Runs the prefetch script with the volumes of the init container under tmp_path,
+    # and a fake wget which reports the pods under tmp_path/pods as running.
+    volumes = {'/cache': 'cache', '/source': f'source/{source}', '/tmp/running': 'running',
+               '/dev/termination-log': 'termination-log'}
+    script = ctlr.CACHE_PREFETCH_SCRIPT.replace('sleep 10', 'exit 2')
+    for path, volume in volumes.items():
+        script = script.replace(path, str(tmp_path / volume))
+    wget = tmp_path / 'bin/wget'
+    if not wget.exists():
+        wget.parent.mkdir()
+        wget.write_text(f'''#!/bin/sh
+[ -e {tmp_path}/down ] && exit 1
+while [ $# -gt 0 ]; do [ "$1" = -O ] && out=$2; shift; done
+ls {tmp_path}/pods > "$out"
+''')
+        wget.chmod(0o755)
+    (tmp_path / 'pods' / uid).mkdir(parents=True, exist_ok=True)
+    env = {**os.environ, 'CACHE_KEY': key, 'CACHE_CAPACITY': str(capacity), 'POD_UID': uid,
+           'PATH': f"{wget.parent}:{os.environ['PATH']}"}
+    code = subprocess.run(['sh', '-c', script], env=env).returncode
+    return code, (tmp_path / 'termination-log').read_text().strip() if code == 0 else None
+
+
+@pytest.mark.skipif(shutil.which('flock') is None, reason='flock is not installed')
+def test_prefetch_script(tmp_path):
+    (tmp_path / 'cache').mkdir()
+    for name in ('a', 'b'):
+        (tmp_path / f'source/{name}').mkdir(parents=True)
+        (tmp_path / f'source/{name}/data').write_bytes(b'0' * 40 * 1024)
+    assert _prefetch(tmp_path, 'a', 'a', 'pod-1', 100) == (0, 'miss')
+    assert _prefetch(tmp_path, 'a', 'a', 'pod-2', 100) == (0, 'hit')
+    # The dataset in use is not evicted.
+    assert _prefetch(tmp_path, 'b', 'b', 'pod-3', 100)[0] == 2
+    for uid in ('pod-1', 'pod-2'):
+        (tmp_path / 'pods' / uid).rmdir()
+    # Nor while the API server is unreachable.
+    (tmp_path / 'down').touch()
+    assert _prefetch(tmp_path, 'b', 'b', 'pod-3', 100)[0] == 2
+    (tmp_path / 'down').unlink()
+    assert _prefetch(tmp_path, 'b', 'b', 'pod-3', 100) == (0, 'miss')
+    assert not (tmp_path / 'cache/a').exists()
+
+    # The changed dataset is fetched again and the stale one stays for its pods.
+    os.utime(tmp_path / 'source/b', (0, 0))
+    assert _prefetch(tmp_path, 'b', 'b', 'pod-4', 1000) == (0, 'miss')
+    assert len(list((tmp_path / 'cache/.retired').iterdir())) == 1
+    assert _prefetch(tmp_path, 'b', 'b', 'pod-5', 1000) == (0, 'hit')
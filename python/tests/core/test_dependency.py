@@ -0,0 +1,98 @@
+import os
+import re
+import asyncio
+import subprocess
+import threading
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from kubernetes import client
+
+from mlad.core.kubernetes import controller as ctlr
+from mlad.service.libs.middleware import VersionCheckMiddleware
+from mlad.service.libs.waiter import AppWaiter
+from mlad.service.routers import app as app_router
+
+
+def test_check_app_condition():
+    assert not ctlr.check_app_condition([], 'Running')
+    assert ctlr.check_app_condition(['Running', 'Succeeded'], 'Running')
+    assert not ctlr.check_app_condition(['Running', 'Pending'], 'Running')
+    assert not ctlr.check_app_condition(['Running', 'Succeeded'], 'Succeeded')
+    assert ctlr.check_app_condition(['Succeeded'], 'Succeeded')
+
+
+def test_dependency_init_container():
+    depends = [{'appName': 'db', 'condition': 'Running'},
+               {'appName': 'prepare', 'condition': 'Succeeded'}]
+    container = ctlr._convert_depends_to_k8s_init_container(depends, [])
+    assert container.image == ctlr.service_config['dependency']['image']
+    assert container.image_pull_policy == 'IfNotPresent'
+    assert container.command[:2] == ['sh', '-c']
+    script = container.command[2]
+    assert '/app/db/wait?condition=Running' in script
+    assert '/app/prepare/wait?condition=Succeeded' in script
+
+
+def test_dependency_wait_request(monkeypatch):
+    monkeypatch.setattr(ctlr, 'get_k8s_namespace', lambda project_key: client.V1Namespace(
+        metadata=client.V1ObjectMeta(name=f'{project_key}-cluster')))
+    monkeypatch.setattr(ctlr, 'watch_app_phases', lambda namespace, app, timeout: iter([{'db-0': 'Running'}]))
+    server = FastAPI()
+    server.add_middleware(VersionCheckMiddleware)
+    server.include_router(app_router.router, prefix='/api/v1')
+
+    # Sends the request of the script as curl does, which has no version of the CLI.
+    container = ctlr._convert_depends_to_k8s_init_container(
+        [{'appName': 'db', 'condition': 'Running'}], [])
+    script = container.command[2]
+    url = re.search(r'"\$MLAD_ADDRESS([^"]+)"', script).group(1).replace('$PROJECT_KEY', 'key')
+    res = TestClient(server).get(url)
+    assert res.status_code == 200
+    assert '"satisfied":true' in res.text
+    assert TestClient(server).get('/api/v1/project/key/app').status_code == 400
+
+
+def test_dependency_wait_failures(tmp_path, monkeypatch):
+    # The fake curl fails to connect as the API server is unreachable.
+    curl = tmp_path / 'curl'
+    curl.write_text('#!/bin/sh\nprintf 000\nexit 7\n')
+    curl.chmod(0o755)
+    monkeypatch.setitem(ctlr.service_config['dependency'], 'retries', 3)
+    container = ctlr._convert_depends_to_k8s_init_container(
+        [{'appName': 'db', 'condition': 'Running'}], [])
+    script = container.command[2].replace('/tmp/wait', str(tmp_path / 'wait'))
+    script = script.replace('sleep 5', 'true')
+    env = {**os.environ, 'PATH': f"{tmp_path}:{os.environ['PATH']}"}
+    result = subprocess.run(['sh', '-c', script], env=env, capture_output=True, text=True, timeout=10)
+    assert result.returncode == 1
+    assert result.stdout.count('HTTP 000') == 3
+
+
+def test_app_waiters_share_watch(monkeypatch):
+    watches = []
+    running, closed = threading.Event(), threading.Event()
+
+    def watch_app_phases(namespace, app_name, timeout):
+        watches.append(app_name)
+        yield {'db-0': 'Pending'}
+        running.wait(5)
+        yield {'db-0': 'Running'}
+        closed.wait(5)
+
+    monkeypatch.setattr(ctlr, 'watch_app_phases', watch_app_phases)
+    waiter = AppWaiter()
+
+    async def wait():
+        waits = [waiter.wait('ns', 'db', 'Running', 5) for _ in range(3)]
+        waits.append(waiter.wait('ns', 'db', 'Succeeded', 0.5))
+        waits = asyncio.gather(*waits)
+        await asyncio.sleep(0.1)
+        running.set()
+        return await waits
+
+    try:
+        assert asyncio.run(wait()) == [True, True, True, False]
+        assert watches == ['db']
+    finally:
+        closed.set()
@@ -0,0 +1,107 @@
+from mlad.core.kubernetes import controller as ctlr
+
+from . import mock
+
+
+def _job_spec(**app):
+    app = {'kind': 'Job', 'restartPolicy': 'Never', 'command': 'python train.py', **app}
+    return mock.app_resources('trial', app)['job']['spec']
+
+
+def test_non_indexed_job():
+    spec = _job_spec()
+    assert spec['parallelism'] == 1
+    assert 'completions' not in spec
+    assert 'completionMode' not in spec
+
+
+def test_indexed_job():
+    spec = _job_spec(parallelism=10, completions=100, completionMode='Indexed')
+    assert spec['parallelism'] == 10
+    assert spec['completions'] == 100
+    assert spec['completionMode'] == 'Indexed'
+    env = {_['name']: _ for _ in spec['template']['spec']['containers'][0]['env']}
+    assert env['JOB_COMPLETION_INDEX']['valueFrom']['fieldRef']['fieldPath'] == \
+        "metadata.annotations['batch.kubernetes.io/job-completion-index']"
+    # Completions defaults to the parallelism.
+    assert _job_spec(parallelism=4, completionMode='Indexed')['completions'] == 4
+
+
+def test_job_indexes():
+    pod_infos = [
+        {'index': '1', 'phase': 'Failed'},
+        {'index': '10', 'phase': 'Running'},
+        {'index': '1', 'phase': 'Succeeded'},
+        {'index': '0', 'phase': 'Pending'},
+        {'index': None, 'phase': 'Running'},
+    ]
+    assert ctlr._obtain_job_indexes(pod_infos) == {'0': 'Pending', '1': 'Succeeded', '10': 'Running'}
+
+
+def test_distributed_job():
+    app = {'kind': 'Distributed', 'restartPolicy': 'Never', 'command': 'python train.py',
+           'workers': 4, 'masterPort': 29500, 'startupTimeout': 60}
+    resources = mock.app_resources('ddp', app)
+    spec = resources['job']['spec']
+    assert spec['parallelism'] == spec['completions'] == 4
+    assert spec['completionMode'] == 'Indexed'
+    pod_spec = spec['template']['spec']
+    assert pod_spec['subdomain'] == 'ddp'
+    assert pod_spec['initContainers'][-1]['name'] == 'worker-gate-container'
+    env = {_['name']: _ for _ in pod_spec['containers'][0]['env']}
+    assert env['WORLD_SIZE']['value'] == '4'
+    assert env['MASTER_ADDR']['value'] == 'ddp-0.ddp'
+    assert env['RANK']['valueFrom']['fieldRef']['fieldPath'] == ctlr.JOB_COMPLETION_INDEX_FIELD
+
+    service = resources['service']['spec']
+    assert service['clusterIP'] == 'None'
+    assert service['publishNotReadyAddresses'] is True
+    assert service['ports'] == [{'name': 'port29500', 'port': 29500}]
+
+
+def test_image_pull_policy():
+    container = _job_spec()['template']['spec']['containers'][0]
+    assert container['imagePullPolicy'] == 'Always'
+    image = 'registry/sweep@sha256:' + '0' * 64
+    container = _job_spec(image=image)['template']['spec']['containers'][0]
+    assert container['image'] == image
+    assert container['imagePullPolicy'] == 'IfNotPresent'
+
+
+def test_update_distributed_job():
+    app = {'kind': 'Distributed', 'restartPolicy': 'Never', 'command': 'python train.py',
+           'workers': 4, 'masterPort': 29500, 'startupTimeout': 60}
+    job = ctlr.obtain_k8s_app_resources(mock.NAMESPACE, mock.BASE_LABELS, 'ddp', app)['job']
+    update_spec = ctlr._convert_distributed_update_spec({
+        'name': 'ddp', 'image': None, 'command': 'python train.py', 'args': None, 'quota': None,
+        'workers': 2, 'env': {'current': {}, 'update': {}}})
+    image = 'registry/sweep@sha256:' + '0' * 64
+    job = ctlr._update_k8s_job_template(job, update_spec, image)
+    spec = mock.sanitize(job)['spec']
+    assert spec['parallelism'] == spec['completions'] == 2
+
+    # The gate waits for the updated number of workers in the updated image.
+    gate = spec['template']['spec']['initContainers'][-1]
+    assert gate['name'] == ctlr.WORKER_GATE_CONTAINER
+    assert gate['image'] == image
+    assert gate['imagePullPolicy'] == 'IfNotPresent'
+    env = {_['name']: _ for _ in gate['env']}
+    assert env['WORLD_SIZE']['value'] == '2'
+    assert env['RANK']['valueFrom']['fieldRef']['fieldPath'] == ctlr.JOB_COMPLETION_INDEX_FIELD
+
+
+def test_update_dropped_parallelism():
+    app = {'kind': 'Job', 'restartPolicy': 'Never', 'command': 'python train.py',
+           'parallelism': 10, 'completions': 100, 'completionMode': 'Indexed'}
+    job = ctlr.obtain_k8s_app_resources(mock.NAMESPACE, mock.BASE_LABELS, 'trial', app)['job']
+    update_spec = {
+        'name': 'trial', 'image': None, 'command': 'python train.py', 'args': None, 'quota': None,
+        'parallelism': None, 'completions': None, 'completionMode': None,
+        'env': {'current': {}, 'update': {}}}
+    job = ctlr._update_k8s_job_template(job, update_spec, 'registry/sweep:latest')
+    spec = mock.sanitize(job)['spec']
+    assert spec['parallelism'] == 1
+    assert 'completions' not in spec
+    assert 'completionMode' not in spec
+    env = [_['name'] for _ in spec['template']['spec']['containers'][0]['env']]
+    assert 'JOB_COMPLETION_INDEX' not in env
@@ -0,0 +1,88 @@
+import pytest
+
+from mlad.core.docker import controller as docker_ctlr
+
+
+def _match(labels, filters):
+    filters = filters['label']
+    for _ in [filters] if isinstance(filters, str) else filters:
+        key, _, value = _.partition('=')
+        if key not in labels or (value and labels[key] != value):
+            return False
+    return True
+
+
+class _Volume:
+    def __init__(self, store, name, labels):
+        self.store, self.name, self.attrs = store, name, {'Labels': labels}
+
+    def remove(self):
+        del self.store[self.name]
+
+
+class _Container:
+    def __init__(self, store, name, labels, status='running'):
+        self.store, self.name, self.labels, self.status = store, name, labels, status
+        self.on_remove = None
+
+    def start(self):
+        self.status = 'running'
+
+    def remove(self, force=False):
+        if self.on_remove is not None:
+            self.on_remove()
+        del self.store[self.name]
+
+
+class _Collection:
+    def __init__(self, factory):
+        self.items, self.factory = {}, factory
+
+    def list(self, filters, all=False):
+        return [_ for _ in list(self.items.values())
+                if _match(getattr(_, 'labels', None) or _.attrs['Labels'], filters)]
+
+    def create(self, name, labels):
+        self.items[name] = self.factory(self.items, name, labels)
+
+    def run(self, image, name, labels, **kwargs):
+        self.create(name, {k: str(v) for k, v in labels.items()})
+        return self.items[name]
+
+
+class _Client:
+    def __init__(self):
+        self.volumes = _Collection(_Volume)
+        self.containers = _Collection(_Container)
+
+
+@pytest.fixture
+def cli(monkeypatch):
+    cli = _Client()
+    monkeypatch.setattr(docker_ctlr, 'get_cli', lambda: cli)
+    monkeypatch.setattr(docker_ctlr, '_wait_nfs_server', lambda container, port: None)
+    return cli
+
+
+def _servers(cli):
+    return {_.labels[docker_ctlr.NFS_EXPORT_LABEL]: _.status for _ in cli.containers.items.values()}
+
+
+def test_acquire_stopped_nfs_server(cli):
+    docker_ctlr.acquire_nfs_exports('a', {'/datasets': '30000'})
+    container, = cli.containers.items.values()
+    container.status = 'exited'
+    docker_ctlr.acquire_nfs_exports('b', {'/datasets': '30000'})
+    assert _servers(cli) == {'/datasets': 'running'}
+
+
+def test_acquire_nfs_server_while_released(cli):
+    docker_ctlr.acquire_nfs_exports('a', {'/datasets': '30000'})
+    container, = cli.containers.items.values()
+    # The project b finds the server running just before the project a removes it.
+    container.on_remove = lambda: docker_ctlr.acquire_nfs_exports('b', {'/datasets': '30000'})
+    docker_ctlr.release_nfs_exports('a')
+    assert _servers(cli) == {'/datasets': 'running'}
+
+    docker_ctlr.release_nfs_exports('b')
+    assert _servers(cli) == {}
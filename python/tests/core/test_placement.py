@@ -0,0 +1,45 @@
+from mlad.core.kubernetes import controller as ctlr
+
+from . import mock
+
+
+def _node(name, gpu, free_gpu, cpu=32, free_cpu=32, labels=None):
+    return {'name': name, 'labels': labels or {},
+            'capacity': {'gpu': gpu, 'cpu': cpu, 'mem': 128 * 1024},
+            'free': {'gpu': free_gpu, 'cpu': free_cpu, 'mem': 128 * 1024}}
+
+
+def test_best_fit_gpu():
+    nodes = [_node('empty', 8, 8), _node('fragmented', 8, 1), _node('half', 8, 4), _node('cpu', 0, 0)]
+    request = ctlr._obtain_placement_request({'gpu': 4, 'cpu': 4, 'mem': '16Gi'})
+    scores = ctlr.score_nodes_best_fit(request, nodes)
+    # The node left with no GPU fits the best and the nodes without enough GPUs are excluded.
+    assert [_[0] for _ in scores] == ['half', 'empty']
+    assert scores[0][1] > scores[1][1]
+
+
+def test_best_fit_cpu_avoids_gpu_nodes():
+    nodes = [_node('gpu', 8, 8, free_cpu=8), _node('cpu', 0, 0, free_cpu=16)]
+    scores = ctlr.score_nodes_best_fit(ctlr._obtain_placement_request({'cpu': 4}), nodes)
+    assert scores[0][0] == 'cpu'
+
+
+def test_best_fit_constraints():
+    nodes = [_node('a100', 8, 4, labels={'gpu': 'a100'}), _node('v100', 8, 2, labels={'gpu': 'v100'})]
+    request = ctlr._obtain_placement_request({'gpu': 2})
+    scores = ctlr.score_nodes_best_fit(request, nodes, {'label': {'gpu': 'a100'}})
+    assert [_[0] for _ in scores] == ['a100']
+
+
+def test_placement_affinity():
+    app = {'kind': 'Service', 'restartPolicy': 'Always', 'command': 'serve', 'scale': 4,
+           'placement': 'BestFit'}
+    spec = mock.app_resources('serve', app, {'node-1': 3, 'node-2': 1})['deployment']
+    terms = spec['spec']['template']['spec']['affinity']['nodeAffinity'][
+        'preferredDuringSchedulingIgnoredDuringExecution']
+    assert [_['weight'] for _ in terms] == [75, 25]
+    assert terms[0]['preference']['matchFields'] == [
+        {'key': 'metadata.name', 'operator': 'In', 'values': ['node-1']}]
+
+    spec = mock.app_resources('serve', app)['deployment']
+    assert 'affinity' not in spec['spec']['template']['spec']
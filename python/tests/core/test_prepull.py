@@ -0,0 +1,38 @@
+from kubernetes import client
+
+from mlad.core.kubernetes import controller as ctlr
+
+from . import mock
+
+
+def test_prepull_daemonset():
+    images = ['registry/app:latest', 'registry/app@sha256:' + '0' * 64]
+    daemonset = ctlr._obtain_k8s_prepull_daemonset(
+        'prepull-test', 'project', images, {'label': {'gpu': 'a100'}}, 'project-auth')
+    spec = mock.sanitize(daemonset)['spec']
+    pod_spec = spec['template']['spec']
+    assert [_['image'] for _ in pod_spec['containers']] == images
+    assert [_['imagePullPolicy'] for _ in pod_spec['containers']] == ['Always', 'IfNotPresent']
+    assert pod_spec['nodeSelector'] == {'gpu': 'a100'}
+    assert pod_spec['imagePullSecrets'] == [{'name': 'project-auth'}]
+    assert spec['selector']['matchLabels'] == spec['template']['metadata']['labels']
+
+
+def _progress(*statuses):
+    return ctlr._get_prepull_progress(client.V1Pod(status=client.V1PodStatus(
+        container_statuses=list(statuses))))
+
+
+def test_prepull_progress():
+    assert _progress(mock.container_status(), mock.container_status(waiting='ContainerCreating')) == \
+        (1, None)
+    assert _progress(mock.container_status(), mock.container_status(waiting='ErrImagePull')) == \
+        (1, 'ErrImagePull')
+    assert _progress() == (0, None)
+
+
+def test_prepull_progress_without_shell():
+    # An image without sh fails to start after it is pulled.
+    assert _progress(mock.container_status(waiting='RunContainerError'),
+                     mock.container_status(waiting='CrashLoopBackOff', image_id='sha256:0')) == \
+        (2, None)
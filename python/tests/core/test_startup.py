@@ -0,0 +1,101 @@
+from datetime import datetime, timedelta, timezone
+
+from kubernetes import client
+
+from mlad.core.kubernetes import controller as ctlr
+
+from . import mock
+
+CREATED = datetime(2022, 1, 1, tzinfo=timezone.utc)
+
+
+def _at(seconds):
+    return CREATED + timedelta(seconds=seconds)
+
+
+def _pod(conditions, container_statuses=None):
+    return client.V1Pod(
+        metadata=client.V1ObjectMeta(name='app-0', uid='uid', creation_timestamp=CREATED),
+        status=client.V1PodStatus(
+            conditions=[client.V1PodCondition(type=type, status=status, last_transition_time=_at(at))
+                        for type, status, at in conditions],
+            container_statuses=container_statuses))
+
+
+def _event(reason, at, type='Normal'):
+    return client.CoreV1Event(
+        metadata=client.V1ObjectMeta(creation_timestamp=_at(at)),
+        involved_object=client.V1ObjectReference(name='app-0'),
+        reason=reason, type=type, last_timestamp=_at(at), message=reason)
+
+
+def test_pod_startup():
+    pod = _pod([('PodScheduled', 'True', 2), ('Initialized', 'True', 5),
+                ('ContainersReady', 'True', 30), ('Ready', 'True', 30)])
+    events = [_event('Scheduled', 2), _event('Pulling', 6), _event('Pulled', 25)]
+    assert ctlr.obtain_pod_startup(pod, events) == {
+        'scheduling': 2, 'init': 3, 'image_pull': 19, 'startup': 25, 'total': 30}
+
+
+def test_pending_pod_startup():
+    pod = _pod([('PodScheduled', 'False', 1)])
+    startup = ctlr.obtain_pod_startup(pod, [_event('FailedScheduling', 1, 'Warning')])
+    assert set(startup.values()) == {None}
+
+
+def test_completed_pod_startup():
+    statuses = [mock.container_status(started_at=_at(10))]
+    pod = _pod([('PodScheduled', 'True', 1), ('Initialized', 'True', 4),
+                ('ContainersReady', 'False', 60)], statuses)
+    # The image was present on the node.
+    startup = ctlr.obtain_pod_startup(pod, [_event('Pulled', 4)])
+    assert startup['image_pull'] == 0
+    assert startup['startup'] == 6
+    assert startup['total'] == 10
+
+
+def test_watch_pod_startups(monkeypatch):
+    def _started(uid, at):
+        pod = _pod([('PodScheduled', 'True', 1), ('Initialized', 'True', 2),
+                    ('ContainersReady', 'True', at)])
+        pod.metadata.uid = uid
+        return pod
+
+    class _Watch:
+        def stream(self, func, **kwargs):
+            for type, pod in [('ADDED', _started('old', 5)), ('ADDED', _pod([])),
+                              ('MODIFIED', _started('new', 20)), ('MODIFIED', _started('skip', 20)),
+                              ('DELETED', _started('deleted', 20))]:
+                yield {'type': type, 'object': pod}
+
+        def stop(self):
+            pass
+
+    monkeypatch.setattr(ctlr.watch, 'Watch', _Watch)
+    monkeypatch.setattr(ctlr, '_get_k8s_pod_events', lambda namespace, name, cli: {
+        name: [_event('Pulling', 3), _event('Pulled', 8)]})
+    # Only the pods which started since the watch of the API server are observed.
+    startups = list(ctlr.watch_pod_startups(_at(10), {'skip'}, cli=None))
+    assert startups == [('new', {'scheduling': 1, 'init': 1, 'image_pull': 5, 'startup': 18,
+                                 'total': 20})]
+
+
+def test_summarize_startup():
+    startups = [dict.fromkeys(ctlr.STARTUP_PHASES, float(_)) for _ in range(1, 21)]
+    startups.append(dict.fromkeys(ctlr.STARTUP_PHASES))
+    summary = ctlr._summarize_startup(startups)
+    assert summary['total'] == {'count': 20, 'p50': 10, 'p95': 19, 'max': 20}
+    assert ctlr._summarize_startup([])['init'] == {'count': 0, 'p50': None, 'p95': None, 'max': None}
+
+
+def test_observe_pod_startup():
+    from prometheus_client import REGISTRY
+    from mlad.service.libs import metrics
+
+    def _count():
+        return REGISTRY.get_sample_value('mlad_pod_startup_duration_seconds_count', {'phase': 'total'}) or 0
+
+    count = _count()
+    for _ in range(2):
+        metrics.observe_pod_startup('observed-uid', {'total': 30, 'init': None})
+    assert _count() == count + 1
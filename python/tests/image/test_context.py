@@ -0,0 +1,49 @@
+import io
+import os
+import gzip
+import tarfile
+import threading
+
+from mlad.cli.libs import context
+
+
+def _workspace(path):
+    (path / 'src').mkdir()
+    (path / 'src' / 'main.py').write_text('print("hello")\n')
+    (path / 'data.bin').write_bytes(os.urandom(context.READ_AHEAD_FILE_SIZE + 1))
+    (path / 'link.py').symlink_to('src/main.py')
+    return [(str(path / name), name) for name in ['src/main.py', 'data.bin', 'link.py']]
+
+
+def _members(data):
+    with tarfile.open(fileobj=io.BytesIO(data)) as tar:
+        return {member.name: tar.extractfile(member).read() if member.isreg() else member.linkname
+                for member in tar.getmembers()}
+
+
+def test_stream_context(tmp_path):
+    files = _workspace(tmp_path)
+    chunks = list(context.stream_context(files, ('.dockerfile', b'FROM scratch\n')))
+    assert all(len(_) <= context.CHUNK_SIZE * 2 for _ in chunks)
+    assert _members(b''.join(chunks)) == {
+        'src/main.py': b'print("hello")\n',
+        'data.bin': (tmp_path / 'data.bin').read_bytes(),
+        'link.py': 'src/main.py',
+        '.dockerfile': b'FROM scratch\n',
+    }
+
+
+def test_compressed_context(tmp_path):
+    files = _workspace(tmp_path)
+    data = b''.join(context.stream_context(files, ('.dockerfile', b''), compress=True))
+    assert data[:2] == b'\x1f\x8b'
+    assert _members(gzip.decompress(data))['src/main.py'] == b'print("hello")\n'
+
+
+def test_cancelled_context(tmp_path):
+    files = [(str(tmp_path / 'data.bin'), 'data.bin')] * 100
+    (tmp_path / 'data.bin').write_bytes(b'x' * context.CHUNK_SIZE)
+    stream = context.stream_context(files, ('.dockerfile', b''))
+    next(stream)
+    stream.close()
+    assert not any(_.name == 'mlad-context-producer' for _ in threading.enumerate())
@@ -0,0 +1,48 @@
+import os
+
+from mlad.cli.libs import context_cache
+
+LABELS = {'MLAD.PROJECT': 'key', 'MLAD.PROJECT.VERSION': '0.0.1'}
+
+
+def _files(path):
+    return [(str(path / name), name) for name in sorted(os.listdir(path))]
+
+
+def test_digest(tmp_path):
+    (tmp_path / 'a.py').write_text('a')
+    (tmp_path / 'b.py').write_text('b')
+    manifest = {'files': {}}
+    digest = context_cache.update_manifest(manifest, _files(tmp_path), 'FROM scratch', LABELS)
+    assert digest == context_cache.update_manifest({'files': {}}, _files(tmp_path),
+                                                   'FROM scratch', LABELS)
+    assert digest != context_cache.update_manifest({'files': {}}, _files(tmp_path),
+                                                   'FROM python', LABELS)
+    assert digest != context_cache.update_manifest({'files': {}}, _files(tmp_path),
+                                                   'FROM scratch', {**LABELS, 'MLAD.PROJECT.VERSION': '0.0.2'})
+    (tmp_path / 'b.py').write_text('c')
+    assert digest != context_cache.update_manifest(manifest, _files(tmp_path), 'FROM scratch', LABELS)
+
+
+def test_rehash_changed_files(tmp_path):
+    (tmp_path / 'a.py').write_text('a')
+    manifest = {'files': {}}
+    digest = context_cache.update_manifest(manifest, _files(tmp_path), '', LABELS)
+    # Files with the same size and mtime are not hashed again.
+    stat = os.stat(tmp_path / 'a.py')
+    (tmp_path / 'a.py').write_text('b')
+    os.utime(tmp_path / 'a.py', ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert digest == context_cache.update_manifest(manifest, _files(tmp_path), '', LABELS)
+    os.utime(tmp_path / 'a.py', ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    assert digest != context_cache.update_manifest(manifest, _files(tmp_path), '', LABELS)
+
+
+def test_save_manifest(tmp_path, monkeypatch):
+    monkeypatch.setattr(context_cache, 'CONTEXT_CACHE_PATH', str(tmp_path / 'context'))
+    (tmp_path / 'a.py').write_text('a')
+    manifest = context_cache.load_manifest('key')
+    assert manifest == {'files': {}}
+    context_cache.update_manifest(manifest, [(str(tmp_path / 'a.py'), 'a.py')], '', LABELS)
+    context_cache.save_manifest('key', manifest)
+    assert context_cache.load_manifest('key') == manifest
+    assert os.listdir(tmp_path / 'context') == ['key.json']
@@ -0,0 +1,44 @@
+from mlad.cli.libs.dockerignore import IgnoreMatcher
+
+
+def _ignored(patterns, paths):
+    matcher = IgnoreMatcher(patterns)
+    return [_ for _ in paths if matcher.ignored(_)]
+
+
+def test_wildcards():
+    paths = ['a.pyc', 'src/a.pyc', 'src/pkg/a.pyc', 'a.py', 'b1', 'b12']
+    assert _ignored(['*.pyc'], paths) == ['a.pyc']
+    assert _ignored(['**/*.pyc'], paths) == ['a.pyc', 'src/a.pyc', 'src/pkg/a.pyc']
+    assert _ignored(['src/**/*.pyc'], paths) == ['src/a.pyc', 'src/pkg/a.pyc']
+    assert _ignored(['b?'], paths) == ['b1']
+    assert _ignored(['[ab]1*'], paths) == ['b1', 'b12']
+    assert _ignored(['[^a]1'], paths) == ['b1']
+
+
+def test_directories():
+    paths = ['data', 'data/a', 'data/b/c', 'database', 'src/data']
+    assert _ignored(['data'], paths) == ['data', 'data/a', 'data/b/c']
+    assert _ignored(['/data/'], paths) == ['data', 'data/a', 'data/b/c']
+    assert _ignored(['**/data'], paths) == ['data', 'data/a', 'data/b/c', 'src/data']
+    assert _ignored(['# data', '', 'database'], paths) == ['database']
+
+
+def test_exclusions():
+    paths = ['data/a', 'data/keep/a', 'data/keep.txt', 'README.md', 'src/README.md']
+    patterns = ['data', '!data/keep*', '*.md', '!README.md']
+    assert _ignored(patterns, paths) == ['data/a']
+    # The last matching pattern wins.
+    assert _ignored(['!data/keep.txt', 'data'], paths) == ['data/a', 'data/keep/a', 'data/keep.txt']
+
+
+def test_prune(tmp_path):
+    for path in ['src/main.py', '.git/HEAD', 'data/raw/a.csv', 'data/keep/b.csv', 'data/c.csv']:
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).write_text('')
+    matcher = IgnoreMatcher(['**/.*', 'data', '!data/keep'])
+    assert matcher.prunable('.git')
+    assert matcher.prunable('data/raw')
+    assert not matcher.prunable('data')
+    assert sorted(arcname for _, arcname in matcher.walk(str(tmp_path))) == [
+        'data/keep/b.csv', 'src/main.py']
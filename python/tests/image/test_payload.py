@@ -0,0 +1,47 @@
+from mlad.cli.image import _obtain_workspace_payload
+
+WORKSPACE = {
+    'kind': 'Workspace',
+    'base': 'python:3.7-slim',
+    'preps': [
+        {'run': 'echo prepare'},
+        {'pip': 'requirements.txt'},
+        {'apt': 'apt.txt'},
+    ],
+    'env': {'HELLO': 'WORLD'},
+    'command': 'python main.py',
+}
+
+
+def _lines(payload):
+    return [_ for _ in payload.split('\n') if _]
+
+
+def test_workspace_payload():
+    lines = _lines(_obtain_workspace_payload(WORKSPACE, 'mlad'))
+    assert lines == [
+        'FROM python:3.7-slim',
+        'MAINTAINER mlad',
+        'ENV HELLO WORLD',
+        'WORKDIR /workspace',
+        'RUN echo prepare',
+        'COPY requirements.txt .depends/pip.list',
+        'RUN pip install -r .depends/pip.list',
+        'COPY apt.txt .depends/apt.list',
+        'RUN apt-get update && xargs -a .depends/apt.list apt-get install -y',
+        'COPY . .',
+        'CMD ["python", "main.py"]',
+    ]
+
+
+def test_buildkit_payload():
+    payload = _obtain_workspace_payload(WORKSPACE, 'mlad', buildkit=True)
+    lines = _lines(payload)
+    assert payload.startswith('# syntax=docker/dockerfile:1\nFROM python:3.7-slim\n')
+    assert 'RUN --mount=type=cache,target=/root/.cache/pip pip install -r .depends/pip.list' in lines
+    assert 'RUN echo prepare' in lines
+    # The downloaded packages are kept in the cache mount of apt.
+    apt = next(_ for _ in lines if 'apt-get install' in _)
+    assert apt.startswith('RUN --mount=type=cache,target=/var/cache/apt,sharing=locked ')
+    assert 'mv /etc/apt/apt.conf.d/docker-clean /tmp/' in apt
+    assert apt.endswith('(mv /tmp/docker-clean /etc/apt/apt.conf.d/ 2> /dev/null || true)')